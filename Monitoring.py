@@ -1,9 +1,52 @@
+import numpy as np
 import pandas as pd
 import os
-import re
 
+from code_tokenizer import iter_stock_codes
+from config import PORTFOLIO_CODES_PATH, load_watchlist
+from holdings_loader import load_holdings
 
-def process_portfolio_stocks(excel_file_path, threshold=30000):
+
+def is_market_value(value):
+    """Column H cells that count as a market value (numpy ints included)."""
+    return isinstance(value, (int, float, np.number)) and pd.notna(value)
+
+
+def screen_codes(stock_col, value_col, stock_codes, threshold):
+    """
+    Split cleaned stock codes into below/above threshold/not found against
+    the holdings code (column A) and market value (column H) columns with
+    one join instead of a column scan per code. The first matching row wins.
+    """
+    holdings = pd.DataFrame({
+        'stock_code': stock_col.astype(str).str.strip().str.upper().to_numpy(),
+        'row': np.arange(len(stock_col)),
+    }).drop_duplicates('stock_code')
+    matched = pd.DataFrame({'stock_code': stock_codes}).merge(holdings, on='stock_code', how='left')
+
+    found = matched['row'].notna().to_numpy()
+    rows = matched['row'].to_numpy()[found].astype(int)
+    codes = matched['stock_code'].to_numpy()[found]
+    values = value_col.iloc[rows]
+
+    # Rows whose value is blank or non-numeric are neither listed nor "not found"
+    numeric = values.map(is_market_value).to_numpy(dtype=bool)
+    below = numeric & (pd.to_numeric(values.where(numeric), errors='coerce') < threshold).to_numpy()
+    above = numeric & ~below
+
+    return {
+        'total_checked': len(stock_codes),
+        'low_value_stocks': [{'stock_code': c, 'market_value': v}
+                             for c, v in zip(codes[below], values.to_numpy()[below])],
+        'high_value_stocks': [{'stock_code': c, 'market_value': v}  # 🆕 NEW
+                              for c, v in zip(codes[above], values.to_numpy()[above])],
+        'not_found_stocks': matched['stock_code'].to_numpy()[~found].tolist(),
+        'all_stock_codes': stock_codes,
+        'threshold': threshold  # 🆕 NEW: Store for display
+    }
+
+
+def process_portfolio_stocks(excel_file_path, threshold=30000, watchlist_path=PORTFOLIO_CODES_PATH):
     """
     Portfolio scanner with configurable threshold + count reporting
     """
@@ -11,106 +54,20 @@ def process_portfolio_stocks(excel_file_path, threshold=30000):
     # 🆕 CONFIGURABLE PRICE THRESHOLD
     MARKET_VALUE_THRESHOLD = threshold  # Change to 20000, 25000 anytime!
 
-    STOCK_CODES_TEXT = """
-	NETSTO		ANGBRO	COMAGE	IIFWEA	MCX
-      
-    """
-
-    # Advanced extraction + cleaning
-    stock_codes = []
-    lines = STOCK_CODES_TEXT.strip().split()
-
-    for item in lines:
-        clean_item = re.sub(r'\[.*?\]', '', item).strip()
-        comma_items = clean_item.split(',')
-        for comma_item in comma_items:
-            comma_item = comma_item.strip()
-            if not comma_item:
-                continue
-            if comma_item in ['BUY', 'OB']:
-                continue
-            clean_stock = re.sub(r'-[A-Z]+$', '', comma_item).strip()
-            clean_stock = re.sub(r'[^\w\s/]', '', clean_stock).strip()
-
-            if clean_stock:
-                if '/' in clean_stock:
-                    split_stocks = clean_stock.split('/')
-                    for split_stock in split_stocks:
-                        final_stock = re.sub(r'[^\w]', '', split_stock).strip()
-                        if final_stock and len(final_stock) > 1:
-                            stock_codes.append(final_stock.upper())
-                else:
-                    final_stock = re.sub(r'[^\w]', '', clean_stock).strip()
-                    if final_stock and len(final_stock) > 1:
-                        stock_codes.append(final_stock.upper())
-
-    # Remove duplicates
-    seen = set()
-    unique_stock_codes = []
-    for stock in stock_codes:
-        if stock not in seen:
-            unique_stock_codes.append(stock)
-            seen.add(stock)
-
-    stock_codes = unique_stock_codes
+    # Advanced extraction + cleaning of the pasted watchlist (one pass, de-duplicated in order)
+    stock_codes = list(iter_stock_codes(load_watchlist(watchlist_path)))
     print(f"📊 Processing {len(stock_codes)} cleaned stock codes: {stock_codes}")
 
     try:
-        engines = ['openpyxl', 'xlrd', 'calamine', 'odf']
-        df = None
-
-        for engine in engines:
-            try:
-                df = pd.read_excel(excel_file_path, engine=engine)
-                print(f"✅ Loaded with {engine} engine")
-                break
-            except:
-                continue
-
-        if df is None:
-            print("Trying CSV fallback...")
-            df = pd.read_csv(excel_file_path)
-            print("✅ Loaded as CSV")
+        # Engine picked from the file's magic bytes; columns A, B and H only
+        df = load_holdings(excel_file_path)
 
         stock_col = df.iloc[:, 0]  # Column A
-        value_col = df.iloc[:, 7]  # Column H
-
-        low_value_stocks = []
-        high_value_stocks = []  # 🆕 NEW: Track stocks >= threshold
-        not_found_stocks = []
-
-        for stock_code in stock_codes:
-            matching_rows = stock_col[stock_col.astype(str).str.strip().str.upper() == stock_code]
-
-            if not matching_rows.empty:
-                row_index = matching_rows.index[0]
-                market_value = value_col.iloc[row_index]
-
-                if pd.notna(market_value) and isinstance(market_value, (int, float)):
-                    if market_value < MARKET_VALUE_THRESHOLD:
-                        low_value_stocks.append({
-                            'stock_code': stock_code,
-                            'market_value': market_value
-                        })
-                    else:
-                        # 🆕 NEW: Stock found but >= threshold
-                        high_value_stocks.append({
-                            'stock_code': stock_code,
-                            'market_value': market_value
-                        })
-            else:
-                not_found_stocks.append(stock_code)
-
-        print(f"\n✅ Found {len(low_value_stocks)} stocks with market value < ₹{MARKET_VALUE_THRESHOLD:,}")
-
-        return {
-            'total_checked': len(stock_codes),
-            'low_value_stocks': low_value_stocks,
-            'high_value_stocks': high_value_stocks,  # 🆕 NEW
-            'not_found_stocks': not_found_stocks,
-            'all_stock_codes': stock_codes,
-            'threshold': MARKET_VALUE_THRESHOLD  # 🆕 NEW: Store for display
-        }
+        value_col = df.iloc[:, 2]  # Column H
+
+        result = screen_codes(stock_col, value_col, stock_codes, MARKET_VALUE_THRESHOLD)
+        print(f"\n✅ Found {len(result['low_value_stocks'])} stocks with market value < ₹{MARKET_VALUE_THRESHOLD:,}")
+        return result
 
     except Exception as e:
         print(f"❌ Error: {str(e)}")
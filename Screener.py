@@ -1,33 +1,16 @@
-import pandas as pd
 import os
-import re
 
+from config import SCREENER_NAMES_PATH, load_watchlist
+from holdings_loader import load_holdings
+from name_index import NameIndex
 
-def process_portfolio_stocks(excel_file_path, threshold=30000):
+
+def process_portfolio_stocks(excel_file_path, threshold=30000, watchlist_path=SCREENER_NAMES_PATH):
     """
       Portfolio scanner with configurable threshold + count reporting
     """
-    STOCK_NAMES_TEXT = """
-Indo Tech.Trans.
-Sharda Motor
-Cigniti Tech.
-BLS Internat.
-Banco Products
-Premier Polyfilm
-Fiem Industries
-Gandhi Spl. Tube
-Ceinsys Tech
-Dodla Dairy
-Dynamic Cables
-Caplin Point Lab
-Interarch Build.
-Shri Ahimsa
-Saksoft
-Antelopus Selan
-    """
-
     MARKET_VALUE_THRESHOLD = threshold
-    stock_names = [name.strip().strip('"') for name in STOCK_NAMES_TEXT.strip().split('\n') if name.strip()]
+    stock_names = [name.strip().strip('"') for name in load_watchlist(watchlist_path) if name.strip()]
     print(f"📊 Processing {len(stock_names)} stock names")
 
     # File existence check
@@ -36,28 +19,15 @@ Antelopus Selan
         return None
 
     try:
-        engines = ['openpyxl', 'xlrd', 'calamine', 'odf']
-        df = None
-
-        for engine in engines:
-            try:
-                df = pd.read_excel(excel_file_path, engine=engine)
-                print(f"✅ Loaded with {engine} engine")
-                break
-            except:
-                continue
-
-        if df is None:
-            print("Trying CSV fallback...")
-            df = pd.read_csv(excel_file_path)
-            print("✅ Loaded as CSV")
+        # Engine picked from the file's magic bytes; columns A, B and H only
+        df = load_holdings(excel_file_path)
 
         name_col = df.iloc[:, 1]  # Column B
         code_col = df.iloc[:, 0]  # Column A
-        value_col = df.iloc[:, 7]  # Column H
+        value_col = df.iloc[:, 2]  # Column H
 
-        # Pre-compute Excel first words for efficiency
-        excel_first_words = name_col.astype(str).str.strip().str.upper().str.split().str[0]
+        # Exact, first-word and token indexes built once for the whole file
+        name_index = NameIndex(name_col)
 
         low_value_stocks = []
         high_value_stocks = []
@@ -65,37 +35,9 @@ Antelopus Selan
 
         for stock_name in stock_names:
             found_match = False
-            name_upper = stock_name.upper().strip()
-
-            # STEP 1: Exact match
-            matching_rows = name_col[
-                name_col.astype(str).str.strip().str.upper() == name_upper
-                ]
-
-            # STEP 2: Full name contains (if multi-word input)
-            if matching_rows.empty and len(stock_name.split()) > 1:
-                full_pattern = r'\b' + re.escape(name_upper) + r'\b'
-                matching_rows = name_col[
-                    name_col.astype(str).str.contains(full_pattern, case=False, na=False, regex=True)
-                ]
-
-            # STEP 3: Input matches FIRST WORD of Excel name (NEW! Works for ALL inputs)
-            if matching_rows.empty:
-                if name_upper in excel_first_words.values:
-                    matching_rows = name_col[
-                        excel_first_words == name_upper
-                        ]
-
-            # STEP 4: Input first word matches Excel first word (multi-word fallback)
-            if matching_rows.empty and len(stock_name.split()) > 1:
-                input_first_word = stock_name.split()[0].strip().upper()
-                if input_first_word in excel_first_words.values:
-                    matching_rows = name_col[
-                        excel_first_words == input_first_word
-                        ]
-
-            if not matching_rows.empty:
-                row_index = matching_rows.index[0]
+            row_index = name_index.match(stock_name)
+
+            if row_index is not None:
                 stock_code = code_col.iloc[row_index]
                 excel_name = name_col.iloc[row_index]
 
@@ -1,81 +1,80 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
-import requests, time
 from datetime import datetime
 
+from async_fetch import fetch_all
+from config import SYMBOL_OVERRIDES_PATH, load_universe
+from price_sources import (QUOTE_SOURCES, LocalFileSource, NSEQuoteSource, PriceRouter, YahooHistorySource,
+                           YahooQuoteSource)
+from returns import TrendRule, build_price_panel, compute_returns
+from symbol_resolver import SymbolResolver
+
 # -----------------------------
-# NSE API Fallback (with cookies)
+# Yahoo history → sheet row (tz dropped by the panel builder)
 # -----------------------------
-def get_price_from_nse(symbol):
-    try:
-        url = f"https://www.nseindia.com/api/quote-equity?symbol={symbol}"
-        session = requests.Session()
-        headers = {
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json",
-            "Referer": "https://www.nseindia.com/"
-        }
-        session.headers.update(headers)
-        session.get("https://www.nseindia.com", timeout=10)  # get cookies
-        r = session.get(url, timeout=10)
-        data = r.json()
-        return data['priceInfo']['lastPrice']
-    except Exception as e:
-        print(f"NSE fetch failed for {symbol} → {e}")
+# This sheet judges the trend on YTD %, with the report's thresholds
+YTD_RULE = TrendRule(horizon="YTD %", name="ytd")
+SHEET_RETURN_COLUMNS = ["Current Price (₹)", "1W %", "2W %", "1M %", "6M %", "YTD %"]
+
+def returns_from_history(symbol, hist):
+    """The sheet's return columns for one history frame, from the shared returns engine."""
+    returns = compute_returns(build_price_panel({symbol: hist}), rule=YTD_RULE)
+    if symbol not in returns.index:
         return None
+    row = returns.loc[symbol]
+    return {
+        **{col: row[col] for col in SHEET_RETURN_COLUMNS},
+        "Last Updated": datetime.today().strftime("%d-%m-%Y")
+    }
 
 # -----------------------------
-# Yahoo fetch (fix tz bug)
+# Trend logic
 # -----------------------------
-def get_returns_yahoo(symbol: str):
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1y", interval="1d")
-        if hist.empty:
-            print(f"Yahoo empty for {symbol}")
-            return None
-
-        # Remove timezone for comparisons
-        hist.index = hist.index.tz_localize(None)
-        current = hist['Close'].iloc[-1]
-
-        def pct(days):
-            if len(hist) > days:
-                return (current / hist['Close'].iloc[-days] - 1) * 100
-            return None
-
-        start_year = datetime(datetime.today().year, 1, 1)
-        ytd_data = hist[hist.index >= start_year]
-        ytd_price = ytd_data['Close'].iloc[0] if not ytd_data.empty else None
-
-        return {
-            "Current Price (₹)": round(float(current), 2),
-            "1W %": round(pct(5), 2) if pct(5) else None,
-            "2W %": round(pct(10), 2) if pct(10) else None,
-            "1M %": round(pct(21), 2) if pct(21) else None,
-            "6M %": round(pct(126), 2) if pct(126) else None,
-            "YTD %": round((current / ytd_price - 1) * 100, 2) if ytd_price else None,
-            "Last Updated": datetime.today().strftime("%d-%m-%Y")
-        }
-    except Exception as e:
-        print(f"Yahoo error for {symbol}: {e}")
-        return None
+def compute_trends(ytd):
+    """Trend column from a YTD % column; missing or non-numeric YTD is Unknown."""
+    ytd = pd.to_numeric(ytd, errors="coerce")
+    trends = pd.Series(YTD_RULE.classify(ytd.to_numpy(dtype=float)), index=ytd.index)
+    return trends.where(ytd.notna(), "Unknown")
 
 # -----------------------------
-# Trend logic
+# Merge results into the sheet
 # -----------------------------
-def compute_trend(row):
-    try:
-        if row.get("YTD %") is None or pd.isna(row.get("YTD %")):
-            return "Unknown"
-        if row["YTD %"] > 10:
-            return "Bullish"
-        elif row["YTD %"] < -10:
-            return "Bearish"
-        else:
-            return "Neutral"
-    except:
-        return "Unknown"
+def apply_results(df, rows, results, served):
+    """
+    Write fetch results back into the sheet: results are collected into one
+    frame keyed by the sheet's row index and assigned column by column.
+    A row only overwrites the columns its result has (a "Data not found"
+    row keeps its old prices), exactly like the per-cell df.at loop did.
+    """
+    if not rows:
+        return df
+    index = pd.Index([idx for idx, _, _ in rows])
+
+    records = []
+    for _, _, symbol in rows:
+        res = results.get(symbol)
+        if res and served.get(symbol) in QUOTE_SOURCES:
+            # Price-only quote (NSE or Yahoo): clear the return columns so they never mix days
+            res = {
+                "Current Price (₹)": res["Current Price (₹)"],
+                "1W %": None, "2W %": None, "1M %": None,
+                "6M %": None, "YTD %": None,
+                "Last Updated": res["Last Updated"]
+            }
+        records.append(res or {"Error": "Data not found"})
+    updates = pd.DataFrame.from_records(records, index=index)
+
+    for col in updates.columns:
+        has = np.fromiter((col in res for res in records), dtype=bool, count=len(records))
+        values = updates[col].to_numpy()[has]
+        if col in df.columns and df[col].dtype != object and values.dtype == object:
+            df[col] = df[col].astype(object)  # e.g. an all-blank column read back as float
+        df.loc[index[has], col] = values
+    df.loc[index, "Symbol"] = [symbol for _, _, symbol in rows]
+
+    ytd = updates["YTD %"] if "YTD %" in updates.columns else pd.Series(np.nan, index=index)
+    df.loc[index, "Trend"] = compute_trends(ytd).to_numpy()
+    return df
 
 # -----------------------------
 # Update Excel
@@ -97,57 +96,45 @@ def update_excel(input_file, output_file):
         if col not in df.columns:
             df[col] = None
 
-    # Custom verified mapping (extend as needed)
-    mapping = {
-        "Bajaj Auto Ltd": "BAJAJ-AUTO.NS",
-        "Havells India Ltd": "HAVELLS.NS",
-        "Lupin Ltd": "LUPIN.NS",
-        "Astral Ltd": "ASTRAL.NS",
-        "Marksans Pharma Ltd": "MARKSANS.NS",
-        "Zydus Lifesciences": "ZYDUSLIFE.NS",
-        "NBCC": "NBCC.NS",
-        "Finolex Cable": "FINCABLES.NS",
-        "Rashtriya Chemicals and Fertilizers Ltd": "RCF.NS",
-        "Deepak Frtlsrs and Ptrchmcls Corp Ltd": "DEEPAKFERT.NS",
-        # Add more mappings here...
-    }
+    # Custom verified mapping (extend config/symbol_overrides.csv as needed)
+    mapping = load_universe(SYMBOL_OVERRIDES_PATH)
+
+    # Instrument master + persistent name cache; the verified mapping always wins
+    resolver = SymbolResolver(overrides=mapping)
+
+    names = df[stock_col].map(str).str.strip()
+    named = (names != "") & (names.str.lower() != "nan")
+    rows = [(idx, name, resolver.resolve(name)) for idx, name in names[named].items()]
+
+    # Yahoo history → NSE/Yahoo quote (healthier first) → local store failover,
+    # fetched concurrently under a shared rate limit
+    router = PriceRouter([
+        YahooHistorySource(to_result=returns_from_history),
+        NSEQuoteSource(),
+        YahooQuoteSource(),
+        LocalFileSource(to_result=returns_from_history),
+    ])
+    symbols = [symbol for _, _, symbol in rows if symbol]
+    print(f"\nFetching {len(set(symbols))} symbols...")
+    results = fetch_all(symbols, router.fetch)
+    print("Source health:", router.report())
+
+    for _, name, symbol in rows:
+        if symbol is None:
+            print(f"\nSkipping: {name} (no ticker found)")
+        else:
+            print(f"\nUpdating: {name} ({symbol}) via {router.served.get(symbol, 'no source')}")
+        res = results.get(symbol)
+
+        # Remember what worked; misses are only cached when some source was up
+        if res:
+            resolver.confirm(name, symbol)
+        elif symbol and router.served:
+            resolver.reject(name)
 
-    for idx, row in df.iterrows():
-        name = str(row[stock_col]).strip()
-        if not name or name.lower() == 'nan':
-            continue
-
-        symbol = mapping.get(name)
-        if not symbol:
-            # Fallback guess → first word + ".NS"
-            symbol = name.split(" ")[0].upper() + ".NS"
-
-        print(f"\nFetching: {name} ({symbol})")
-
-        res = None
-        if symbol.endswith(".NS"):
-            res = get_returns_yahoo(symbol)
-            time.sleep(0.5)
-
-        if not res:
-            nse_symbol = symbol.replace(".NS", "")
-            price = get_price_from_nse(nse_symbol)
-            if price:
-                res = {
-                    "Current Price (₹)": price,
-                    "1W %": None, "2W %": None, "1M %": None,
-                    "6M %": None, "YTD %": None,
-                    "Last Updated": datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-                }
-
-        if not res:
-            res = {"Error": "Data not found"}
-
-        # Update DataFrame row
-        for col in res:
-            df.at[idx, col] = res[col]
-        df.at[idx, "Symbol"] = symbol
-        df.at[idx, "Trend"] = compute_trend(res)
+    # All rows merged back in one pass, trend as a vectorized column
+    apply_results(df, rows, results, router.served)
+    resolver.save()
 
     # Save new Excel
     df.to_excel(output_file, index=False)
@@ -156,4 +143,5 @@ def update_excel(input_file, output_file):
 # -----------------------------
 # Run
 # -----------------------------
-update_excel("Stock-List.xlsx", "Stock-List-Updated.xlsx")
+if __name__ == "__main__":
+    update_excel("Stock-List.xlsx", "Stock-List-Updated.xlsx")
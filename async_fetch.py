@@ -0,0 +1,127 @@
+import asyncio
+import random
+import time
+
+import requests
+
+from instrumentation import count, observe
+
+# -----------------------------
+# Concurrent fetch scheduler
+# -----------------------------
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 4.0       # requests per second, sustained
+DEFAULT_BURST = 4        # requests allowed back to back
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 20.0   # seconds per attempt
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+
+RETRYABLE_MARKERS = ("too many requests", "rate limit", "429", "502", "503", "504")
+# Network failures; requests' own types do not subclass the builtin ones
+RETRYABLE_ERRORS = (asyncio.TimeoutError, TimeoutError, ConnectionError,
+                    requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class TokenBucket:
+    """Token-bucket limiter: `rate` tokens per second, at most `capacity` stored."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def error_status(exc):
+    """HTTP status carried by an exception, if any (requests, aiohttp, urllib styles)."""
+    for attr in ("status", "status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(exc):
+    """Throttling (429), server errors (5xx) and timeouts are worth another try."""
+    if isinstance(exc, RETRYABLE_ERRORS):
+        return True
+    status = error_status(exc)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    message = str(exc).lower()
+    return any(marker in message for marker in RETRYABLE_MARKERS)
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+async def _call(fetch, symbol, timeout):
+    if asyncio.iscoroutinefunction(fetch):
+        return await asyncio.wait_for(fetch(symbol), timeout)
+    # Blocking clients (yfinance, requests) run on worker threads. A timed-out
+    # thread cannot be killed, its result is simply ignored.
+    return await asyncio.wait_for(asyncio.to_thread(fetch, symbol), timeout)
+
+
+async def fetch_all_async(symbols, fetch, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                          burst=DEFAULT_BURST, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT,
+                          observe_latency=True):
+    """
+    Run `fetch(symbol)` for every symbol with bounded concurrency, a shared
+    token-bucket rate limit and jittered exponential backoff on 429/5xx.
+    Returns {symbol: result}; symbols that kept failing map to None.
+    `observe_latency=False` keeps per-symbol samples out of the run metrics
+    (long-running callers, whose samples would pile up for ever).
+    """
+    record = observe if observe_latency else (lambda *args: None)
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(symbol):
+        async with semaphore:
+            for attempt in range(1, retries + 1):
+                await bucket.acquire()
+                start = time.perf_counter()
+                try:
+                    result = await _call(fetch, symbol, timeout)
+                    record("symbol_fetch", time.perf_counter() - start, symbol)
+                    return symbol, result
+                except Exception as e:
+                    record("symbol_fetch", time.perf_counter() - start, symbol)
+                    count("fetch_errors")
+                    if attempt < retries and is_retryable(e):
+                        count("fetch_retries")
+                        delay = backoff_delay(attempt)
+                        print(f"Retrying {symbol} in {delay:.1f}s (attempt {attempt}/{retries}) → {e!r}")
+                        await asyncio.sleep(delay)
+                        continue
+                    print(f"Fetch failed for {symbol} → {e!r}")
+                    return symbol, None
+
+    pairs = await asyncio.gather(*(one(s) for s in dict.fromkeys(symbols)))
+    return dict(pairs)
+
+
+def fetch_all(symbols, fetch, **kwargs):
+    """Blocking wrapper around fetch_all_async for the scripts."""
+    return asyncio.run(fetch_all_async(symbols, fetch, **kwargs))
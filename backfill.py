@@ -0,0 +1,184 @@
+"""
+Historical backfill: regenerate previous_trends_YYYY-MM-DD.json snapshots
+(and trend-history rows) for past month starts from one long price
+history, so month-over-month trend changes work for months whose run
+left nothing behind.
+
+    python backfill.py 2025-06-01 2026-04-01             # missing/empty snapshots only
+    python backfill.py 2025-06-01 2026-04-01 --force     # rewrite every month in range
+    python backfill.py 2024-01-01 2026-04-01 --fetch     # download the history first
+
+Each month start gets the labels the scheduled run (00:00 UTC on the 1st,
+before the Indian open) would have produced: returns over the bars
+strictly before that day, within the same one-year window the report
+loads, computed for every symbol and every month in one vectorized sweep.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import DEFAULT_VARIANT, RULES_PATH, UNIVERSE_PATH, load_rules, load_universe
+from price_archive import DEFAULT_ARCHIVE_DIR, PriceArchive
+from price_panel import PricePanel
+from price_store import DEFAULT_STORE_PATH, HISTORY_DAYS, PriceStore
+from returns import HORIZONS, TREND_HORIZON
+from script import PREVIOUS_DIR, TREND_HISTORY_FILE, normalize_symbol
+from trend_history import RETURN_KEYS, append_run
+
+BACKFILL_COLUMNS = [label for label in RETURN_KEYS.values()]   # what the trend history keeps
+
+
+def month_starts(start, end):
+    """First-of-month dates from the month of `start` through `end`."""
+    first = pd.Timestamp(start).to_period("M").to_timestamp()
+    return list(pd.date_range(first, pd.Timestamp(end), freq="MS"))
+
+
+def _nth_valid(compact, n):
+    """compact[n - 1] per column for an (months x symbols) matrix of 1-based positions; NaN where n < 1."""
+    rows = np.clip(n - 1, 0, max(compact.shape[0] - 1, 0))
+    picked = np.take_along_axis(compact, rows, axis=0)
+    return np.where(n >= 1, picked, np.nan)
+
+
+def sweep(panel, run_dates, rule):
+    """
+    {run date: frame of returns + Trend per symbol} for every run date at
+    once, matching compute_returns on the bars in [run - HISTORY_DAYS, run).
+    Symbols without a bar in that window are left out of that date's frame.
+    """
+    values = panel.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    dates = panel.dates
+    # Valid bars moved to the top of each column: compact[k] is the (k+1)-th bar
+    order = np.argsort(~valid, axis=0, kind="stable")
+    compact = np.take_along_axis(values, order, axis=0)
+    seen = np.vstack([np.zeros((1, values.shape[1]), dtype=np.int64), np.cumsum(valid, axis=0)])
+
+    runs = np.array([np.datetime64(d.date(), "D") for d in run_dates])
+    stop = np.searchsorted(dates, runs)                                          # bars before the run
+    first = np.searchsorted(dates, runs - np.timedelta64(HISTORY_DAYS, "D"))    # report's load window
+    year = np.searchsorted(dates, runs.astype("datetime64[Y]").astype("datetime64[D]"))
+    end_n = seen[stop]                       # months x symbols: bars up to the run
+    window_n = end_n - seen[first]           # bars inside the report's window
+    before_year = seen[np.maximum(year, first)]
+
+    current = _nth_valid(compact, end_n)
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column, days in HORIZONS.items():
+            enough = window_n > days
+            raw = (current / _nth_valid(compact, end_n - days + 1) - 1) * 100
+            pct = np.where(enough, np.round(raw, 2), np.nan)
+            out[column] = (pct, enough, raw)
+        has_ytd = end_n > before_year
+        base = _nth_valid(compact, before_year + 1)
+        raw = (current / base - 1) * 100
+        ytd_ok = has_ytd & (base != 0)
+        out["YTD %"] = (np.where(ytd_ok, np.round(raw, 2), np.nan), ytd_ok, raw)
+
+    pct, enough, _ = out[rule.horizon]
+    labels = rule.classify(pct)
+    frames = {}
+    for i, run in enumerate(run_dates):
+        present = window_n[i] > 0
+        frame = {"Trend": np.where(enough[i], labels[i], None).astype(object)[present]}
+        for column in BACKFILL_COLUMNS:
+            col_pct, ok, raw = out[column]
+            keep = ok[i] if column in (TREND_HORIZON, "YTD %") else ok[i] & (raw[i] != 0)
+            frame[column] = np.where(keep, col_pct[i], None).astype(object)[present]
+        # object dtype: pandas would otherwise infer str for Trend and turn None into NaN
+        frames[run] = pd.DataFrame(frame, index=np.asarray(panel.symbols, dtype=object)[present], dtype=object)
+    return frames
+
+
+def load_panel(symbols, earliest, source, archive_path=DEFAULT_ARCHIVE_DIR, store_path=DEFAULT_STORE_PATH):
+    """One close panel covering every month of the backfill, read once."""
+    since = earliest.strftime("%Y-%m-%d")
+    if source == "fetch":
+        from batch_fetch import fetch_histories
+        histories = fetch_histories(symbols, start=since)
+        panel = PricePanel.from_histories(histories)
+        PriceArchive(archive_path).append(panel)   # keep it for the next backfill
+        return panel
+    if source == "archive":
+        return PriceArchive(archive_path).panel(symbols, since=since)
+    with PriceStore(store_path) as store:
+        return store.load_panel(symbols, since=since)
+
+
+def write_snapshot(path, trends):
+    """Write a previous_trends snapshot via a temp file, so readers never see half of it."""
+    trends = {symbol: trend if isinstance(trend, str) else None for symbol, trend in trends.items()}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(trends, f, allow_nan=False)
+    os.replace(tmp, path)
+
+
+def backfill(start, end, stocks, rule, source=None, force=False, previous_dir=PREVIOUS_DIR,
+             archive_path=DEFAULT_ARCHIVE_DIR, store_path=DEFAULT_STORE_PATH):
+    """Fill missing or empty snapshots for month starts in [start, end]; returns the dates written."""
+    runs = month_starts(start, end)
+    todo = []
+    for run in runs:
+        path = os.path.join(previous_dir, f"previous_trends_{run:%Y-%m-%d}.json")
+        if force or not os.path.exists(path) or os.path.getsize(path) == 0:
+            todo.append((run, path))
+    if not todo:
+        print(f"✅ Snapshots for {len(runs)} month starts already present (use --force to rewrite)")
+        return []
+
+    source = source or ("archive" if PriceArchive(archive_path).exists() else "store")
+    earliest = todo[0][0] - timedelta(days=HISTORY_DAYS)
+    panel = load_panel(list(stocks.values()), earliest, source, archive_path, store_path)
+    print(f"📚 {len(panel.symbols)} symbols x {len(panel.dates)} days from the {source}")
+    if not panel.symbols:
+        print("❌ No price history to backfill from")
+        return []
+
+    frames = sweep(panel, [run for run, _ in todo], rule)
+    names = {symbol: name for name, symbol in stocks.items()}
+    os.makedirs(previous_dir, exist_ok=True)
+    history_path = os.path.join(previous_dir, TREND_HISTORY_FILE)
+    written = []
+    for run, path in todo:
+        frame = frames[run]
+        if frame.empty:
+            print(f"⚠️ {run:%Y-%m-%d}: no bars in the window, skipped")
+            continue
+        trends = {normalize_symbol(symbol): trend for symbol, trend in frame["Trend"].items()}
+        write_snapshot(path, trends)
+        results = {names.get(symbol, symbol): {"Symbol": normalize_symbol(symbol), **row}
+                   for symbol, row in frame.to_dict("index").items()}
+        append_run(f"{run:%Y-%m-%d}", results, history_path)
+        counts = frame["Trend"].value_counts().to_dict()
+        print(f"💾 {path}: {len(trends)} symbols {counts}")
+        written.append(f"{run:%Y-%m-%d}")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill monthly previous_trends snapshots from price history")
+    parser.add_argument("start", help="first month (YYYY-MM-DD; its month start is used)")
+    parser.add_argument("end", nargs="?", default=datetime.now().strftime("%Y-%m-%d"), help="last date (default today)")
+    parser.add_argument("--force", action="store_true", help="rewrite snapshots that already have data")
+    parser.add_argument("--source", choices=["archive", "store", "fetch"],
+                        help="price history to read (default: the archive if present, else the store)")
+    parser.add_argument("--fetch", dest="source", action="store_const", const="fetch",
+                        help="download the history first (same as --source fetch)")
+    parser.add_argument("--universe", default=UNIVERSE_PATH)
+    parser.add_argument("--rules", default=RULES_PATH)
+    parser.add_argument("--variant", default=DEFAULT_VARIANT)
+    parser.add_argument("--previous-dir", default=PREVIOUS_DIR)
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    if args.variant not in rules:
+        parser.error(f"unknown rule variant {args.variant!r}; defined: {sorted(rules)}")
+    backfill(args.start, args.end, load_universe(args.universe), rules[args.variant], source=args.source,
+             force=args.force, previous_dir=args.previous_dir)
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta
+
+# -----------------------------
+# Nearest-available baseline run
+# -----------------------------
+# The runs themselves live in the trend history (trend_history.nearest_run),
+# which imports every previous_trends_*.json snapshot before it is read.
+BASELINE_WINDOW_DAYS = 20
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d")
+    return datetime(value.year, value.month, value.day)
+
+
+def pick_nearest(dates, target, window_days=BASELINE_WINDOW_DAYS):
+    """
+    Dates within `window_days` of `target`, closest first (earlier date wins
+    a tie, so a run just before the target beats one just after).
+    """
+    target = _as_date(target)
+    window = timedelta(days=window_days)
+    candidates = [d for d in dates if abs(_as_date(d) - target) <= window]
+    return sorted(candidates, key=lambda d: (abs(_as_date(d) - target), _as_date(d)))
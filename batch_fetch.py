@@ -0,0 +1,133 @@
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from async_fetch import fetch_all
+from instrumentation import count, observe
+
+# -----------------------------
+# Batched Yahoo history download
+# -----------------------------
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF = 2.0  # seconds, doubled after every failed attempt
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def yahoo_download(symbols, period="1y", interval="1d", start=None):
+    """One grouped request for a whole chunk of symbols."""
+    return yf.download(
+        symbols,
+        period=None if start else period,
+        start=start,
+        interval=interval,
+        group_by="ticker",
+        auto_adjust=True,
+        actions=True,
+        threads=False,
+        progress=False,
+    )
+
+
+def yahoo_history(symbol, period="1y", interval="1d", start=None):
+    """Single-symbol fetch, same call the master loop used to make."""
+    if start:
+        return yf.Ticker(symbol).history(start=start, interval=interval)
+    return yf.Ticker(symbol).history(period=period, interval=interval)
+
+
+def yahoo_last_price(symbol):
+    """Latest traded price from Yahoo's quote data (no history download)."""
+    return yf.Ticker(symbol).fast_info["lastPrice"]
+
+
+def split_frame(wide, symbols):
+    """
+    Split the wide (ticker, field) frame from a grouped download into
+    one history frame per symbol, shaped like Ticker.history() output.
+    """
+    histories = {}
+    if wide is None or wide.empty:
+        return histories
+
+    if not isinstance(wide.columns, pd.MultiIndex):
+        # Single ticker downloads may come back flat
+        if len(symbols) == 1:
+            hist = wide.dropna(subset=["Close"])
+            if not hist.empty:
+                histories[symbols[0]] = hist
+        return histories
+
+    available = set(wide.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        hist = wide[symbol].dropna(subset=["Close"])
+        if not hist.empty:
+            histories[symbol] = hist
+    return histories
+
+
+def fetch_histories(symbols, period="1y", interval="1d", chunk_size=DEFAULT_CHUNK_SIZE,
+                    retries=DEFAULT_RETRIES, downloader=None, single_fetcher=None, start=None):
+    """
+    Fetch daily history for every symbol with one grouped request per chunk.
+    When `start` is given only bars from that date on are requested.
+
+    Symbols that are still missing after all chunk retries are fetched one
+    by one through `single_fetcher` on the rate-limited async scheduler.
+    Both callables can be swapped for a recorded or fake data source.
+    """
+    downloader = downloader or yahoo_download
+    single_fetcher = single_fetcher or yahoo_history
+
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    histories = {}
+
+    for chunk in chunked(symbols, chunk_size):
+        pending = list(chunk)
+        delay = RETRY_BACKOFF
+        for attempt in range(1, retries + 1):
+            began = time.perf_counter()
+            try:
+                wide = downloader(pending, period=period, interval=interval, start=start)
+                got = split_frame(wide, pending)
+                histories.update(got)
+                count("batch_requests")
+                count("rows_fetched", sum(len(h) for h in got.values()))
+                count("frame_bytes_fetched", int(wide.memory_usage(deep=False).sum()) if wide is not None else 0)
+            except Exception as e:
+                count("batch_errors")
+                print(f"Batch download failed (attempt {attempt}/{retries}) → {e}")
+            observe("batch_chunk", time.perf_counter() - began)
+            pending = [s for s in pending if s not in histories]
+            if not pending:
+                break
+            if attempt < retries:
+                count("batch_retries")
+                time.sleep(delay)
+                delay *= 2
+        print(f"📦 Batch {len(chunk) - len(pending)}/{len(chunk)} symbols fetched")
+
+    missing = [s for s in symbols if s not in histories]
+    if not missing:
+        return histories
+    print(f"🔁 Falling back to per-symbol fetch for {len(missing)} symbols")
+
+    def fetch_one(symbol):
+        return single_fetcher(symbol, period=period, interval=interval, start=start)
+
+    # Concurrent, rate-limited fallback instead of a fixed sleep per symbol
+    for symbol, hist in fetch_all(missing, fetch_one).items():
+        if hist is not None and not hist.empty:
+            histories[symbol] = hist
+            count("rows_fetched", len(hist))
+        else:
+            print(f"Yahoo returned empty for {symbol}")
+
+    return histories
@@ -0,0 +1,71 @@
+"""
+Code screener: the per-code column scan Monitoring.process_portfolio_stocks
+used to run against the single join in screen_codes. Holdings rows and codes
+grow together, so the scan grows quadratically and the join linearly.
+
+    python benchmarks/bench_code_screener.py 1000 10000 100000
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from Monitoring import screen_codes  # noqa: E402
+from synthetic import synthetic_holdings  # noqa: E402
+
+CODES_PER_ROW = 0.1      # watchlist size relative to the holdings export
+LEGACY_MAX_ROWS = 30000  # the scan gets slow quickly past this
+
+
+def legacy_screen(stock_col, value_col, stock_codes, threshold):
+    low_value_stocks, high_value_stocks, not_found_stocks = [], [], []
+    for stock_code in stock_codes:
+        matching_rows = stock_col[stock_col.astype(str).str.strip().str.upper() == stock_code]
+        if not matching_rows.empty:
+            market_value = value_col.iloc[matching_rows.index[0]]
+            if pd.notna(market_value) and isinstance(market_value, (int, float)):
+                if market_value < threshold:
+                    low_value_stocks.append({'stock_code': stock_code, 'market_value': market_value})
+                else:
+                    high_value_stocks.append({'stock_code': stock_code, 'market_value': market_value})
+        else:
+            not_found_stocks.append(stock_code)
+    return {
+        'total_checked': len(stock_codes),
+        'low_value_stocks': low_value_stocks,
+        'high_value_stocks': high_value_stocks,
+        'not_found_stocks': not_found_stocks,
+        'all_stock_codes': stock_codes,
+        'threshold': threshold,
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    for n in sizes:
+        n_codes = max(1, int(n * CODES_PER_ROW))
+        df = synthetic_holdings(n)
+        # Half the watchlist is held, half is not
+        codes = [f"CODE{i:06d}" for i in range(0, n, max(1, n // (n_codes // 2 or 1)))][: n_codes // 2]
+        codes += [f"MISSING{i:06d}" for i in range(n_codes - len(codes))]
+
+        stock_col, value_col = df.iloc[:, 0], df.iloc[:, 7]
+        join_s, result = timed(screen_codes, stock_col, value_col, codes, 30000)
+        line = f"{n:>8} rows x {len(codes):>6} codes | join {join_s:8.3f}s"
+        if n <= LEGACY_MAX_ROWS:
+            legacy_s, legacy = timed(legacy_screen, stock_col, value_col, codes, 30000)
+            line += f" | scan {legacy_s:8.3f}s | x{legacy_s / join_s:7.1f} | same: {legacy == result}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 3000, 10000, 30000, 100000, 1000000])
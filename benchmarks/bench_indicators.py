@@ -0,0 +1,74 @@
+"""
+Indicator engine cost: compute_indicators (plus the High/Low panels it
+needs) against compute_returns and against what the run spends fetching.
+The fetch time comes from the newest result/*.metrics.json a real run left
+behind (or --metrics), scaled per symbol.
+
+    python benchmarks/bench_indicators.py 300 3000 30000
+    python benchmarks/bench_indicators.py 3000 --metrics result/Stock-List_2026-04-01.metrics.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from indicators import compute_indicators  # noqa: E402
+from returns import build_price_panels, compute_returns  # noqa: E402
+from synthetic import synthetic_histories  # noqa: E402
+
+RESULT_GLOB = os.path.join(os.path.dirname(__file__), "..", "result", "*.metrics.json")
+
+
+def fetch_seconds_per_symbol(path=None):
+    """Seconds per symbol the fetch_histories span took in a real run, or None."""
+    paths = [path] if path else sorted(glob.glob(RESULT_GLOB), key=os.path.getmtime)
+    if not paths:
+        return None, None
+    with open(paths[-1]) as f:
+        summary = json.load(f)
+    fetch = summary.get("spans", {}).get("fetch_histories", {}).get("total_s")
+    symbols = summary.get("counters", {}).get("symbols")
+    if not fetch or not symbols:
+        return None, paths[-1]
+    return fetch / symbols, paths[-1]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator engine cost vs returns and fetch")
+    parser.add_argument("sizes", type=int, nargs="*", default=[300, 3000, 30000])
+    parser.add_argument("--metrics", help="run metrics JSON to take the fetch time from")
+    args = parser.parse_args()
+
+    per_symbol, source = fetch_seconds_per_symbol(args.metrics)
+    if per_symbol:
+        print(f"📥 Fetch baseline: {per_symbol * 1000:.1f} ms/symbol from {source}")
+    else:
+        print("⚠️ No run metrics with a fetch_histories span found, showing compute times only")
+
+    for n in args.sizes:
+        histories = synthetic_histories(n)
+        close_only, panels = timed(build_price_panels, histories, ("Close",))
+        ohlc, panels = timed(build_price_panels, histories, ("Close", "High", "Low"))
+        returns, _ = timed(compute_returns, panels["Close"])
+        indicators, _ = timed(compute_indicators, panels["Close"], panels["High"], panels["Low"])
+        added = (ohlc - close_only) + indicators
+        line = (f"{n:>7} symbols: returns {returns:.3f}s, indicators {indicators:.3f}s"
+                f" (+{ohlc - close_only:.3f}s High/Low panels) → {added / n * 1e6:.0f} µs/symbol added")
+        if per_symbol:
+            line += f", {added / (per_symbol * n) * 100:.2f}% of the fetch"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
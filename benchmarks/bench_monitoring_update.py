@@ -0,0 +1,105 @@
+"""
+Stock-List sheet update: the iterrows + per-cell df.at loop update_excel
+used to run against Test.apply_results, on a synthetic sheet (10k rows by
+default) with successes, NSE/Yahoo price-only quotes, misses and unresolved names.
+Both workbooks are written and compared cell by cell.
+
+    python benchmarks/bench_monitoring_update.py 10000
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from price_sources import QUOTE_SOURCES  # noqa: E402
+from Test import apply_results  # noqa: E402
+
+REQUIRED = ["Symbol", "Current Price (₹)", "1W %", "2W %", "1M %", "6M %", "YTD %", "Trend", "Last Updated"]
+
+
+def legacy_compute_trend(row):
+    try:
+        if row.get("YTD %") is None or pd.isna(row.get("YTD %")):
+            return "Unknown"
+        if row["YTD %"] > 10:
+            return "Bullish"
+        elif row["YTD %"] < -10:
+            return "Bearish"
+        else:
+            return "Neutral"
+    except:
+        return "Unknown"
+
+
+def legacy_apply(df, rows, results, served):
+    for idx, name, symbol in rows:
+        res = results.get(symbol)
+        if res and served.get(symbol) in QUOTE_SOURCES:
+            res = {
+                "Current Price (₹)": res["Current Price (₹)"],
+                "1W %": None, "2W %": None, "1M %": None,
+                "6M %": None, "YTD %": None,
+                "Last Updated": res["Last Updated"]
+            }
+        if not res:
+            res = {"Error": "Data not found"}
+        for col in res:
+            df.at[idx, col] = res[col]
+        df.at[idx, "Symbol"] = symbol
+        df.at[idx, "Trend"] = legacy_compute_trend(res)
+    return df
+
+
+def synthetic_sheet(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"Stock Name": [f"Company {i:05d} Ltd" if i % 97 else None for i in range(n)]})
+    for col in REQUIRED:
+        df[col] = None
+    rows, results, served = [], {}, {}
+    for idx, name in df["Stock Name"].items():
+        if name is None:
+            continue
+        kind = rng.integers(0, 10)
+        symbol = None if kind == 0 else f"SYM{idx:05d}.NS"
+        rows.append((idx, name, symbol))
+        if symbol is None or kind == 1:
+            continue
+        pct = lambda scale: round(float(rng.normal(0, scale)), 2) if rng.random() > 0.05 else None
+        results[symbol] = {
+            "Current Price (₹)": round(float(rng.lognormal(5, 1)), 2),
+            "1W %": pct(3), "2W %": pct(5), "1M %": pct(8), "6M %": pct(18), "YTD %": pct(20),
+            "Last Updated": "01-01-2026",
+        }
+        served[symbol] = {2: "nse", 3: "yahoo_quote"}.get(kind, "yahoo")
+    return df, rows, results, served
+
+
+def cells(path):
+    return [tuple(row) for row in load_workbook(path, read_only=True).active.iter_rows(values_only=True)]
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            df, rows, results, served = synthetic_sheet(n)
+            timings, paths = {}, {}
+            for label, fn in (("legacy", legacy_apply), ("merged", apply_results)):
+                sheet = df.copy()
+                start = time.perf_counter()
+                fn(sheet, rows, results, served)
+                timings[label] = time.perf_counter() - start
+                paths[label] = os.path.join(tmp, f"{label}_{n}.xlsx")
+                sheet.to_excel(paths[label], index=False)
+            same = cells(paths["legacy"]) == cells(paths["merged"])
+            print(f"{n:>7} rows | df.at loop {timings['legacy']:7.3f}s | merged {timings['merged']:7.3f}s"
+                  f" | x{timings['legacy'] / timings['merged']:6.1f} | same workbook: {same}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10000])
@@ -0,0 +1,50 @@
+"""
+Parallel compute stage: returns + indicators for a large universe with 1,
+2, 4 ... worker processes over shared-memory panels, against the
+in-process run. Speedup is bounded by the cores the machine has.
+
+    python benchmarks/bench_parallel.py 3000 30000
+    python benchmarks/bench_parallel.py 30000 --workers 1 2 4 8 --no-indicators
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from parallel_compute import compute_rows, parallel_returns  # noqa: E402
+from returns import build_price_panels  # noqa: E402
+from synthetic import synthetic_histories  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process-pool scaling of the returns/indicator stage")
+    parser.add_argument("sizes", type=int, nargs="*", default=[3000, 30000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--no-indicators", dest="indicators", action="store_false")
+    args = parser.parse_args()
+    print(f"🖥️ {os.cpu_count()} cores, indicators {'on' if args.indicators else 'off'}")
+
+    for n in args.sizes:
+        panels = build_price_panels(synthetic_histories(n), ("Close", "High", "Low"))
+        serial, expected = timed(compute_rows, panels, indicators=args.indicators)
+        print(f"{n:>7} symbols: in-process {serial:.3f}s")
+        for workers in args.workers:
+            if workers == 1:
+                continue
+            seconds, rows = timed(parallel_returns, panels, indicators=args.indicators,
+                                  workers=workers, min_symbols=0)
+            same = "identical" if rows == expected and list(rows) == list(expected) else "MISMATCH"
+            print(f"{'':>16}{workers} workers {seconds:.3f}s  x{serial / seconds:5.2f}  ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Price archive reads: the close panel compute_returns needs, from per-symbol
+store frames, from PriceStore.load_panel and from the memory-mapped
+archive, plus appending one new trading day to the archive.
+
+    python benchmarks/bench_price_archive.py 500 3000 --days 750
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from price_archive import PriceArchive  # noqa: E402
+from price_panel import PricePanel  # noqa: E402
+from price_store import PriceStore  # noqa: E402
+from returns import build_price_panel, compute_returns  # noqa: E402
+from synthetic import synthetic_histories  # noqa: E402
+
+YEAR_ROWS = 252   # the report only looks at the last year
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store vs memory-mapped archive reads")
+    parser.add_argument("sizes", type=int, nargs="*", default=[500, 3000])
+    parser.add_argument("--days", type=int, default=750, help="trading days of history per symbol")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            histories = synthetic_histories(n, days=args.days)
+            symbols = list(histories)
+            store = PriceStore(os.path.join(tmp, f"store_{n}.sqlite"))
+            for symbol, hist in histories.items():
+                store.write(symbol, hist)
+            archive = PriceArchive(os.path.join(tmp, f"archive_{n}"))
+            archive.write(PricePanel.from_histories(histories))
+            since = str(PricePanel.from_histories({symbols[0]: histories[symbols[0]]}).dates[-YEAR_ROWS])
+
+            frames, _ = timed(lambda: compute_returns(build_price_panel(store.load(symbols, since=since))))
+            panel, _ = timed(lambda: compute_returns(store.load_panel(symbols, since=since)))
+            mapped, _ = timed(lambda: compute_returns(PriceArchive(archive.path).panel(symbols, since=since)))
+
+            last = archive.dates[-1] + np.timedelta64(1, "D")
+            row = PricePanel([last], symbols, np.ones((1, n)))
+            append, _ = timed(archive.append, row)
+            store.close()
+            print(f"{n:>6} symbols x {args.days} days, last-year returns: store frames {frames:.3f}s,"
+                  f" store panel {panel:.3f}s, archive {mapped:.3f}s; append one day {append * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
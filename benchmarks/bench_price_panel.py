@@ -0,0 +1,61 @@
+"""
+Price panel memory: seeding the monitor from per-symbol OHLCV frames
+(PriceStore.load) against a float32 close PricePanel (load_panel), for
+multi-year histories. Peak traced allocations and load time per size.
+
+    python benchmarks/bench_price_panel.py 500 3000 --days 750
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from price_store import PriceStore  # noqa: E402
+from synthetic import synthetic_histories  # noqa: E402
+
+
+def traced(fn, *args, **kwargs):
+    """(seconds, peak MB, result) of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frames vs PricePanel memory for the monitor seed")
+    parser.add_argument("sizes", type=int, nargs="*", default=[500, 3000])
+    parser.add_argument("--days", type=int, default=750, help="trading days of history per symbol")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            histories = synthetic_histories(n, days=args.days)
+            store = PriceStore(os.path.join(tmp, f"store_{n}.sqlite"))
+            for symbol, hist in histories.items():
+                store.write(symbol, hist)
+            del histories
+            symbols = [f"SYM{i:05d}.NS" for i in range(n)]
+
+            frames_s, frames_mb, frames = traced(store.load, symbols)
+            held_frames = sum(f.memory_usage(deep=True).sum() for f in frames.values()) / 2**20
+            del frames
+            panel_s, panel_mb, panel = traced(store.load_panel, symbols, dtype=np.float32)
+            store.close()
+            print(f"{n:>6} symbols x {args.days} days: frames {held_frames:7.1f} MB held"
+                  f" ({frames_mb:7.1f} MB peak, {frames_s:.2f}s) → panel {panel.nbytes / 2**20:6.1f} MB held"
+                  f" ({panel_mb:6.1f} MB peak, {panel_s:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
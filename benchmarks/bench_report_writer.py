@@ -0,0 +1,110 @@
+"""
+Stock-List report: legacy to_excel → load_workbook → insert_cols → style → save
+path against the single-pass write-only writer.
+
+    python benchmarks/bench_report_writer.py 300 3000 30000
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from report_writer import green_fill, red_fill, write_stock_report  # noqa: E402
+from synthetic import synthetic_results  # noqa: E402
+
+
+def legacy_write(path, results, old_trends):
+    """The write-reload-rewrite path script.py used before the streaming writer."""
+    df = pd.DataFrame(results).T
+    df.to_excel(path)
+
+    wb = load_workbook(path)
+    ws = wb.active
+
+    trend_col_idx = None
+    for idx, cell in enumerate(ws[1], start=1):
+        if cell.value == "Trend":
+            trend_col_idx = idx
+            cell.value = "Current Trend"
+            break
+
+    last_updated_col_idx = None
+    for idx, cell in enumerate(ws[1], start=1):
+        if cell.value == "Last Updated":
+            last_updated_col_idx = idx
+            break
+
+    trend_change_col_idx = last_updated_col_idx or ws.max_column
+    ws.insert_cols(trend_change_col_idx)
+    ws.cell(row=1, column=trend_change_col_idx, value="Trend Change (vs Last Month)")
+
+    for row in range(2, ws.max_row + 1):
+        symbol = ws.cell(row=row, column=2).value
+        trend_cell = ws.cell(row=row, column=trend_col_idx)
+        trend_value = trend_cell.value
+        if trend_value == "Bullish":
+            trend_cell.fill = green_fill
+        elif trend_value == "Bearish":
+            trend_cell.fill = red_fill
+
+        trend_change_cell = ws.cell(row=row, column=trend_change_col_idx)
+        previous_trend = old_trends.get(symbol)
+        update_msg = ""
+        fill_to_apply = None
+        if previous_trend and trend_value and previous_trend != trend_value:
+            update_msg = f"{previous_trend} → {trend_value}"
+            if previous_trend == "Bearish" and trend_value == "Bullish":
+                fill_to_apply = green_fill
+            elif previous_trend == "Bullish" and trend_value == "Bearish":
+                fill_to_apply = red_fill
+        trend_change_cell.value = update_msg
+        if fill_to_apply:
+            trend_change_cell.fill = fill_to_apply
+
+    wb.save(path)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def cell_values(path):
+    ws = load_workbook(path, read_only=True).active
+    rows = []
+    for row in ws.iter_rows(values_only=True):
+        row = [c if c != "" else None for c in row]
+        while row and row[-1] is None:
+            row.pop()
+        rows.append(tuple(row))
+    return rows
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            results, old_trends = synthetic_results(n)
+            legacy_path = os.path.join(tmp, f"legacy_{n}.xlsx")
+            stream_path = os.path.join(tmp, f"stream_{n}.xlsx")
+            legacy_s, legacy_mb = measure(legacy_write, legacy_path, results, old_trends)
+            stream_s, stream_mb = measure(write_stock_report, stream_path, results, old_trends)
+            same = cell_values(legacy_path) == cell_values(stream_path)
+            print(f"{n:>7} rows | legacy {legacy_s:7.2f}s {legacy_mb:8.1f} MiB"
+                  f" | streaming {stream_s:7.2f}s {stream_mb:8.1f} MiB"
+                  f" | x{legacy_s / stream_s:4.1f} | same cells: {same}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [300, 3000, 30000])
@@ -0,0 +1,82 @@
+"""
+Record-and-replay for market-data responses, so benchmarks can run the
+fetch path without network access.
+
+Record once with network access (grouped Yahoo responses are saved as
+pickles under benchmarks/fixtures/):
+
+    python benchmarks/recorded.py record RELIANCE.NS TCS.NS INFY.NS
+
+Benchmarks then pass `replay_fetcher(...)` wherever fetch_histories goes.
+"""
+import glob
+import gzip
+import hashlib
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from batch_fetch import fetch_histories, split_frame  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture_key(symbols, period, interval, start):
+    raw = "|".join([",".join(sorted(symbols)), str(period), str(interval), str(start)])
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class RecordingDownloader:
+    """Wraps a grouped downloader and saves every response it returns."""
+
+    def __init__(self, downloader, fixture_dir=FIXTURE_DIR):
+        self.downloader = downloader
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def __call__(self, symbols, period="1y", interval="1d", start=None):
+        wide = self.downloader(symbols, period=period, interval=interval, start=start)
+        path = os.path.join(self.fixture_dir, fixture_key(symbols, period, interval, start) + ".pkl.gz")
+        with gzip.open(path, "wb") as f:
+            pickle.dump({"symbols": list(symbols), "wide": wide}, f)
+        return wide
+
+
+def load_recorded_histories(fixture_dir=FIXTURE_DIR):
+    """Every recorded response split back into {symbol: history frame}."""
+    histories = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.pkl.gz"))):
+        with gzip.open(path, "rb") as f:
+            recorded = pickle.load(f)
+        histories.update(split_frame(recorded["wide"], recorded["symbols"]))
+    return histories
+
+
+def replay_fetcher(histories):
+    """
+    A fetch_histories stand-in serving `histories` (recorded or synthetic).
+    Honours `start` so the price store's delta path is exercised too.
+    """
+    def fetch(symbols, period="1y", start=None, **kwargs):
+        out = {}
+        for symbol in symbols:
+            hist = histories.get(symbol)
+            if hist is None:
+                continue
+            if start is not None:
+                index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+                hist = hist[index >= start]
+            out[symbol] = hist
+        return out
+    return fetch
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "record":
+        print(__doc__)
+        sys.exit(1)
+    from batch_fetch import yahoo_download
+    got = fetch_histories(sys.argv[2:], downloader=RecordingDownloader(yahoo_download))
+    print(f"Recorded {len(got)} symbols into {FIXTURE_DIR}")
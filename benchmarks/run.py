@@ -0,0 +1,164 @@
+"""
+Offline benchmark suite: times each stage of the monthly report and the
+full script.py pipeline on synthetic (or recorded) market data, without
+network access. Results are saved per commit for later comparison.
+
+    python benchmarks/run.py                        # 300, 3000, 30000 symbols
+    python benchmarks/run.py --sizes 300 3000
+    python benchmarks/run.py --recorded             # replay benchmarks/fixtures/
+    python benchmarks/run.py --compare benchmarks/results/<sha>.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import Monitoring  # noqa: E402
+import Screener  # noqa: E402
+import script  # noqa: E402
+from indicators import compute_indicators  # noqa: E402
+from price_store import PriceStore, sync_store  # noqa: E402
+from recorded import load_recorded_histories, replay_fetcher  # noqa: E402
+from report_writer import write_stock_report  # noqa: E402
+from returns import (TREND_HORIZON, build_price_panel, build_price_panels, compute_returns, compute_trend,  # noqa: E402
+                     compute_trend_array)
+from synthetic import synthetic_histories, synthetic_holdings, synthetic_results  # noqa: E402
+
+DEFAULT_SIZES = [300, 3000, 30000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PER_SYMBOL_SAMPLE = 300   # the per-symbol get_returns_yahoo path is timed on a sample
+
+
+def git_revision():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def timed(timings, name, fn, *args, **kwargs):
+    """Run fn with its console output swallowed and record the wall time."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args, **kwargs)
+    timings[name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def bench_size(n, histories, tmp):
+    symbols = list(histories)[:n]
+    stocks = {f"Company {i:05d} Ltd": symbol for i, symbol in enumerate(symbols)}
+    fetch = replay_fetcher(histories)
+    now = datetime.now()
+    timings = {}
+
+    # Price store: cold sync writes every bar, the load is what later runs pay
+    store = PriceStore(os.path.join(tmp, f"store_{n}.sqlite"))
+    stored = timed(timings, "sync_store_cold", sync_store, store, symbols, fetch=fetch, today=now)
+    timed(timings, "price_store_load", store.load, symbols)
+    store.close()
+
+    panel = timed(timings, "build_price_panel", build_price_panel, stored)
+    returns = timed(timings, "compute_returns", compute_returns, panel, as_of=now)
+    panels = timed(timings, "build_price_panels_ohlc", build_price_panels, stored, ("Close", "High", "Low"))
+    timed(timings, "compute_indicators", compute_indicators, panels["Close"], panels["High"], panels["Low"])
+
+    sample = symbols[:PER_SYMBOL_SAMPLE]
+    timed(timings, "get_returns_yahoo_per_symbol",
+          lambda: [script.get_returns_yahoo(s, stored[s]) for s in sample if s in stored])
+    timings["get_returns_yahoo_per_symbol"] = round(
+        timings["get_returns_yahoo_per_symbol"] * n / max(1, len(sample)), 4)
+
+    pct = returns[TREND_HORIZON].astype(float).to_numpy()
+    timed(timings, "compute_trend_scalar", lambda: [compute_trend(None if np.isnan(p) else p) for p in pct])
+    timed(timings, "compute_trend_array", compute_trend_array, pct)
+
+    results, old_trends = synthetic_results(n)
+    timed(timings, "write_stock_report", write_stock_report, os.path.join(tmp, f"report_{n}.xlsx"),
+          results, old_trends)
+
+    holdings_path = os.path.join(tmp, f"holdings_{n}.csv")
+    synthetic_holdings(n, codes=["MCX", "NETSTO"], names=["Saksoft Ltd", "Dodla Dairy Ltd"]).to_csv(
+        holdings_path, index=False)
+    timed(timings, "screener_codes", Monitoring.process_portfolio_stocks, holdings_path)
+    timed(timings, "screener_names", Screener.process_portfolio_stocks, holdings_path)
+
+    # Whole monthly run against a fresh store and empty history folders
+    run_dir = os.path.join(tmp, f"run_{n}")
+    timed(timings, "pipeline", script.run_report, stocks, now=now, fetch=fetch,
+          store_path=os.path.join(run_dir, "price_history.sqlite"),
+          result_dir=os.path.join(run_dir, "result"),
+          previous_dir=os.path.join(run_dir, "previousdata"),
+          fallback_sources=[])
+    return timings
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n📊 {baseline['revision']} → {current['revision']}")
+    for n, timings in current["sizes"].items():
+        before = baseline["sizes"].get(n, {})
+        for stage, seconds in timings.items():
+            if stage in before and before[stage] > 0:
+                print(f"{n:>7} {stage:<30} {before[stage]:9.3f}s → {seconds:9.3f}s  x{before[stage] / max(seconds, 1e-9):5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the stock report pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--recorded", action="store_true", help="replay benchmarks/fixtures instead of synthetic data")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--output", help="results path (default benchmarks/results/<revision>.json)")
+    args = parser.parse_args()
+
+    if args.recorded:
+        histories = load_recorded_histories()
+        if not histories:
+            print("❌ No recorded fixtures found, run benchmarks/recorded.py record first")
+            return
+    else:
+        histories = synthetic_histories(max(args.sizes))
+
+    report = {
+        "revision": git_revision(),
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "data": "recorded" if args.recorded else "synthetic",
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            timings = bench_size(min(n, len(histories)), histories, tmp)
+            report["sizes"][str(n)] = timings
+            print(f"⏱️ {n:>7} symbols: " + ", ".join(f"{k} {v:.3f}s" for k, v in timings.items()))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
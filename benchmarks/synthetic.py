@@ -0,0 +1,102 @@
+"""
+Synthetic market data for offline benchmarks: a universe of fake NSE
+symbols, Yahoo-shaped daily history frames and matching holdings exports.
+"""
+import numpy as np
+import pandas as pd
+
+TRENDS = ["Bullish", "Bearish", "Neutral", None]
+
+
+def synthetic_universe(n):
+    """{company name: symbol} shaped like script.py's stocks dict."""
+    return {f"Company {i:05d} Ltd": f"SYM{i:05d}.NS" for i in range(n)}
+
+
+def synthetic_panel(n_symbols, days=260, end=None, seed=0, missing=0.02):
+    """
+    Dates x symbols close panel from a geometric random walk. Each symbol
+    gets a random listing date and a sprinkle of missing bars, so histories
+    are ragged like real ones.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+    dates = pd.bdate_range(end=end, periods=days)
+    steps = rng.normal(0.0003, 0.02, size=(days, n_symbols))
+    closes = 100 * np.exp(np.cumsum(steps, axis=0)) * rng.lognormal(0, 1, n_symbols)
+    listed = rng.integers(0, days // 2, n_symbols) * (rng.random(n_symbols) < 0.1)
+    closes[np.arange(days)[:, None] < listed] = np.nan
+    closes[rng.random((days, n_symbols)) < missing] = np.nan
+    closes[-1] = np.where(np.isnan(closes[-1]), closes[-2], closes[-1])
+    symbols = [f"SYM{i:05d}.NS" for i in range(n_symbols)]
+    return pd.DataFrame(np.round(closes, 2), index=dates, columns=symbols)
+
+
+def synthetic_histories(n_symbols, days=260, end=None, seed=0, tz="Asia/Kolkata"):
+    """{symbol: OHLCV frame} with a tz-aware index, as Ticker.history() returns."""
+    panel = synthetic_panel(n_symbols, days=days, end=end, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    index = panel.index.tz_localize(tz)
+    histories = {}
+    for symbol in panel.columns:
+        close = panel[symbol].to_numpy()
+        keep = ~np.isnan(close)
+        close = close[keep]
+        spread = np.abs(rng.normal(0, 0.01, len(close))) * close
+        histories[symbol] = pd.DataFrame({
+            "Open": close + rng.normal(0, 0.5, len(close)) * spread,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000, 1_000_000, len(close)).astype(float),
+        }, index=index[keep])
+    return histories
+
+
+def synthetic_results(n, seed=0):
+    """({name: report row}, {symbol: last month's trend}) for the report writer."""
+    rng = np.random.default_rng(seed)
+    results, old_trends = {}, {}
+    for i in range(n):
+        symbol = f"SYM{i:05d}"
+        trend = TRENDS[rng.integers(0, len(TRENDS))]
+        if i % 50 == 0:
+            results[f"Company {i} Ltd"] = {"Symbol": symbol, "Error": "Data not found", "Trend": None}
+            continue
+        results[f"Company {i} Ltd"] = {
+            "Symbol": symbol,
+            "Current Price (₹)": round(float(rng.lognormal(5, 1)), 2),
+            "1D %": None,
+            "1W %": round(float(rng.normal(0, 3)), 2),
+            "2W %": round(float(rng.normal(0, 5)), 2),
+            "1M %": round(float(rng.normal(0, 8)), 2),
+            "3M %": round(float(rng.normal(0, 12)), 2),
+            "6M %": round(float(rng.normal(0, 18)), 2),
+            "YTD %": round(float(rng.normal(0, 20)), 2),
+            "Trend": trend,
+            "Last Updated": "01-01-2026 00:00:00",
+        }
+        old_trends[symbol] = TRENDS[rng.integers(0, 3)]
+    return results, old_trends
+
+
+def synthetic_holdings(n_rows, codes=(), names=(), seed=0):
+    """
+    Holdings export laid out like PortFolioEqtSummary.csv: code in column A,
+    company name in B, market value in H. The given codes/names are mixed in
+    so the screeners have something to find.
+    """
+    rng = np.random.default_rng(seed)
+    stock_codes = [f"CODE{i:06d}" for i in range(n_rows)]
+    stock_names = [f"Holding {i:06d} Industries Ltd" for i in range(n_rows)]
+    for k, code in enumerate(codes):
+        stock_codes[(k * 7919) % n_rows] = code
+    for k, name in enumerate(names):
+        stock_names[(k * 104729 + 13) % n_rows] = name
+    filler = {f"Col{c}": rng.random(n_rows) for c in "CDEFG"}
+    return pd.DataFrame({
+        "Stock Code": stock_codes,
+        "Company Name": stock_names,
+        **filler,
+        "Market Value": np.round(rng.lognormal(10, 1.2, n_rows), 2),
+    })
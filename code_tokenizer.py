@@ -0,0 +1,57 @@
+"""
+Stock-code tokenizer for pasted broker/advisor call sheets.
+
+    python code_tokenizer.py calls.txt
+    pbpaste | python code_tokenizer.py
+
+Prints one cleaned, de-duplicated code per line. Input is read line by line,
+so large sheets are parsed in constant memory (plus the set of codes seen).
+"""
+import re
+import sys
+
+# -----------------------------
+# Precompiled patterns
+# -----------------------------
+ANNOTATION_RE = re.compile(r"\[[^\]\n]*\]")   # [target 540], [SL] ... may span words
+TOKEN_RE = re.compile(r"[^\s,]+")             # whitespace and commas both separate codes
+SUFFIX_RE = re.compile(r"-[A-Z]+$")           # exchange/series suffix: -EQ, -BE, -NSE
+NON_WORD_RE = re.compile(r"\W+")
+
+MARKERS = frozenset(["BUY", "OB"])            # call markers, not codes
+MIN_CODE_LENGTH = 2
+
+
+def iter_stock_codes(lines, unique=True):
+    """
+    Yield cleaned upper-case codes from an iterable of text lines in one
+    pass: bracket annotations are dropped, BUY/OB markers skipped, one
+    trailing -SUFFIX removed, slash-joined pairs split, and anything left
+    shorter than two characters ignored.
+    """
+    seen = set()
+    for line in lines:
+        for match in TOKEN_RE.finditer(ANNOTATION_RE.sub("", line)):
+            token = match.group()
+            if token in MARKERS:
+                continue
+            for part in SUFFIX_RE.sub("", token).split("/"):
+                code = NON_WORD_RE.sub("", part)
+                if len(code) < MIN_CODE_LENGTH:
+                    continue
+                code = code.upper()
+                if unique:
+                    if code in seen:
+                        continue
+                    seen.add(code)
+                yield code
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8", errors="replace") as f:
+            for code in iter_stock_codes(f):
+                print(code)
+    else:
+        for code in iter_stock_codes(sys.stdin):
+            print(code)
@@ -0,0 +1,138 @@
+import csv
+import json
+import os
+from datetime import date
+
+from returns import HORIZONS, TREND_HORIZON, TREND_THRESHOLD, TrendRule
+
+# -----------------------------
+# Universe, rule and watchlist files
+# -----------------------------
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+UNIVERSE_PATH = os.path.join(CONFIG_DIR, "universe.csv")
+RULES_PATH = os.path.join(CONFIG_DIR, "rules.json")
+SYMBOL_OVERRIDES_PATH = os.path.join(CONFIG_DIR, "symbol_overrides.csv")
+WATCHLIST_DIR = os.path.join(CONFIG_DIR, "watchlists")
+PORTFOLIO_CODES_PATH = os.path.join(WATCHLIST_DIR, "portfolio_codes.txt")
+SCREENER_NAMES_PATH = os.path.join(WATCHLIST_DIR, "screener_names.txt")
+MARKET_HOLIDAYS_PATH = os.path.join(CONFIG_DIR, "market_holidays.txt")
+
+DEFAULT_VARIANT = "default"
+RULE_HORIZONS = [*HORIZONS, "YTD %"]
+RULE_KEYS = {"horizon", "bullish_above", "bearish_below"}
+
+
+def read_structured(path):
+    """
+    Parse a JSON, TOML or YAML file. TOML needs Python 3.11+ (or tomli),
+    YAML needs PyYAML; JSON always works.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if ext == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError(f"{path}: TOML needs Python 3.11+ or `pip install tomli`")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if ext in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path}: YAML needs `pip install pyyaml`")
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    raise ValueError(f"{path}: unsupported config format '{ext}'")
+
+
+def _content_lines(f):
+    """Lines of a text config without blanks and # comments."""
+    for line in f:
+        if line.strip() and not line.lstrip().startswith("#"):
+            yield line
+
+
+def load_universe(path=UNIVERSE_PATH):
+    """
+    {company name: symbol} in file order. CSV files have name,symbol
+    columns; JSON/TOML/YAML files hold a {"stocks": {name: symbol}} table.
+    A repeated name keeps its first position and last symbol, like a dict.
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(_content_lines(f))
+            missing = {"name", "symbol"} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"{path}: missing column(s) {sorted(missing)}")
+            rows = [(row["name"], row["symbol"]) for row in reader]
+    else:
+        table = read_structured(path).get("stocks")
+        if not isinstance(table, dict):
+            raise ValueError(f"{path}: expected a 'stocks' table of name → symbol")
+        rows = list(table.items())
+
+    universe = {}
+    for line, (name, symbol) in enumerate(rows, start=1):
+        name, symbol = (name or "").strip(), (symbol or "").strip()
+        if not name or not symbol:
+            raise ValueError(f"{path}: entry {line} needs both a name and a symbol")
+        universe[name] = symbol
+    return universe
+
+
+def compile_rule(name, spec):
+    """Validate one rule definition and build its TrendRule."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"rule '{name}': expected a table, got {type(spec).__name__}")
+    unknown = set(spec) - RULE_KEYS
+    if unknown:
+        raise ValueError(f"rule '{name}': unknown key(s) {sorted(unknown)}")
+    horizon = spec.get("horizon", TREND_HORIZON)
+    if horizon not in RULE_HORIZONS:
+        raise ValueError(f"rule '{name}': horizon must be one of {RULE_HORIZONS}, got {horizon!r}")
+    upper = spec.get("bullish_above", TREND_THRESHOLD)
+    lower = spec.get("bearish_below", -TREND_THRESHOLD)
+    for key, value in (("bullish_above", upper), ("bearish_below", lower)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"rule '{name}': {key} must be a number, got {value!r}")
+    if lower > upper:
+        raise ValueError(f"rule '{name}': bearish_below ({lower}) is above bullish_above ({upper})")
+    return TrendRule(horizon, upper, lower, name=name)
+
+
+def load_rules(path=RULES_PATH):
+    """{variant: TrendRule} from a rules file's "variants" table; always has "default"."""
+    if not os.path.exists(path):
+        return {DEFAULT_VARIANT: TrendRule()}
+    variants = read_structured(path).get("variants") or {}
+    if not isinstance(variants, dict):
+        raise ValueError(f"{path}: 'variants' must be a table of rule definitions")
+    rules = {name: compile_rule(name, spec) for name, spec in variants.items()}
+    rules.setdefault(DEFAULT_VARIANT, TrendRule())
+    return rules
+
+
+def load_watchlist(path):
+    """Non-comment lines of a watchlist file (fed to the screeners' parsers)."""
+    with open(path, encoding="utf-8") as f:
+        return list(_content_lines(f))
+
+
+def load_holidays(path=MARKET_HOLIDAYS_PATH):
+    """
+    Exchange holidays as dates: one YYYY-MM-DD per line, anything after
+    the date is a free-text note. A missing file means no holidays.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        try:
+            return {date.fromisoformat(line.split()[0]) for line in _content_lines(f)}
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}")
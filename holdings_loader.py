@@ -0,0 +1,111 @@
+import glob
+import hashlib
+import os
+import zipfile
+
+import pandas as pd
+
+# -----------------------------
+# Holdings export loader (format sniffing + parsed-file cache)
+# -----------------------------
+HOLDINGS_COLUMNS = [0, 1, 7]   # A: stock code, B: company name, H: market value
+DEFAULT_CACHE_DIR = "cache/holdings"
+CACHE_KEEP = 20                # parsed exports kept on disk
+CACHE_VERSION = "1"            # bump when the parsing below changes
+
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"   # legacy .xls
+ZIP_MAGIC = b"PK\x03\x04"                          # .xlsx / .xlsb / .ods
+EXCEL_ENGINES = ['openpyxl', 'xlrd', 'calamine', 'odf']
+
+
+def sniff_engine(path):
+    """
+    pandas engine for a holdings export judged by its leading bytes rather
+    than its extension: 'csv' for plain text, else a read_excel engine.
+    """
+    with open(path, "rb") as f:
+        head = f.read(8)
+    if head.startswith(OLE_MAGIC):
+        return "xlrd"
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(path) as z:
+                names = set(z.namelist())
+                if "mimetype" in names and b"opendocument" in z.read("mimetype"):
+                    return "odf"
+                if "xl/workbook.bin" in names:
+                    return "calamine"
+        except zipfile.BadZipFile:
+            pass
+        return "openpyxl"
+    return "csv"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _parse(path, engine, usecols):
+    if engine == "csv":
+        return pd.read_csv(path, usecols=usecols)
+    try:
+        return pd.read_excel(path, engine=engine, usecols=usecols)
+    except ImportError:
+        # Sniffed engine not installed here; try the others like before
+        for other in EXCEL_ENGINES:
+            if other == engine:
+                continue
+            try:
+                return pd.read_excel(path, engine=other, usecols=usecols)
+            except Exception:
+                continue
+        raise
+
+
+def _prune_cache(cache_dir, keep=CACHE_KEEP):
+    entries = sorted(glob.glob(os.path.join(cache_dir, "*.pkl")), key=os.path.getmtime, reverse=True)
+    for stale in entries[keep:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def load_holdings(path, usecols=HOLDINGS_COLUMNS, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Columns `usecols` (by position) of a holdings export, CSV or any Excel
+    flavour. Parsed frames are cached under `cache_dir` keyed by a hash of
+    the file contents, so re-screening an unchanged export skips parsing.
+    Pass cache_dir=None to always parse.
+    """
+    cache_path = None
+    if cache_dir:
+        key = f"{file_digest(path)}-{'_'.join(map(str, usecols))}-v{CACHE_VERSION}"
+        cache_path = os.path.join(cache_dir, key + ".pkl")
+        if os.path.exists(cache_path):
+            try:
+                df = pd.read_pickle(cache_path)
+                os.utime(cache_path)
+                print("✅ Loaded from holdings cache")
+                return df
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable holdings cache {cache_path} → {e}")
+
+    engine = sniff_engine(path)
+    df = _parse(path, engine, usecols)
+    print("✅ Loaded as CSV" if engine == "csv" else f"✅ Loaded with {engine} engine")
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_path + ".tmp"
+            df.to_pickle(tmp)
+            os.replace(tmp, cache_path)
+            _prune_cache(cache_dir)
+        except OSError as e:
+            print(f"⚠️ Could not cache holdings → {e}")
+    return df
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from returns import build_price_panels
+
+# -----------------------------
+# Vectorized technical-indicator engine
+# -----------------------------
+# Every indicator runs over whole dates x symbols arrays at once. Each
+# symbol's bars are first pushed to the bottom of its column (as in
+# compute_returns), so a column reads like that symbol's own history with
+# only leading NaNs, and moving averages / smoothing are O(bars) passes:
+# cumulative sums for simple averages, the recursive form for EMAs.
+SMA_FAST, SMA_SLOW = 50, 200
+EMA_FAST, EMA_SLOW = 12, 26
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+WEEK52_BARS = 252
+CROSS_RECENT_BARS = 5   # a crossover this recent is flagged "(new)"
+
+INDICATOR_COLUMNS = [
+    "SMA 50/200", "EMA 12/26", "RSI 14", "ATR 14 %",
+    "From 52W High %", "From 52W Low %", "Max Drawdown %",
+]
+
+
+def _compact(values, valid):
+    """Stable-sort each column's valid bars to the bottom (time order kept)."""
+    order = np.argsort(valid, axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def rolling_mean(x, window):
+    """Trailing `window`-bar mean per column via cumulative sums; NaN until the window is full."""
+    rows = x.shape[0]
+    out = np.full_like(x, np.nan)
+    if window > rows:
+        return out
+    csum = np.cumsum(np.nan_to_num(x), axis=0)
+    seen = np.cumsum(~np.isnan(x), axis=0)
+    total = csum[window - 1:].copy()
+    total[1:] -= csum[:-window]
+    out[window - 1:] = total / window
+    out[seen < window] = np.nan
+    return out
+
+
+def ema(x, alpha, min_periods=1):
+    """
+    Recursive exponential average per column (pandas ewm(adjust=False)),
+    seeded with each column's first value; NaN before `min_periods` bars.
+    """
+    out = np.full_like(x, np.nan)
+    prev = np.full(x.shape[1], np.nan)
+    for t in range(x.shape[0]):
+        cur = x[t]
+        prev = np.where(np.isnan(prev), cur, prev + alpha * (cur - prev))
+        out[t] = prev
+    out[np.cumsum(~np.isnan(x), axis=0) < min_periods] = np.nan
+    return out
+
+
+def crossover(fast, slow, above, below):
+    """Label for the fast/slow relation on the last bar, "(new)" if it flipped recently."""
+    diff = np.sign(fast - slow)
+    last = diff[-1]
+    labels = np.where(last > 0, above, below).astype(object)
+    recent = diff[-(CROSS_RECENT_BARS + 1):]
+    flipped = (recent[:-1] != last).any(axis=0) & ~np.isnan(recent).any(axis=0)
+    labels[flipped] = labels[flipped] + " (new)"
+    labels[np.isnan(last) | (last == 0)] = None
+    return labels
+
+
+def rsi(close, period=RSI_PERIOD):
+    """Wilder's RSI on the last bar (smoothing seeded by the first change)."""
+    change = np.diff(close, axis=0)
+    gain = ema(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), 1 / period, period)[-1]
+    loss = ema(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), 1 / period, period)[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - 100 / (1 + gain / loss)
+    return np.where((loss == 0) & ~np.isnan(gain), 100.0, value)
+
+
+def atr_pct(close, high, low, period=ATR_PERIOD):
+    """Wilder's average true range on the last bar, as % of the last close."""
+    prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return ema(true_range, 1 / period, period)[-1] / close[-1] * 100
+
+
+def max_drawdown_pct(close):
+    """Deepest fall from a running peak over the window, in % (0 or negative)."""
+    peak = np.fmax.accumulate(close, axis=0)
+    return np.nanmin(close / peak - 1, axis=0, initial=0.0) * 100
+
+
+def compute_indicators(close, high=None, low=None):
+    """
+    Indicator columns for every symbol of a dates x symbols close panel
+    (High/Low panels from build_price_panels enable ATR and use true
+    highs/lows for the 52-week distances). Values are rounded like the
+    returns and None where a symbol has too few bars.
+    """
+    if close.empty:
+        return pd.DataFrame(columns=INDICATOR_COLUMNS)
+    values = close.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    compact, order = _compact(values, valid)
+
+    def aligned(panel):
+        if panel is None:
+            return None
+        raw = panel.reindex(index=close.index, columns=close.columns).to_numpy(dtype=np.float64)
+        raw = np.where(valid, np.where(np.isnan(raw), values, raw), np.nan)  # no high/low → the close
+        return np.take_along_axis(raw, order, axis=0)
+
+    high, low = aligned(high), aligned(low)
+    current = compact[-1]
+    window = compact[-WEEK52_BARS:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = {
+            "SMA 50/200": crossover(rolling_mean(compact, SMA_FAST), rolling_mean(compact, SMA_SLOW),
+                                    "Golden Cross", "Death Cross"),
+            "EMA 12/26": crossover(ema(compact, 2 / (EMA_FAST + 1), EMA_FAST),
+                                   ema(compact, 2 / (EMA_SLOW + 1), EMA_SLOW), "Bullish", "Bearish"),
+            "RSI 14": rsi(compact),
+            "ATR 14 %": atr_pct(compact, high, low) if high is not None and low is not None
+            else np.full_like(current, np.nan),
+            "From 52W High %": (current / np.nanmax(window if high is None else high[-WEEK52_BARS:], axis=0,
+                                                    initial=-np.inf) - 1) * 100,
+            "From 52W Low %": (current / np.nanmin(window if low is None else low[-WEEK52_BARS:], axis=0,
+                                                   initial=np.inf) - 1) * 100,
+            "Max Drawdown %": max_drawdown_pct(compact),
+        }
+
+    frame = {}
+    for column, data in out.items():
+        if data.dtype == object:
+            frame[column] = data
+            continue
+        data = np.round(data, 2)
+        column_values = data.astype(object)
+        column_values[~np.isfinite(data)] = None
+        frame[column] = column_values
+    result = pd.DataFrame(frame, index=close.columns, columns=INDICATOR_COLUMNS, dtype=object)
+    return result[counts > 0]
+
+
+def indicators_from_histories(histories):
+    """compute_indicators straight from {symbol: OHLCV frame}."""
+    panels = build_price_panels(histories, ("Close", "High", "Low"))
+    return compute_indicators(panels["Close"], panels["High"], panels["Low"])
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# -----------------------------
+# Per-run spans, counters and latency histograms
+# -----------------------------
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]  # seconds, upper bounds
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class RunMetrics:
+    """Collects timings for one run; thread-safe so fetch workers can report too."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = datetime.now()
+            self.spans = defaultdict(list)       # name -> [seconds]
+            self.counters = defaultdict(int)     # name -> total
+            self.histograms = defaultdict(list)  # name -> [seconds]
+            self.slowest = defaultdict(dict)     # name -> {symbol: seconds}
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.spans[name].append(elapsed)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name, seconds, symbol=None):
+        """Record one latency sample (per-symbol when `symbol` is given)."""
+        with self._lock:
+            self.histograms[name].append(seconds)
+            if symbol is not None:
+                self.slowest[name][symbol] = seconds
+
+    def summary(self):
+        with self._lock:
+            spans = {
+                name: {
+                    "count": len(values),
+                    "total_s": round(sum(values), 4),
+                    "max_s": round(max(values), 4),
+                }
+                for name, values in self.spans.items()
+            }
+            histograms = {}
+            for name, values in self.histograms.items():
+                ordered = sorted(values)
+                buckets = {f"le_{b}": sum(1 for v in ordered if v <= b) for b in LATENCY_BUCKETS}
+                buckets["le_inf"] = len(ordered)
+                slowest = sorted(self.slowest[name].items(), key=lambda kv: kv[1], reverse=True)[:10]
+                histograms[name] = {
+                    "count": len(ordered),
+                    "p50_s": round(_percentile(ordered, 0.5), 4),
+                    "p95_s": round(_percentile(ordered, 0.95), 4),
+                    "max_s": round(ordered[-1], 4),
+                    "buckets": buckets,
+                    "slowest": {symbol: round(s, 4) for symbol, s in slowest},
+                }
+            return {
+                "started": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+                "wall_s": round((datetime.now() - self.started).total_seconds(), 4),
+                "spans": spans,
+                "counters": dict(self.counters),
+                "histograms": histograms,
+            }
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+
+# Process-wide collector used by the fetch modules and script.py
+metrics = RunMetrics()
+
+
+def span(name):
+    return metrics.span(name)
+
+
+def count(name, n=1):
+    metrics.count(name, n)
+
+
+def observe(name, seconds, symbol=None):
+    metrics.observe(name, seconds, symbol)
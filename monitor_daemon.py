@@ -0,0 +1,438 @@
+"""
+Intraday monitor: keeps the universe's recent closes in memory, polls last
+prices during NSE market hours and writes only rows whose returns or trend
+changed.
+
+    python monitor_daemon.py                    # live, NSE quotes every 60s
+    python monitor_daemon.py --interval 120
+    python monitor_daemon.py --simulate 500     # fake clock + fake feed, no network
+    python monitor_daemon.py --holidays config/market_holidays.txt
+
+The schedule knows weekends only. Exchange holidays come from a file of
+YYYY-MM-DD lines (config/market_holidays.txt when present); without one
+the monitor polls on a holiday and simply sees no price changes.
+
+Stop with Ctrl+C or SIGTERM; the current poll finishes and the sink is flushed.
+"""
+import argparse
+import csv
+import os
+import signal
+import threading
+from collections import deque
+from datetime import datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from price_panel import PricePanel
+from returns import HORIZONS, RETURN_COLUMNS, TREND_HORIZON, compute_trend
+
+# -----------------------------
+# Market hours + clocks
+# -----------------------------
+MARKET_TZ = ZoneInfo("Asia/Kolkata")
+MARKET_OPEN = dtime(9, 15)
+MARKET_CLOSE = dtime(15, 30)
+POLL_SECONDS = 60
+MAX_BARS = max(HORIZONS.values()) + 1   # enough closes for the longest horizon
+OUTPUT_DIR = "result"
+
+
+class MarketSchedule:
+    """
+    Weekday trading session in exchange time, minus `holidays` (dates).
+    No exchange calendar is bundled: unlisted holidays count as trading days.
+    """
+
+    def __init__(self, open_time=MARKET_OPEN, close_time=MARKET_CLOSE, tz=MARKET_TZ, holidays=()):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.tz = tz
+        self.holidays = set(holidays)
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def is_open(self, now):
+        now = now.astimezone(self.tz)
+        return self.is_trading_day(now.date()) and self.open_time <= now.time() <= self.close_time
+
+    def next_open(self, now):
+        now = now.astimezone(self.tz)
+        day = now.date()
+        if now.time() >= self.open_time:
+            day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return datetime.combine(day, self.open_time, tzinfo=self.tz)
+
+    def next_poll(self, now, interval):
+        """When to poll next: `interval` from now while open (one last poll at
+        the close), else the next session's open."""
+        now = now.astimezone(self.tz)
+        if self.is_open(now):
+            close = datetime.combine(now.date(), self.close_time, tzinfo=self.tz)
+            nxt = now + timedelta(seconds=interval)
+            if nxt <= close:
+                return nxt
+            if now < close:
+                return close
+        return self.next_open(now)
+
+
+class SystemClock:
+    """Wall clock whose sleep returns early when `stop_event` is set."""
+
+    def __init__(self, tz=MARKET_TZ):
+        self.tz = tz
+
+    def now(self):
+        return datetime.now(self.tz)
+
+    def sleep(self, seconds, stop_event):
+        stop_event.wait(max(0.0, seconds))
+
+
+class FakeClock:
+    """Deterministic clock for the harness: sleep() just moves time forward."""
+
+    def __init__(self, start):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def sleep(self, seconds, stop_event):
+        self.current += timedelta(seconds=max(0.0, seconds))
+
+
+# -----------------------------
+# Price feeds
+# -----------------------------
+def is_nse_symbol(symbol):
+    """NSE listings: "XYZ.NS" or a bare "XYZ" (anything else, e.g. "XYZ.BO", is another exchange)."""
+    return "." not in symbol or symbol.endswith(".NS")
+
+
+class NSEFeed:
+    """
+    Last traded prices for NSE symbols through the shared NSE client.
+    Other listings go to `other` (a feed), or are skipped when it is None.
+    """
+
+    def __init__(self, client=None, other=None):
+        self.client = client
+        self.other = other
+        self.skipped = set()
+
+    def latest(self, symbols):
+        from nse_client import get_nse_client
+        nse = [symbol for symbol in symbols if is_nse_symbol(symbol)]
+        rest = [symbol for symbol in symbols if not is_nse_symbol(symbol)]
+        out = {}
+        if nse:
+            client = self.client or get_nse_client()
+            bare = {symbol.removesuffix(".NS"): symbol for symbol in nse}
+            prices = client.last_prices(list(bare))
+            out.update((bare[s], p) for s, p in prices.items() if p)
+        if rest and self.other is not None:
+            out.update(self.other.latest(rest))
+        elif rest and not self.skipped.issuperset(rest):
+            self.skipped.update(rest)
+            print(f"⚠️ Not polling {len(rest)} non-NSE symbols (no feed for them): {', '.join(sorted(rest)[:5])}")
+        return out
+
+
+class YahooQuoteFeed:
+    """Last prices from Yahoo quotes, for listings the NSE API cannot quote (e.g. .BO)."""
+
+    def latest(self, symbols):
+        from async_fetch import fetch_all
+        from batch_fetch import yahoo_last_price
+        # No per-symbol latency samples: the daemon never resets the run metrics
+        prices = fetch_all(symbols, yahoo_last_price, observe_latency=False)
+        return {symbol: price for symbol, price in prices.items() if price}
+
+
+class FakeFeed:
+    """Seeded random-walk prices (and matching seed histories) for the harness."""
+
+    def __init__(self, symbols, seed=0, volatility=0.004):
+        self.rng = np.random.default_rng(seed)
+        self.volatility = volatility
+        self.prices = {s: float(p) for s, p in zip(symbols, self.rng.lognormal(5, 1, len(symbols)))}
+
+    def history(self, days=MAX_BARS + 5, end=None):
+        """{symbol: [(date, close), ...]} ending the day before `end`."""
+        end = (end or datetime.now(MARKET_TZ)).date()
+        dates = [end - timedelta(days=k) for k in range(days * 2, 0, -1)]
+        dates = [d for d in dates if d.weekday() < 5][-days:]
+        out = {}
+        for symbol, price in self.prices.items():
+            steps = np.cumsum(self.rng.normal(0, 0.02, len(dates)))
+            walk = price * np.exp(steps - steps[-1])
+            out[symbol] = list(zip(dates, np.round(walk, 2).tolist()))
+        return out
+
+    def latest(self, symbols):
+        out = {}
+        for symbol in symbols:
+            if symbol in self.prices:
+                self.prices[symbol] *= float(np.exp(self.rng.normal(0, self.volatility)))
+                out[symbol] = round(self.prices[symbol], 2)
+        return out
+
+
+# -----------------------------
+# Incremental per-symbol returns
+# -----------------------------
+def _pct(current, base):
+    return (current / base - 1) * 100 if base else np.nan
+
+
+class SymbolState:
+    """
+    The last MAX_BARS daily closes (today's bar is updated in place), the
+    total bar count and the year's first close: all returns.compute_returns
+    needs, so one new price costs O(horizons).
+    """
+    __slots__ = ("closes", "bars", "last_date", "ytd_base", "ytd_date")
+
+    def __init__(self):
+        self.closes = deque(maxlen=MAX_BARS)
+        self.bars = 0
+        self.last_date = None
+        self.ytd_base = None
+        self.ytd_date = None
+
+    def push(self, day, price):
+        """Apply a close (or intraday last price) for `day`; False if nothing changed."""
+        if day == self.last_date:
+            if self.closes[-1] == price:
+                return False
+            self.closes[-1] = price
+        else:
+            self.closes.append(price)
+            self.bars += 1
+            self.last_date = day
+        if self.ytd_date is None or self.ytd_date.year != day.year or self.ytd_date == day:
+            self.ytd_base, self.ytd_date = price, day
+        return True
+
+    def load(self, dates, closes):
+        """Replace the state with a whole history (datetime64[D] dates, closes), oldest first."""
+        if not len(dates):
+            return
+        years = dates.astype("datetime64[Y]")
+        first = int(np.searchsorted(years, years[-1]))
+        self.closes = deque((float(c) for c in closes[-MAX_BARS:]), maxlen=MAX_BARS)
+        self.bars = len(dates)
+        self.last_date = dates[-1].item()
+        self.ytd_base, self.ytd_date = float(closes[first]), dates[first].item()
+
+    def returns(self, year):
+        """This symbol's row of returns.compute_returns as of `year`."""
+        current = self.closes[-1]
+        row = {"Current Price (₹)": float(np.round(current, 2))}
+        for column, days in HORIZONS.items():
+            raw = _pct(current, self.closes[-days]) if self.bars > days else np.nan
+            if np.isnan(raw) or (column != TREND_HORIZON and raw == 0):
+                row[column] = None
+            else:
+                row[column] = float(np.round(raw, 2))
+        ytd = self.ytd_base if self.ytd_date is not None and self.ytd_date.year == year else None
+        row["YTD %"] = float(np.round(_pct(current, ytd), 2)) if ytd else None
+        three_month = row[TREND_HORIZON]
+        row["Trend"] = compute_trend(three_month) if three_month is not None else None
+        return row
+
+
+# -----------------------------
+# Sinks
+# -----------------------------
+class CsvChangeSink:
+    """Appends changed rows to one CSV per trading day (result/monitor_YYYY-MM-DD.csv)."""
+    FIELDS = ["Time", "Name", "Symbol", *RETURN_COLUMNS, "Trend Change"]
+
+    def __init__(self, folder=OUTPUT_DIR):
+        self.folder = folder
+        self.day = None
+        self.file = None
+        self.writer = None
+
+    def _open(self, day):
+        self.close()
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, f"monitor_{day}.csv")
+        new = not os.path.exists(path)
+        self.file = open(path, "a", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+        if new:
+            self.writer.writeheader()
+        self.day = day
+
+    def write(self, when, changes):
+        if not changes:
+            return
+        day = when.strftime("%Y-%m-%d")
+        if day != self.day:
+            self._open(day)
+        stamp = when.strftime("%d-%m-%Y %H:%M:%S")
+        for change in changes:
+            self.writer.writerow({"Time": stamp, **change})
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class PrintSink:
+    def write(self, when, changes):
+        for change in changes:
+            flip = f" | {change['Trend Change']}" if change.get("Trend Change") else ""
+            print(f"🔔 {when:%H:%M:%S} {change['Symbol']:<12} ₹{change['Current Price (₹)']:>10,.2f}"
+                  f" | 3M {change['3M %']} | {change['Trend']}{flip}")
+
+    def close(self):
+        pass
+
+
+# -----------------------------
+# Monitor loop
+# -----------------------------
+class Monitor:
+    """
+    Polls `feed` on `schedule` and sends rows whose returns changed (and
+    trend flips) to `sink`. Memory is bounded by the universe size: each
+    symbol keeps MAX_BARS closes and its last written row.
+    """
+
+    def __init__(self, universe, feed, sink, clock=None, schedule=None, interval=POLL_SECONDS):
+        self.universe = dict(universe)            # name -> symbol
+        self.names = {symbol: name for name, symbol in self.universe.items()}
+        self.feed = feed
+        self.sink = sink
+        self.clock = clock or SystemClock()
+        self.schedule = schedule or MarketSchedule()
+        self.interval = interval
+        self.states = {symbol: SymbolState() for symbol in self.names}
+        self.last_rows = {}
+        self.polls = 0
+        self.stop_event = threading.Event()
+
+    def seed(self, histories):
+        """
+        Load a PricePanel, {symbol: [(date, close), ...]} or {symbol: history
+        frame} as the starting bars.
+        """
+        if isinstance(histories, PricePanel):
+            for symbol in histories.symbols:
+                state = self.states.get(symbol)
+                if state is not None:
+                    state.load(*histories.series(symbol))
+                    if state.bars:
+                        self.last_rows[symbol] = state.returns(state.last_date.year)
+            return
+        for symbol, hist in histories.items():
+            state = self.states.get(symbol)
+            if state is None or hist is None:
+                continue
+            if hasattr(hist, "columns"):
+                closes = hist["Close"].dropna()
+                hist = zip((ts.date() for ts in closes.index), closes.tolist())
+            for day, close in hist:
+                state.push(day, float(close))
+            if state.bars:
+                self.last_rows[symbol] = state.returns(state.last_date.year)
+
+    def poll_once(self):
+        """One feed call; returns the changed rows it wrote."""
+        now = self.clock.now().astimezone(self.schedule.tz)
+        prices = self.feed.latest(list(self.states))
+        changes = []
+        for symbol, price in prices.items():
+            state = self.states.get(symbol)
+            if state is None or not state.push(now.date(), float(price)):
+                continue
+            row = state.returns(now.year)
+            previous = self.last_rows.get(symbol)
+            if row == previous:
+                continue
+            self.last_rows[symbol] = row
+            flip = ""
+            if previous and previous.get("Trend") and row["Trend"] and previous["Trend"] != row["Trend"]:
+                flip = f"{previous['Trend']} → {row['Trend']}"
+            changes.append({"Name": self.names[symbol], "Symbol": symbol, **row, "Trend Change": flip})
+        self.polls += 1
+        self.sink.write(now, changes)
+        return changes
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+    def run(self, max_polls=None):
+        """Poll until stopped (signal, stop() or `max_polls`), then close the sink."""
+        try:
+            while not self.stop_event.is_set():
+                now = self.clock.now()
+                if self.schedule.is_open(now):
+                    try:
+                        self.poll_once()
+                    except Exception as e:
+                        print(f"❌ Poll failed → {e}")
+                    if max_polls is not None and self.polls >= max_polls:
+                        break
+                wake = self.schedule.next_poll(self.clock.now(), self.interval)
+                self.clock.sleep((wake - self.clock.now()).total_seconds(), self.stop_event)
+        finally:
+            self.sink.close()
+            print(f"🛑 Monitor stopped after {self.polls} polls")
+
+    def install_signal_handlers(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intraday stock monitor")
+    parser.add_argument("--interval", type=int, default=POLL_SECONDS, help="seconds between polls while open")
+    parser.add_argument("--simulate", type=int, metavar="POLLS", help="run POLLS polls on a fake clock and feed")
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--universe", default=None, help="universe file (default config/universe.csv)")
+    parser.add_argument("--holidays", default=None,
+                        help="exchange holidays, one YYYY-MM-DD per line (default config/market_holidays.txt)")
+    args = parser.parse_args()
+    if args.holidays and not os.path.exists(args.holidays):
+        parser.error(f"holiday file not found: {args.holidays}")
+
+    from config import load_holidays, load_universe
+    from script import PRICE_STORE_PATH
+    stocks = load_universe(args.universe) if args.universe else load_universe()
+    holidays = load_holidays(args.holidays) if args.holidays else load_holidays()
+    schedule = MarketSchedule(holidays=holidays)
+    if not holidays:
+        print("⚠️ No exchange holiday list: only weekends are skipped")
+
+    if args.simulate:
+        clock = FakeClock(schedule.next_open(datetime.now(MARKET_TZ)))
+        feed = FakeFeed(list(stocks.values()))
+        monitor = Monitor(stocks, feed, CsvChangeSink(args.output), clock=clock, schedule=schedule,
+                          interval=args.interval)
+        monitor.seed(feed.history(end=clock.now()))
+    else:
+        from price_store import PriceStore, sync_store
+        monitor = Monitor(stocks, NSEFeed(other=YahooQuoteFeed()), CsvChangeSink(args.output),
+                          schedule=schedule, interval=args.interval)
+        with PriceStore(PRICE_STORE_PATH) as store:
+            monitor.seed(sync_store(store, list(stocks.values()), as_panel=True))
+
+    monitor.install_signal_handlers()
+    print(f"👀 Monitoring {len(stocks)} symbols every {args.interval}s during market hours")
+    monitor.run(max_polls=args.simulate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import re
+from collections import defaultdict
+
+# -----------------------------
+# Holdings name index for the fuzzy screener
+# -----------------------------
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _text(value):
+    """Cell text; blank cells (None/NaN) index as empty strings."""
+    if value is None or value != value:
+        return ""
+    return str(value)
+
+
+class NameIndex:
+    """
+    Lookup structures over a holdings name column, built once per file:
+    normalized name -> first row, first word -> first row, and word token ->
+    rows for whole-word containment. Rows are positions into `names`.
+    """
+
+    def __init__(self, names):
+        self.names = [_text(v) for v in names]
+        self.exact = {}
+        self.first_word = {}
+        postings = defaultdict(set)
+        for row, name in enumerate(self.names):
+            normalized = name.strip().upper()
+            self.exact.setdefault(normalized, row)
+            words = normalized.split()
+            if words:
+                self.first_word.setdefault(words[0], row)
+            for token in TOKEN_RE.findall(normalized):
+                postings[token].add(row)
+        self.postings = dict(postings)
+
+    def contains(self, name_upper):
+        """First row containing `name_upper` as whole words (case-insensitive), else None."""
+        tokens = set(TOKEN_RE.findall(name_upper))
+        if not tokens:
+            return None
+        # Intersect smallest posting set first; set & set walks the smaller side
+        postings = sorted((self.postings.get(t, set()) for t in tokens), key=len)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            if not candidates:
+                return None
+            candidates = candidates & rows
+        # Every query token is a whole token of any real match, so the regex
+        # only has to confirm order and punctuation on the few candidates
+        pattern = re.compile(r"\b" + re.escape(name_upper) + r"\b", re.IGNORECASE)
+        for row in sorted(candidates):
+            if pattern.search(self.names[row]):
+                return row
+        return None
+
+    def match(self, stock_name):
+        """Row for a watchlist name using the screener's four-step precedence."""
+        name_upper = stock_name.upper().strip()
+        words = stock_name.split()
+
+        # STEP 1: Exact match
+        row = self.exact.get(name_upper)
+
+        # STEP 2: Full name contains (if multi-word input)
+        if row is None and len(words) > 1:
+            row = self.contains(name_upper)
+
+        # STEP 3: Input matches FIRST WORD of Excel name
+        if row is None:
+            row = self.first_word.get(name_upper)
+
+        # STEP 4: Input first word matches Excel first word (multi-word fallback)
+        if row is None and len(words) > 1:
+            row = self.first_word.get(words[0].strip().upper())
+        return row
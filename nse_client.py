@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import count
+
+# -----------------------------
+# Pooled NSE quote client
+# -----------------------------
+NSE_BASE_URL = "https://www.nseindia.com"
+QUOTE_PATH = "/api/quote-equity"
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 8
+DEFAULT_WORKERS = 4
+COOKIE_EXPIRED = (401, 403)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json",
+    "Referer": "https://www.nseindia.com/"
+}
+
+
+class NSEClient:
+    """
+    One keep-alive session for every NSE request. The homepage is loaded
+    once to obtain cookies, and again only when the API answers 401/403.
+    """
+
+    def __init__(self, base_url=NSE_BASE_URL, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.warm = False
+        self.generation = 0  # bumped on every cookie refresh
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def warm_up(self, stale_generation=None):
+        """
+        Load the homepage for cookies: once, or again when the cookies of
+        `stale_generation` were rejected and no other thread refreshed them yet.
+        """
+        with self._lock:
+            if self.warm and stale_generation != self.generation:
+                return
+            r = self.session.get(self.base_url, timeout=self.timeout)
+            self.bytes_received += len(r.content)
+            count("nse_bytes_fetched", len(r.content))
+            count("nse_cookie_refreshes")
+            self.warm = True
+            self.generation += 1
+
+    def _get_quote(self, symbol):
+        r = self.session.get(self.base_url + QUOTE_PATH, params={"symbol": symbol}, timeout=self.timeout)
+        self.bytes_received += len(r.content)
+        count("nse_bytes_fetched", len(r.content))
+        return r
+
+    def quote(self, symbol):
+        """Full quote-equity payload for one symbol."""
+        self.warm_up()
+        generation = self.generation
+        r = self._get_quote(symbol)
+        if r.status_code in COOKIE_EXPIRED:
+            self.warm_up(stale_generation=generation)
+            r = self._get_quote(symbol)
+        r.raise_for_status()
+        return r.json()
+
+    def last_price(self, symbol):
+        return self.quote(symbol)['priceInfo']['lastPrice']
+
+    def last_prices(self, symbols, workers=DEFAULT_WORKERS):
+        """
+        {symbol: last price or None} for many symbols, sharing the warmed
+        cookies and pooled connections across a few worker threads.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        try:
+            self.warm_up()
+        except Exception as e:
+            print(f"NSE warm-up failed → {e}")
+            return {symbol: None for symbol in symbols}
+
+        def one(symbol):
+            try:
+                return symbol, self.last_price(symbol)
+            except Exception as e:
+                print(f"NSE fetch failed for {symbol} → {e}")
+                return symbol, None
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(pool.map(one, symbols))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_nse_client():
+    """Process-wide shared client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NSEClient()
+        return _client
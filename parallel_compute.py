@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute_indicators
+from returns import DEFAULT_RULE, compute_returns
+
+# -----------------------------
+# Process-pool returns/indicator stage
+# -----------------------------
+# The aligned panels are copied once into shared memory; each worker maps
+# them and computes a contiguous block of symbol columns, so only the
+# dates, the block's symbol names and the small result rows are pickled.
+PARALLEL_MIN_SYMBOLS = 2000   # below this the pool costs more than it saves
+SHARDS_PER_WORKER = 1
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _compute_shard(task):
+    """Worker: returns (+ indicators) rows for columns [start, stop) of the shared panels."""
+    segments, shape, dates, symbols, start, stop, as_of, rule, indicators = task
+    handles, panels = [], {}
+    try:
+        for field, name in segments.items():
+            shm = _attach(name)
+            handles.append(shm)
+            view = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[:, start:stop]
+            panels[field] = pd.DataFrame(view, index=dates, columns=symbols, copy=False)
+        return compute_rows(panels, as_of, rule, indicators)
+    finally:
+        panels.clear()
+        for shm in handles:
+            shm.close()
+
+
+def compute_rows(panels, as_of=None, rule=DEFAULT_RULE, indicators=False):
+    """{symbol: returns row (+ indicator columns)} for one set of panels, in-process."""
+    rows = compute_returns(panels["Close"], as_of=as_of, rule=rule).to_dict("index")
+    if indicators:
+        extra = compute_indicators(panels["Close"], panels.get("High"), panels.get("Low")).to_dict("index")
+        rows = {symbol: {**res, **extra.get(symbol, {})} for symbol, res in rows.items()}
+    return rows
+
+
+def shard_bounds(n_symbols, n_shards):
+    """Contiguous [start, stop) column ranges, in panel order."""
+    edges = np.linspace(0, n_symbols, max(1, min(n_shards, n_symbols)) + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def parallel_returns(panels, as_of=None, rule=DEFAULT_RULE, indicators=False, workers=None,
+                     min_symbols=PARALLEL_MIN_SYMBOLS):
+    """
+    {symbol: row} like compute_returns(...).to_dict("index") (with the
+    indicator columns merged in when asked), computed by a process pool
+    over column shards of `panels` ({field: dates x symbols frame}, as
+    build_price_panels returns). Shards are merged in panel order, so the
+    result is the same dict a single-process run builds. Universes under
+    `min_symbols` are computed in-process.
+    """
+    close = panels["Close"]
+    workers = workers or os.cpu_count() or 1
+    bounds = shard_bounds(close.shape[1], workers * SHARDS_PER_WORKER)
+    if workers == 1 or len(bounds) <= 1 or close.shape[1] < min_symbols:
+        return compute_rows(panels, as_of, rule, indicators)
+
+    fields = ["Close", "High", "Low"] if indicators else ["Close"]
+    segments, handles = {}, []
+    try:
+        for field in fields:
+            if field not in panels:
+                continue
+            values = panels[field].reindex(index=close.index, columns=close.columns).to_numpy(dtype=np.float64)
+            shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            handles.append(shm)
+            np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+            segments[field] = shm.name
+
+        symbols = list(close.columns)
+        tasks = [
+            (segments, close.shape, close.index, symbols[start:stop], start, stop, as_of, rule, indicators)
+            for start, stop in bounds
+        ]
+        results = {}
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for rows in pool.map(_compute_shard, tasks):   # map keeps shard order
+                results.update(rows)
+        return results
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
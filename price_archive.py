@@ -0,0 +1,271 @@
+"""
+Memory-mapped close-price archive: a fixed-width date x symbol float64
+matrix that returns, trends and backfills read through numpy.memmap, so
+only the pages a computation touches are loaded and every process reading
+it shares the OS page cache.
+
+    cache/price_archive/
+        meta.json     {"version", "dtype", "rows", "columns"} — rows is the source of truth
+        symbols.txt   one symbol per line, in column order
+        dates.i64     datetime64[D] per row (int64 days since 1970-01-01)
+        close.f64     row-major rows x columns float64, NaN where a symbol has no bar
+
+    python price_archive.py build        # (re)build from the local price store
+    python price_archive.py info
+
+Unlike the price store, the archive is never pruned, so it keeps
+multi-year history. New trading days are appended as rows. Bars for dates
+already archived are updated in place. A symbol the archive has not seen
+rewrites the files once to add its column. When a split or dividend
+re-adjusts a symbol's series, its whole column is rebased onto the new
+prices first, so years older than the fetch never keep the old basis.
+"""
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from price_panel import PricePanel
+
+# -----------------------------
+# Archive layout
+# -----------------------------
+DEFAULT_ARCHIVE_DIR = "cache/price_archive"
+ARCHIVE_VERSION = 1
+DTYPE = np.float64      # same precision as the report, so returns read from here match it
+META_FILE = "meta.json"
+SYMBOLS_FILE = "symbols.txt"
+DATES_FILE = "dates.i64"
+CLOSE_FILE = "close.f64"
+
+
+class PriceArchive:
+    """One archive directory; read views are memmaps, writes go through append()."""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_DIR):
+        self.path = path
+        self._meta = None
+        self._symbols = None
+        self._positions = None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def exists(self):
+        return os.path.exists(self._file(META_FILE))
+
+    def _reset(self):
+        self._meta = self._symbols = self._positions = None
+
+    # --- reading --------------------------------------------------------
+    @property
+    def meta(self):
+        if self._meta is None:
+            with open(self._file(META_FILE)) as f:
+                self._meta = json.load(f)
+            if self._meta.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"{self.path}: unsupported archive version {self._meta.get('version')}")
+        return self._meta
+
+    @property
+    def symbols(self):
+        if self._symbols is None:
+            with open(self._file(SYMBOLS_FILE), encoding="utf-8") as f:
+                self._symbols = f.read().splitlines()[: self.meta["columns"]]
+        return self._symbols
+
+    @property
+    def dates(self):
+        rows = self.meta["rows"]
+        if not rows:
+            return np.array([], dtype="datetime64[D]")
+        return np.memmap(self._file(DATES_FILE), dtype=np.int64, mode="r", shape=(rows,)).view("datetime64[D]")
+
+    def close(self, mode="r"):
+        """The whole rows x columns close matrix as a memmap (nothing is read until touched)."""
+        rows, columns = self.meta["rows"], self.meta["columns"]
+        if not rows or not columns:
+            return np.empty((rows, columns), dtype=DTYPE)
+        return np.memmap(self._file(CLOSE_FILE), dtype=DTYPE, mode=mode, shape=(rows, columns))
+
+    def position(self, symbol):
+        if self._positions is None:
+            self._positions = {s: i for i, s in enumerate(self.symbols)}
+        return self._positions.get(symbol)
+
+    def panel(self, symbols=None, since=None, until=None):
+        """
+        PricePanel over [since, until]. Row ranges are zero-copy memmap
+        views; picking a subset of `symbols` copies just those columns.
+        """
+        dates = self.dates
+        start = int(np.searchsorted(dates, np.datetime64(since, "D"))) if since else 0
+        stop = int(np.searchsorted(dates, np.datetime64(until, "D"), side="right")) if until else len(dates)
+        values = self.close()[start:stop]
+        if symbols is None:
+            return PricePanel(np.asarray(dates[start:stop]), self.symbols, values)
+        cols = [self.position(s) for s in symbols]
+        names = [s for s, col in zip(symbols, cols) if col is not None]
+        cols = [col for col in cols if col is not None]
+        return PricePanel(np.asarray(dates[start:stop]), names, values[:, cols])
+
+    # --- writing --------------------------------------------------------
+    def _write_meta(self, rows, columns):
+        tmp = self._file(META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": ARCHIVE_VERSION, "dtype": np.dtype(DTYPE).name,
+                       "rows": rows, "columns": columns}, f)
+        os.replace(tmp, self._file(META_FILE))
+
+    def write(self, panel):
+        """Replace the archive with `panel`, built in a side directory and swapped in."""
+        tmp_dir = self.path.rstrip("/\\") + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        order = np.argsort(panel.dates, kind="stable")
+        panel.dates[order].astype(np.int64).tofile(os.path.join(tmp_dir, DATES_FILE))
+        np.ascontiguousarray(panel.values[order], dtype=DTYPE).tofile(os.path.join(tmp_dir, CLOSE_FILE))
+        with open(os.path.join(tmp_dir, SYMBOLS_FILE), "w", encoding="utf-8") as f:
+            f.writelines(f"{symbol}\n" for symbol in panel.symbols)
+        staged = PriceArchive(tmp_dir)
+        staged._write_meta(len(panel.dates), len(panel.symbols))
+
+        old_dir = self.path.rstrip("/\\") + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.replace(self.path, old_dir)
+        os.replace(tmp_dir, self.path)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        self._reset()
+
+    def append(self, panel):
+        """
+        Merge a PricePanel in: existing dates are updated in place, later
+        dates appended as rows (meta.json is rewritten last, so a reader
+        never sees a half-written row). Returns (updated, appended) rows.
+        """
+        if not panel.symbols or not len(panel.dates):
+            return 0, 0
+        if not self.exists():
+            self.write(panel)
+            return 0, len(panel.dates)
+        dates = self.dates
+        if any(self.position(s) is None for s in panel.symbols):
+            return self._rewrite(panel, dates)
+
+        last = dates[-1] if len(dates) else None
+        cols = np.array([self.position(s) for s in panel.symbols])
+        existing = np.searchsorted(dates, panel.dates)
+        known = (existing < len(dates)) & (dates[np.minimum(existing, len(dates) - 1)] == panel.dates) \
+            if len(dates) else np.zeros(len(panel.dates), dtype=bool)
+        later = ~known & ((panel.dates > last) if last is not None else True)
+        if (~known & ~later).any():
+            # A bar before the archive's last date that it never had: rewrite in date order
+            return self._rewrite(panel, dates)
+
+        if known.any():
+            close = self.close(mode="r+")
+            for row, src in zip(existing[known], np.flatnonzero(known)):
+                mask = panel.valid[src]
+                close[row, cols[mask]] = panel.values[src, mask]
+            close.flush()
+            del close
+
+        if later.any():
+            src_rows = np.flatnonzero(later)
+            src_rows = src_rows[np.argsort(panel.dates[src_rows], kind="stable")]
+            block = np.full((len(src_rows), self.meta["columns"]), np.nan, dtype=DTYPE)
+            block[:, cols] = panel.values[src_rows]
+            rows = self.meta["rows"]
+            with open(self._file(CLOSE_FILE), "r+b" if os.path.exists(self._file(CLOSE_FILE)) else "wb") as f:
+                f.truncate(rows * self.meta["columns"] * block.itemsize)   # drop a torn earlier append
+                f.seek(0, os.SEEK_END)
+                block.tofile(f)
+            with open(self._file(DATES_FILE), "r+b") as f:
+                f.truncate(rows * 8)
+                f.seek(0, os.SEEK_END)
+                panel.dates[src_rows].astype(np.int64).tofile(f)
+            self._write_meta(rows + len(src_rows), self.meta["columns"])
+            self._reset()
+        return int(known.sum()), int(later.sum())
+
+    def rebase(self, panel, symbols):
+        """
+        Scale the archived column of each re-adjusted symbol onto `panel`'s
+        price basis, by the ratio of the two closes on their earliest shared
+        date. Without a shared bar the old column is cleared. Returns the
+        number of columns rewritten.
+        """
+        dates = self.dates
+        wanted = [s for s in dict.fromkeys(symbols) if self.position(s) is not None and s in panel.symbols]
+        if not len(dates) or not wanted:
+            return 0
+        close = self.close(mode="r+")
+        for symbol in wanted:
+            col = self.position(symbol)
+            new_dates, new_closes = panel.series(symbol)
+            rows = np.minimum(np.searchsorted(dates, new_dates), len(dates) - 1)
+            shared = dates[rows] == new_dates
+            archived = close[rows[shared], col]
+            usable = ~np.isnan(archived) & (archived != 0)
+            if usable.any():
+                k = np.flatnonzero(usable)[0]
+                close[:, col] *= new_closes[shared][k] / archived[k]
+            else:
+                close[:, col] = np.nan
+        close.flush()
+        del close
+        return len(wanted)
+
+    def _rewrite(self, panel, dates):
+        appended = len(np.setdiff1d(panel.dates, dates))
+        self.write(self._merged(panel))
+        return len(panel.dates) - appended, appended
+
+    def _merged(self, panel):
+        """The archive plus `panel` as one in-memory PricePanel (new symbols become new columns)."""
+        current = self.panel()
+        symbols = current.symbols + [s for s in panel.symbols if self.position(s) is None]
+        dates = np.union1d(current.dates, panel.dates)
+        values = np.full((len(dates), len(symbols)), np.nan, dtype=DTYPE)
+        values[np.searchsorted(dates, current.dates), :len(current.symbols)] = current.values
+        positions = {s: i for i, s in enumerate(symbols)}
+        rows = np.searchsorted(dates, panel.dates)
+        for j, symbol in enumerate(panel.symbols):
+            mask = panel.valid[:, j]
+            values[rows[mask], positions[symbol]] = panel.values[mask, j]
+        return PricePanel(dates, symbols, values)
+
+
+def archive_histories(histories, path=DEFAULT_ARCHIVE_DIR, readjusted=()):
+    """
+    Fold freshly synced {symbol: history frame} closes into the archive,
+    rebasing the columns of `readjusted` symbols (see sync_store) first.
+    """
+    archive = PriceArchive(path)
+    panel = PricePanel.from_histories(histories, dtype=DTYPE)
+    if readjusted and archive.exists():
+        rebased = archive.rebase(panel, readjusted)
+        if rebased:
+            print(f"🗄️ Price archive: {rebased} re-adjusted symbols rebased onto the new prices")
+    updated, appended = archive.append(panel)
+    print(f"🗄️ Price archive: {appended} rows appended, {updated} rows updated ({path})")
+    return updated, appended
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    archive = PriceArchive(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_ARCHIVE_DIR)
+    if command == "build":
+        from price_store import DEFAULT_STORE_PATH, PriceStore
+        with PriceStore(DEFAULT_STORE_PATH) as store:
+            archive.write(store.load_panel(store.symbols(), dtype=DTYPE))
+    if archive.exists():
+        dates = archive.dates
+        span = f"{dates[0]} → {dates[-1]}" if len(dates) else "no rows"
+        size = os.path.getsize(archive._file(CLOSE_FILE)) / 2**20 if archive.meta["rows"] else 0
+        print(f"🗄️ {archive.path}: {archive.meta['columns']} symbols x {archive.meta['rows']} days ({span}), {size:.1f} MB")
+    else:
+        print(f"❌ No archive at {archive.path}")
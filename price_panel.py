@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Compact dates x symbols price panel
+# -----------------------------
+# One shared trading-date vector, one contiguous value matrix (float32 when
+# memory matters more than the last digit) and a validity mask, instead of
+# a tz-aware OHLCV DataFrame per symbol. Only the requested field is read
+# at ingest.
+
+
+class PricePanel:
+    """
+    Closes (or any one field) for many symbols on a shared date index.
+    Exposes index/columns/to_numpy like a DataFrame panel, so
+    returns.compute_returns takes it as is.
+    """
+    __slots__ = ("dates", "symbols", "values", "valid", "_positions")
+
+    def __init__(self, dates, symbols, values, valid=None):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.symbols = list(symbols)
+        self.values = np.ascontiguousarray(values)
+        self.valid = ~np.isnan(self.values) if valid is None else np.asarray(valid, dtype=bool)
+        self._positions = None
+        if self.values.shape != (len(self.dates), len(self.symbols)):
+            raise ValueError(f"values shape {self.values.shape} does not match "
+                             f"{len(self.dates)} dates x {len(self.symbols)} symbols")
+
+    # --- construction -------------------------------------------------
+    @classmethod
+    def from_records(cls, symbols, dates, values, dtype=np.float64):
+        """Long (symbol, date, value) arrays → panel; a repeated (symbol, date) keeps the last value."""
+        codes, names = pd.factorize(pd.Index(symbols), sort=False)
+        day = pd.to_datetime(pd.Index(dates)).to_numpy().astype("datetime64[D]")
+        return cls.from_codes(codes, list(names), day, values, dtype)
+
+    @classmethod
+    def from_histories(cls, histories, field="Close", dtype=np.float64):
+        """{symbol: history frame} → panel, reading only `field` (tz dropped like build_price_panels)."""
+        names, lengths, dates, values = [], [], [], []
+        for symbol, hist in histories.items():
+            if hist is None or hist.empty or field not in hist:
+                continue
+            index = hist.index
+            if getattr(index, "tz", None) is not None:
+                index = index.tz_localize(None)
+            names.append(symbol)
+            lengths.append(len(index))
+            dates.append(index.to_numpy().astype("datetime64[D]"))
+            values.append(hist[field].to_numpy(dtype=dtype))
+        if not names:
+            return cls.empty(dtype)
+        codes = np.repeat(np.arange(len(names)), lengths)
+        return cls.from_codes(codes, names, np.concatenate(dates), np.concatenate(values), dtype)
+
+    @classmethod
+    def from_codes(cls, codes, names, days, values, dtype=np.float64):
+        """Long arrays with symbols as positions into `names` and datetime64[D] days → panel."""
+        date_codes, date_values = pd.factorize(days, sort=True)
+        matrix = np.full((len(date_values), len(names)), np.nan, dtype=dtype)
+        matrix[date_codes, codes] = np.asarray(values, dtype=dtype)
+        return cls(date_values, names, matrix)
+
+    @classmethod
+    def from_frame(cls, frame, dtype=np.float64):
+        """Wrap an existing dates x symbols DataFrame panel."""
+        return cls(frame.index.to_numpy().astype("datetime64[D]"), frame.columns, frame.to_numpy(dtype=dtype))
+
+    @classmethod
+    def empty(cls, dtype=np.float64):
+        return cls(np.array([], dtype="datetime64[D]"), [], np.empty((0, 0), dtype=dtype))
+
+    # --- DataFrame-like access ------------------------------------------
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self.dates)
+
+    @property
+    def columns(self):
+        return pd.Index(self.symbols)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.valid.nbytes + self.dates.nbytes
+
+    def to_numpy(self, dtype=None):
+        return self.values if dtype is None else self.values.astype(dtype, copy=False)
+
+    def to_frame(self):
+        return pd.DataFrame(self.values, index=self.index, columns=self.symbols)
+
+    def position(self, symbol):
+        if self._positions is None:
+            self._positions = {s: i for i, s in enumerate(self.symbols)}
+        return self._positions[symbol]
+
+    def series(self, symbol):
+        """(dates, values) of one symbol's valid bars, oldest first."""
+        col = self.position(symbol)
+        mask = self.valid[:, col]
+        return self.dates[mask], self.values[mask, col]
+
+    def since(self, day):
+        """Rows on or after `day` (a view, no copy)."""
+        start = int(np.searchsorted(self.dates, np.datetime64(day, "D")))
+        return PricePanel(self.dates[start:], self.symbols, self.values[start:], self.valid[start:])
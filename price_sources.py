@@ -0,0 +1,206 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from batch_fetch import yahoo_history, yahoo_last_price
+from nse_client import get_nse_client
+from price_store import DEFAULT_STORE_PATH, HISTORY_DAYS, PriceStore
+from returns import build_price_panel, compute_returns
+
+# -----------------------------
+# Price sources + health-scored router
+# -----------------------------
+COOLDOWN_SECONDS = 300
+FAILURE_THRESHOLD = 3   # consecutive errors before a source is benched
+EWMA_ALPHA = 0.3
+ERROR_WEIGHT = 4.0      # how much a 100% error rate inflates the latency score
+
+# Tiers group providers whose results are interchangeable; health ranks within a tier
+HISTORY_TIER = 0        # fresh daily history → full returns row
+QUOTE_TIER = 1          # fresh last price only
+STALE_TIER = 2          # bars already on disk
+
+
+def now_str():
+    return datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+
+
+def returns_record(symbol, hist):
+    """Returns-engine row for one history frame (None when it has no closes)."""
+    returns = compute_returns(build_price_panel({symbol: hist}))
+    if symbol not in returns.index:
+        return None
+    return {**returns.loc[symbol].to_dict(), "Last Updated": now_str()}
+
+
+class PriceSource:
+    """
+    A provider of per-symbol results. fetch() returns a result dict, None
+    when the provider has no data for the symbol, and raises when the
+    provider itself failed (only failures count against its health).
+    `tier` orders providers by how complete and fresh their results are;
+    health only reorders providers within the same tier.
+    """
+    name = "source"
+    tier = HISTORY_TIER
+
+    def supports(self, symbol):
+        return True
+
+    def fetch(self, symbol):
+        raise NotImplementedError
+
+
+class YahooHistorySource(PriceSource):
+    """Yahoo daily history turned into a result by `to_result(symbol, hist)`."""
+    name = "yahoo"
+
+    def __init__(self, period="1y", to_result=returns_record):
+        self.period = period
+        self.to_result = to_result
+
+    def fetch(self, symbol):
+        hist = yahoo_history(symbol, period=self.period)
+        if hist is None or hist.empty:
+            return None
+        return self.to_result(symbol, hist)
+
+
+class NSEQuoteSource(PriceSource):
+    """Last traded price from the NSE quote API (NSE-listed symbols only)."""
+    name = "nse"
+    tier = QUOTE_TIER
+
+    def __init__(self, client=None):
+        self.client = client
+
+    def supports(self, symbol):
+        return "." not in symbol or symbol.endswith(".NS")
+
+    def fetch(self, symbol):
+        client = self.client or get_nse_client()
+        price = client.last_price(symbol.replace(".NS", ""))
+        if not price:
+            return None
+        return {"Current Price (₹)": price, "Last Updated": now_str()}
+
+
+class YahooQuoteSource(PriceSource):
+    """Last traded price from Yahoo's quote data (any exchange Yahoo lists)."""
+    name = "yahoo_quote"
+    tier = QUOTE_TIER
+
+    def fetch(self, symbol):
+        price = yahoo_last_price(symbol)
+        if not price or price != price:   # None, 0 or NaN
+            return None
+        return {"Current Price (₹)": price, "Last Updated": now_str()}
+
+
+class LocalFileSource(PriceSource):
+    """Results from bars already on disk in the SQLite price store (may be stale)."""
+    name = "local"
+    tier = STALE_TIER
+
+    def __init__(self, path=DEFAULT_STORE_PATH, to_result=returns_record):
+        self.path = path
+        self.to_result = to_result
+
+    def fetch(self, symbol):
+        since = (datetime.today() - timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d")
+        with PriceStore(self.path) as store:
+            hist = store.load([symbol], since=since).get(symbol)
+        if hist is None or hist.empty:
+            return None
+        return self.to_result(symbol, hist)
+
+
+# Shipped sources, and the names of those that only return a last price
+SOURCES = [YahooHistorySource, NSEQuoteSource, YahooQuoteSource, LocalFileSource]
+QUOTE_SOURCES = {source.name for source in SOURCES if source.tier == QUOTE_TIER}
+
+
+class SourceHealth:
+    def __init__(self):
+        self.latency = None     # EWMA seconds
+        self.error_rate = 0.0   # EWMA of failures
+        self.failures = 0       # consecutive
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.served = 0
+
+    def score(self):
+        if self.latency is None:
+            return 0.0  # untried sources get a chance first
+        return self.latency * (1 + ERROR_WEIGHT * self.error_rate)
+
+
+class PriceRouter:
+    """
+    Tries sources best-first: by tier, then, among interchangeable sources
+    of one tier, by recent latency and error rate.
+    A source failing FAILURE_THRESHOLD times in a row is skipped for the
+    cool-down period. `served` records which provider answered each symbol.
+    """
+
+    def __init__(self, sources, cooldown=COOLDOWN_SECONDS, failure_threshold=FAILURE_THRESHOLD,
+                 alpha=EWMA_ALPHA, clock=time.monotonic):
+        self.sources = list(sources)
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+        self.alpha = alpha
+        self.clock = clock
+        self.health = {source.name: SourceHealth() for source in self.sources}
+        self.served = {}
+        self._lock = threading.Lock()
+
+    def ranked(self):
+        now = self.clock()
+        with self._lock:
+            healthy = [s for s in self.sources if self.health[s.name].cooldown_until <= now]
+            return sorted(healthy, key=lambda s: (s.tier, self.health[s.name].score(), self.sources.index(s)))
+
+    def _record(self, source, elapsed, failed):
+        a = self.alpha
+        with self._lock:
+            h = self.health[source.name]
+            h.calls += 1
+            h.latency = elapsed if h.latency is None else (1 - a) * h.latency + a * elapsed
+            h.error_rate = (1 - a) * h.error_rate + a * (1.0 if failed else 0.0)
+            h.failures = h.failures + 1 if failed else 0
+            if h.failures >= self.failure_threshold:
+                h.cooldown_until = self.clock() + self.cooldown
+                h.failures = 0
+                print(f"⏸️ Skipping source '{source.name}' for {self.cooldown}s after repeated failures")
+
+    def fetch(self, symbol):
+        for source in self.ranked():
+            if not source.supports(symbol):
+                continue
+            start = self.clock()
+            try:
+                res = source.fetch(symbol)
+            except Exception as e:
+                self._record(source, self.clock() - start, failed=True)
+                print(f"Source '{source.name}' failed for {symbol} → {e}")
+                continue
+            self._record(source, self.clock() - start, failed=False)
+            if res:
+                with self._lock:
+                    self.health[source.name].served += 1
+                    self.served[symbol] = source.name
+                return res
+        return None
+
+    def report(self):
+        """Per-source summary for logs and run metrics."""
+        return {
+            name: {
+                "calls": h.calls,
+                "served": h.served,
+                "latency_s": round(h.latency, 4) if h.latency is not None else None,
+                "error_rate": round(h.error_rate, 4),
+                "cooling_down": h.cooldown_until > self.clock(),
+            }
+            for name, h in self.health.items()
+        }
@@ -0,0 +1,241 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from batch_fetch import fetch_histories
+from instrumentation import count
+from price_panel import PricePanel
+
+# -----------------------------
+# Local daily price-history store
+# -----------------------------
+DEFAULT_STORE_PATH = "cache/price_history.sqlite"
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+COLUMNS = [field.lower() for field in FIELDS]
+HISTORY_DAYS = 365      # window handed to the returns engine (same as period="1y")
+RETENTION_DAYS = 400    # bars older than this are pruned from the store
+OVERLAP_TOLERANCE = 1e-4  # relative close drift that signals re-adjusted history
+PANEL_CHUNK_ROWS = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    symbol TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    open   REAL,
+    high   REAL,
+    low    REAL,
+    close  REAL,
+    volume REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_log (
+    symbol    TEXT PRIMARY KEY,
+    synced_on TEXT NOT NULL
+);
+"""
+
+
+class PriceStore:
+    """SQLite table of daily bars keyed by (symbol, date)."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def symbols(self):
+        return [symbol for (symbol,) in self.conn.execute("SELECT DISTINCT symbol FROM prices ORDER BY symbol")]
+
+    def last_dates(self, symbols):
+        rows = self.conn.execute("SELECT symbol, MAX(date) FROM prices GROUP BY symbol").fetchall()
+        wanted = set(symbols)
+        return {symbol: date for symbol, date in rows if symbol in wanted}
+
+    def last_close(self, symbol, date):
+        row = self.conn.execute(
+            "SELECT close FROM prices WHERE symbol = ? AND date = ?", (symbol, date)
+        ).fetchone()
+        return row[0] if row else None
+
+    def synced_on(self, day):
+        rows = self.conn.execute("SELECT symbol FROM sync_log WHERE synced_on = ?", (day,)).fetchall()
+        return {symbol for (symbol,) in rows}
+
+    def mark_synced(self, symbols, day):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sync_log (symbol, synced_on) VALUES (?, ?)",
+                [(symbol, day) for symbol in symbols],
+            )
+
+    def write(self, symbol, hist, replace=False):
+        """Upsert bars for one symbol; `replace` drops its stored history first."""
+        if hist is None or hist.empty:
+            return 0
+        index = hist.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        dates = index.strftime("%Y-%m-%d")
+        columns = [hist[f] if f in hist else pd.Series(None, index=hist.index, dtype=float) for f in FIELDS]
+        rows = [
+            (symbol, date, *(None if pd.isna(v) else float(v) for v in values))
+            for date, *values in zip(dates, *columns)
+        ]
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM prices WHERE symbol = ?", (symbol,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, date, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def load(self, symbols, since=None):
+        """History frames (naive DatetimeIndex, Open..Volume columns) per symbol."""
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        placeholders = ",".join("?" * len(symbols))
+        query = (
+            f"SELECT symbol, date, open, high, low, close, volume FROM prices "
+            f"WHERE symbol IN ({placeholders})"
+        )
+        params = list(symbols)
+        if since:
+            query += " AND date >= ?"
+            params.append(since)
+        query += " ORDER BY symbol, date"
+        df = pd.read_sql_query(query, self.conn, params=params, parse_dates=["date"])
+        df.columns = ["symbol", "Date"] + FIELDS
+        return {
+            symbol: group.drop(columns="symbol").set_index("Date")
+            for symbol, group in df.groupby("symbol", sort=False)
+        }
+
+    def load_panel(self, symbols, since=None, field="Close", dtype=np.float64):
+        """One field for `symbols` as a PricePanel, without building per-symbol frames."""
+        symbols = list(symbols)
+        if not symbols:
+            return PricePanel.empty(dtype)
+        column = field.lower()
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown price field {field!r}")
+        placeholders = ",".join("?" * len(symbols))
+        query = f"SELECT symbol, date, {column} FROM prices WHERE symbol IN ({placeholders})"
+        params = list(symbols)
+        if since:
+            query += " AND date >= ?"
+            params.append(since)
+        # Convert in chunks so only PANEL_CHUNK_ROWS row tuples exist at a time
+        positions = {symbol: i for i, symbol in enumerate(symbols)}
+        codes, days, values = [], [], []
+        cursor = self.conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(PANEL_CHUNK_ROWS)
+            if not rows:
+                break
+            names, dates, closes = zip(*rows)
+            codes.append(np.fromiter((positions[name] for name in names), dtype=np.int32, count=len(rows)))
+            days.append(np.array(dates, dtype="datetime64[D]"))
+            values.append(np.array(closes, dtype=np.float64).astype(dtype))
+        if not codes:
+            return PricePanel.empty(dtype)
+        codes = np.concatenate(codes)
+        used = np.unique(codes)
+        return PricePanel.from_codes(np.searchsorted(used, codes), [symbols[i] for i in used],
+                                     np.concatenate(days), np.concatenate(values), dtype)
+
+    def prune(self, retention_days=RETENTION_DAYS, today=None, vacuum=True):
+        """Drop bars older than the retention window and compact the file."""
+        today = today or datetime.today()
+        cutoff = (today - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        with self.conn:
+            deleted = self.conn.execute("DELETE FROM prices WHERE date < ?", (cutoff,)).rowcount
+        if vacuum and deleted:
+            self.conn.execute("VACUUM")
+        return deleted
+
+
+def sync_store(store, symbols, fetch=fetch_histories, period="1y", today=None, as_panel=False, readjusted=None,
+               **fetch_kwargs):
+    """
+    Bring the store up to date for `symbols` and return their histories.
+
+    Symbols never stored get a full `period` fetch. Stored symbols only
+    request bars from their last stored date on; that first bar overlaps the
+    store and, if its close moved (a dividend or split re-adjusted the whole
+    series), the symbol is refetched in full instead. Symbols already synced
+    today are served from disk without any request. Symbols the fetch
+    returned nothing for are left out, so callers never take their old
+    bars for current ones. `as_panel` returns a float32 close PricePanel
+    instead of per-symbol OHLCV frames. Re-adjusted symbols are appended to
+    the `readjusted` list when one is given (the price archive rebases them).
+    """
+    today = today or datetime.today()
+    today_str = today.strftime("%Y-%m-%d")
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+
+    fresh = store.synced_on(today_str)
+    last = store.last_dates(symbols)
+    full = [s for s in symbols if s not in fresh and s not in last]
+
+    # Group stale symbols by their last stored date so each group is one batch
+    by_start = {}
+    for symbol in symbols:
+        if symbol not in fresh and symbol in last:
+            by_start.setdefault(last[symbol], []).append(symbol)
+
+    synced = []
+    for start, group in sorted(by_start.items()):
+        delta = fetch(group, start=start, **fetch_kwargs)
+        for symbol, hist in delta.items():
+            stored = store.last_close(symbol, start)
+            index = hist.index.tz_localize(None) if getattr(hist.index, "tz", None) is not None else hist.index
+            overlap = hist["Close"][index.strftime("%Y-%m-%d") == start]
+            if stored and len(overlap) and abs(overlap.iloc[0] / stored - 1) > OVERLAP_TOLERANCE:
+                full.append(symbol)
+                if readjusted is not None:
+                    readjusted.append(symbol)
+                continue
+            store.write(symbol, hist)
+            synced.append(symbol)
+        print(f"💾 Delta since {start}: {len(delta)}/{len(group)} symbols")
+
+    delta_synced = len(synced)
+    if full:
+        print(f"🌐 Full history fetch for {len(full)} symbols")
+        for symbol, hist in fetch(full, period=period, **fetch_kwargs).items():
+            store.write(symbol, hist, replace=True)
+            synced.append(symbol)
+
+    store.mark_synced(synced, today_str)
+    current = fresh | set(synced)
+    stale = [s for s in symbols if s in last and s not in current]
+    if stale:
+        print(f"⏳ No new bars for {len(stale)} stored symbols, their old history is not served: "
+              f"{', '.join(stale[:5])}")
+    # Cold vs warm path in the run metrics: "full" should be ~0 once the store carries over
+    count("store_symbols_fresh", sum(1 for s in symbols if s in fresh))
+    count("store_symbols_delta", delta_synced)
+    count("store_symbols_full", len(full))
+    count("store_symbols_stale", len(stale))
+    since = (today - timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d")
+    served = [s for s in symbols if s in current]
+    if as_panel:
+        return store.load_panel(served, since=since, dtype=np.float32)
+    return store.load(served, since=since)
@@ -0,0 +1,107 @@
+import math
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+# -----------------------------
+# Single-pass Stock-List report writer
+# -----------------------------
+TREND_HEADER = "Current Trend"
+TREND_CHANGE_HEADER = "Trend Change (vs Last Month)"
+
+red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+
+# Same look as the header/index cells DataFrame.to_excel produces
+thin = Side(style="thin")
+header_font = Font(bold=True)
+header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+header_alignment = Alignment(horizontal="center", vertical="top")
+
+
+def report_columns(results):
+    """Union of result keys in first-seen order (what DataFrame(results).T gives)."""
+    return list(dict.fromkeys(key for res in results.values() for key in res))
+
+
+def report_layout(columns):
+    """
+    Final column order: "Trend" renamed, and the trend-change column placed
+    before "Last Updated" (or before the last column when it is missing).
+    """
+    layout = list(columns)
+    at = layout.index("Last Updated") if "Last Updated" in layout else max(len(layout) - 1, 0)
+    layout.insert(at, TREND_CHANGE_HEADER)
+    return layout
+
+
+def trend_change(previous_trend, trend_value):
+    """Message and fill for the trend-change cell."""
+    if not (previous_trend and trend_value and previous_trend != trend_value):
+        return "", None
+    fill = None
+    if previous_trend == "Bearish" and trend_value == "Bullish":
+        fill = green_fill
+    elif previous_trend == "Bullish" and trend_value == "Bearish":
+        fill = red_fill
+    return f"{previous_trend} → {trend_value}", fill
+
+
+def _clean(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _header_cell(ws, value):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = header_font
+    cell.border = header_border
+    cell.alignment = header_alignment
+    return cell
+
+
+def write_stock_report(path, results, old_trends):
+    """
+    Write {name: row dict} straight into the final report layout in one
+    streaming pass (openpyxl write-only mode), so memory stays flat no
+    matter how many rows the universe has.
+    """
+    columns = report_columns(results)
+    layout = report_layout(columns)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+
+    header = [None]
+    for column in layout:
+        if column == TREND_CHANGE_HEADER:
+            header.append(column)  # the legacy path inserted this one unstyled
+        else:
+            header.append(_header_cell(ws, TREND_HEADER if column == "Trend" else column))
+    ws.append(header)
+
+    for name, res in results.items():
+        row = [_header_cell(ws, name)]
+        trend_value = res.get("Trend")
+        for column in layout:
+            if column == "Trend":
+                cell = WriteOnlyCell(ws, value=_clean(trend_value))
+                if trend_value == "Bullish":
+                    cell.fill = green_fill
+                elif trend_value == "Bearish":
+                    cell.fill = red_fill
+                row.append(cell)
+            elif column == TREND_CHANGE_HEADER:
+                message, fill = trend_change(old_trends.get(res.get("Symbol")), trend_value)
+                cell = WriteOnlyCell(ws, value=message)
+                if fill:
+                    cell.fill = fill
+                row.append(cell)
+            else:
+                row.append(_clean(res.get(column)))
+        ws.append(row)
+
+    wb.save(path)
+    return path
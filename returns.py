@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# -----------------------------
+# Vectorized returns engine
+# -----------------------------
+# Horizons in trading days, counted back from the latest close exactly like
+# the old pct(days) closure: close[-1] / close[-days] - 1.
+HORIZONS = {
+    "1D %": 1,
+    "1W %": 5,
+    "2W %": 10,
+    "1M %": 21,
+    "3M %": 63,
+    "6M %": 126,
+}
+TREND_HORIZON = "3M %"
+TREND_THRESHOLD = 10
+
+RETURN_COLUMNS = ["Current Price (₹)", "1D %", "1W %", "2W %", "1M %", "3M %", "6M %", "YTD %", "Trend"]
+
+
+def compute_trend(ytd_price_perct):
+    if ytd_price_perct is None:
+        return "Unknown"
+    if ytd_price_perct > TREND_THRESHOLD:
+        return "Bullish"
+    elif ytd_price_perct < -TREND_THRESHOLD:
+        return "Bearish"
+    else:
+        return "Neutral"
+
+
+class TrendRule:
+    """
+    A compiled trend rule: Bullish above `upper`, Bearish below `lower`,
+    Neutral in between, judged on the rounded `horizon` return (a HORIZONS
+    column or "YTD %"). Built from config by config.load_rules.
+    """
+
+    def __init__(self, horizon=TREND_HORIZON, upper=TREND_THRESHOLD, lower=-TREND_THRESHOLD, name="default"):
+        self.horizon = horizon
+        self.upper = float(upper)
+        self.lower = float(lower)
+        self.name = name
+
+    def __repr__(self):
+        return f"TrendRule({self.name!r}: {self.horizon} > {self.upper:g} Bullish, < {self.lower:g} Bearish)"
+
+    def classify(self, pct):
+        """Trend labels for a float array (NaN falls through to Neutral like compute_trend)."""
+        return np.select([pct > self.upper, pct < self.lower], ["Bullish", "Bearish"], default="Neutral").astype(object)
+
+
+DEFAULT_RULE = TrendRule()
+
+
+def compute_trend_array(pct):
+    """compute_trend over a float array (NaN falls through to Neutral like the scalar rule)."""
+    return DEFAULT_RULE.classify(pct)
+
+
+def build_price_panels(histories, fields=("Close",)):
+    """
+    Dates x symbols panels for several history fields in one pass. Bars are
+    scattered straight into arrays on the union of dates, which is much
+    cheaper than aligning every series with pd.concat. Timezones are dropped
+    so every symbol shares one naive DatetimeIndex; symbols without the
+    first field are left out of all panels.
+    """
+    frames = {}
+    for symbol, hist in histories.items():
+        if hist is None or hist.empty or fields[0] not in hist:
+            continue
+        index = hist.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        frames[symbol] = (index, hist)
+    if not frames:
+        return {field: pd.DataFrame(dtype=float) for field in fields}
+
+    first_index = next(iter(frames.values()))[0]
+    dates = pd.DatetimeIndex(np.unique(np.concatenate([index.to_numpy() for index, _ in frames.values()])),
+                             name=first_index.name)
+    arrays = {field: np.full((len(dates), len(frames)), np.nan) for field in fields}
+    for col, (index, hist) in enumerate(frames.values()):
+        rows = dates.get_indexer(index)
+        for field in fields:
+            if field in hist:
+                arrays[field][rows, col] = hist[field].to_numpy(dtype=np.float64)
+    symbols = list(frames)
+    return {field: pd.DataFrame(values, index=dates, columns=symbols) for field, values in arrays.items()}
+
+
+def build_price_panel(histories, field="Close"):
+    """Align per-symbol history frames into one dates x symbols panel."""
+    return build_price_panels(histories, (field,))[field]
+
+
+def _as_object(values, missing):
+    out = values.astype(object)
+    out[missing] = None
+    return out
+
+
+def compute_returns(panel, as_of=None, rule=DEFAULT_RULE):
+    """
+    Returns and Trend for every column of a dates x symbols close panel.
+
+    Gives the same values as the per-symbol get_returns_yahoo: a horizon is
+    None when the symbol has too few bars, the "if pct(d)" horizons are also
+    None when the move is exactly zero (so 1D % is always None, since pct(1)
+    compares the last close with itself), and YTD % is None without a bar in
+    the current year. Symbols without any close are left out. Trend applies
+    `rule` to its horizon and is None when that horizon is missing.
+    """
+    as_of = as_of or datetime.today()
+    values = panel.to_numpy(dtype=np.float64)
+    if values.size == 0:
+        return pd.DataFrame(columns=RETURN_COLUMNS)
+
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    rows = values.shape[0]
+
+    # Push every symbol's valid closes to the bottom of its column (stable, so
+    # time order is kept): compact[-k] is then the symbol's k-th last bar.
+    order = np.argsort(valid, axis=0, kind="stable")
+    compact = np.take_along_axis(values, order, axis=0)
+    current = compact[-1]
+
+    out = {"Current Price (₹)": np.round(current, 2).astype(object)}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column, days in HORIZONS.items():
+            enough = counts > days
+            base = compact[rows - days] if days <= rows else np.full_like(current, np.nan)
+            raw = (current / base - 1) * 100
+            pct = np.round(raw, 2)
+            if column == rule.horizon:
+                trend = _as_object(rule.classify(pct), ~enough)
+            missing = ~enough if column == TREND_HORIZON else ~enough | (raw == 0)
+            out[column] = _as_object(pct, missing)
+
+        # YTD: first valid close on or after Jan 1 of the current year
+        in_year = valid & (panel.index >= datetime(as_of.year, 1, 1))[:, None]
+        has_ytd = in_year.any(axis=0)
+        first = values[in_year.argmax(axis=0), np.arange(values.shape[1])]
+        ytd = np.round((current / first - 1) * 100, 2)
+        out["YTD %"] = _as_object(ytd, ~has_ytd | (first == 0))
+        if rule.horizon == "YTD %":
+            trend = _as_object(rule.classify(ytd), ~has_ytd | (first == 0))
+
+    out["Trend"] = trend
+    frame = pd.DataFrame(out, index=panel.columns, columns=RETURN_COLUMNS, dtype=object)
+    return frame[counts > 0]
@@ -1,468 +1,301 @@
-import yfinance as yf
-import pandas as pd
-import time
+import argparse
 import json
-from datetime import datetime
-from openpyxl.reader.excel import load_workbook
-from openpyxl.styles import PatternFill
 import os
+from datetime import datetime
 
-# Ensure output folders exist
-os.makedirs("previousdata", exist_ok=True)
-os.makedirs("result", exist_ok=True)
+import pandas as pd
 
-# Get LAST MONTH's date for comparison (always first day of previous month)
-now = datetime.now()
-if now.month == 1:
-    # January → use December of previous year
-    prev_month = 12
-    prev_year = now.year - 1
-else:
-    prev_month = now.month - 1
-    prev_year = now.year
+from async_fetch import fetch_all
+from config import DEFAULT_VARIANT, RULES_PATH, UNIVERSE_PATH, load_rules, load_universe
+from batch_fetch import fetch_histories
+from instrumentation import metrics, span
+from parallel_compute import parallel_returns
+from price_archive import DEFAULT_ARCHIVE_DIR, archive_histories
+from price_sources import NSEQuoteSource, PriceRouter, YahooQuoteSource
+from price_store import PriceStore, sync_store
+from report_writer import write_stock_report
+from returns import DEFAULT_RULE, build_price_panel, build_price_panels, compute_returns
+from trend_events import EventLog, EventStream, sinks_from_env, trend_event
+from trend_history import (append_run, import_json_snapshots, last_flips, load_history, nearest_run,
+                           trend_matrix, trends_months_ago)
+
+# Batched download settings
+BATCH_CHUNK_SIZE = 50
+BATCH_RETRIES = 3
+
+# Local price-history store (only the bars after the last stored date are fetched)
+PRICE_STORE_PATH = "cache/price_history.sqlite"
+
+# Output folders; the trend history lives next to the JSON snapshots
+RESULT_DIR = "result"
+PREVIOUS_DIR = "previousdata"
+TREND_HISTORY_FILE = "trend_history.csv"
+TREND_EVENTS_FILE = "trend_events.jsonl"
+
+# Compare against the closest non-empty snapshot within this many days of last month's 1st
+BASELINE_WINDOW_DAYS = 20
+
+# Longer-range trend context read from the trend history
+TREND_AGO_MONTHS = 3
+TREND_AGO_HEADER = f"Trend ({TREND_AGO_MONTHS}M Ago)"
+LAST_FLIP_HEADER = "Last Trend Flip"
 
-# Use first day of previous month for comparison
-last_month_str = datetime(prev_year, prev_month, 1).strftime('%Y-%m-%d')
-print(f"Using last month data for comparison: {last_month_str}")
+# Dictionary to store trends of current run (normalized symbol keys)
+previous_trends = {}
 
 # Normalize symbol by removing '.NS' suffix
 def normalize_symbol(sym):
     return sym.replace(".NS", "") if sym else sym
 
-# Load old trends for comparison (normalized symbol keys) - LAST MONTH
-try:
-    last_month_filename = f'previousdata/previous_trends_{last_month_str}.json'
-    with open(last_month_filename, 'r') as f:
-        old_trends_raw = json.load(f)
-        old_trends = {normalize_symbol(k): v for k, v in old_trends_raw.items()}
-    print(f"✅ Loaded trends from last month: {last_month_filename}")
-except FileNotFoundError:
-    print(f"⚠️ No trends file found for {last_month_filename}, starting fresh")
-    old_trends = {}
-
-# Dictionary to store trends of current run (normalized symbol keys)
-previous_trends = {}
-
-# Create filename with date: previous_trends_YYYY-MM-DD.json inside "previousdata"
-date_str = datetime.now().strftime('%Y-%m-%d')
-filename = f'previousdata/previous_trends_{date_str}.json'
+def last_month_date(now):
+    # LAST MONTH's date for comparison (always first day of previous month)
+    if now.month == 1:
+        # January → use December of previous year
+        prev_month = 12
+        prev_year = now.year - 1
+    else:
+        prev_month = now.month - 1
+        prev_year = now.year
+    return datetime(prev_year, prev_month, 1).strftime('%Y-%m-%d')
+
+def load_trend_history(previous_dir=PREVIOUS_DIR):
+    """Run dates x symbols trend matrix, after importing any JSON snapshot the history lacks."""
+    history_path = os.path.join(previous_dir, TREND_HISTORY_FILE)
+    # Snapshots whose run date is not in the history yet (older runs, backfills) are imported
+    import_json_snapshots(previous_dir, history_path)
+    return trend_matrix(load_history(history_path))
+
+def load_old_trends(last_month_str, date_str, previous_dir=PREVIOUS_DIR, trend_history=None):
+    if trend_history is None:
+        trend_history = load_trend_history(previous_dir)
+
+    # Old trends for comparison (normalized symbol keys) - nearest run to LAST MONTH
+    # (the history already holds every JSON snapshot, see load_trend_history)
+    baseline_date, old_trends_raw = nearest_run(trend_history, last_month_str, BASELINE_WINDOW_DAYS, before=date_str)
+    old_trends = {normalize_symbol(k): v for k, v in old_trends_raw.items()}
+    if old_trends:
+        print(f"✅ Loaded trends from {baseline_date} (nearest run to {last_month_str})")
+    else:
+        print(f"⚠️ No trends within {BASELINE_WINDOW_DAYS} days of {last_month_str}, starting fresh")
+    return baseline_date, old_trends
 
-def save_previous_trends():
+def save_previous_trends(filename):
     normalized_save = {normalize_symbol(k): v for k, v in previous_trends.items()}
     with open(filename, 'w') as f:
         json.dump(normalized_save, f)
 
-def compute_trend(ytd_price_perct):
-    if ytd_price_perct is None:
-        return "Unknown"
-    if ytd_price_perct > 10:
-        return "Bullish"
-    elif ytd_price_perct < -10:
-        return "Bearish"
-    else:
-        return "Neutral"
-
-def get_returns_yahoo(symbol):
+def get_returns_yahoo(symbol, hist=None):
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1y", interval="1d")
-        if hist.empty:
+        if hist is None:
+            with PriceStore(PRICE_STORE_PATH) as store:
+                hist = sync_store(store, [symbol]).get(symbol)
+        if hist is None or hist.empty:
             print(f"Yahoo returned empty for {symbol}")
             return None
 
-        hist.index = hist.index.tz_localize(None)
-        current = hist['Close'].iloc[-1]
-
-        def pct(days):
-            if len(hist) > days:
-                return (hist['Close'].iloc[-1] / hist['Close'].iloc[-days] - 1) * 100
+        returns = compute_returns(build_price_panel({symbol: hist}))
+        if symbol not in returns.index:
+            print(f"Yahoo returned no closes for {symbol}")
             return None
 
-        start_year = datetime(datetime.today().year, 1, 1)
-        ytd_data = hist[hist.index >= start_year]
-        ytd_price = ytd_data['Close'].iloc[0] if not ytd_data.empty else None
-        ytd_price_perct = round((current / ytd_price - 1) * 100, 2) if ytd_price else None
-
-        qrt_price_perct = round(pct(63), 2) if pct(63) is not None else None
-
         return {
-            "Current Price (₹)": round(float(current), 2),
-            "1D %": round(pct(1), 2) if pct(1) else None,
-            "1W %": round(pct(5), 2) if pct(5) else None,
-            "2W %": round(pct(10), 2) if pct(10) else None,
-            "1M %": round(pct(21), 2) if pct(21) else None,
-            "3M %": qrt_price_perct,
-            "6M %": round(pct(126), 2) if pct(126) else None,
-            "YTD %": ytd_price_perct,
-            "Trend": compute_trend(qrt_price_perct) if qrt_price_perct is not None else None,
+            **returns.loc[symbol].to_dict(),
             "Last Updated": datetime.now().strftime("%d-%m-%Y %H:%M:%S")
         }
     except Exception as e:
         print(f"Error fetching from Yahoo for {symbol} → {e}")
         return None
 
-def detect_trend_change(symbol, current_trend):
+def detect_trend_change(symbol, current_trend, old_trends=None, res=None, baseline_date=None):
     norm_symbol = normalize_symbol(symbol)
     previous_trend = previous_trends.get(norm_symbol)
-    if previous_trend is None:
-        previous_trends[norm_symbol] = current_trend
-        return
+    previous_trends[norm_symbol] = current_trend
     if previous_trend and current_trend and previous_trend != current_trend:
         print(f"Trend changed for {norm_symbol}: {previous_trend} → {current_trend}")
-    previous_trends[norm_symbol] = current_trend
 
-# Your complete stocks list (unchanged)
-stocks = {
-    "Marksans Pharma Ltd": "MARKSANS.NS",
-    "Astral Ltd": "ASTRAL.NS",
-    "Ice Make Refrigeration Ltd": "ICEMAKE.NS",
-    "Mahanagar Gas Ltd": "MGL.NS",
-    "Sanofi India Ltd": "SANOFI.NS",
-    "Clean Science and Technology Ltd": "CLEAN.NS",
-    "Cigniti Technologies Ltd": "CIGNITITEC.NS",
-    "Symphony Ltd": "SYMPHONY.NS",
-    "Finolex Cables Ltd": "FINCABLES.NS",
-    "Bajaj Auto Ltd": "BAJAJ-AUTO.NS",
-    "Rashtriya Chemicals and Fertilizers Ltd": "RCF.NS",
-    "Deepak Fertilizers and Petrochemicals Corp Ltd": "DEEPAKFERT.NS",
-    "Gujarat State Fertilizers & Chemicals Ltd": "GSFC.NS",
-    "Thangamayil Jewellery Ltd": "THANGAMAYL.NS",
-    "Fineotex Chemical Ltd": "FCL.NS",
-    "Alkyl Amines Chemicals Ltd": "ALKYLAMINE.NS",
-    "Havells India Ltd": "HAVELLS.NS",
-    "Gujarat Alkalies and Chemicals Ltd": "GUJALKALI.NS",
-    "Chemfab Alkalis Ltd": "CHEMFAB.NS",
-    "Ajanta Pharma Ltd": "AJANTPHARM.NS",
-    "Happiest Minds Technologies Ltd": "HAPPSTMNDS.NS",
-    "Venus Pipes and Tubes Ltd": "VENUSPIPES.NS",
-    "TALBROS Automotive Components Ltd": "TALBROAUTO.NS",
-    "Zydus Lifesciences Ltd": "ZYDUSLIFE.NS",
-    "Faze Three Ltd": "FAZE3Q.NS",
-    "Automotive Stampings and Assemblies Ltd": "AUTOIND.NS",
-    "Chennai Petroleum Corporation Ltd": "CHENNPETRO.NS",
-    "Intellect Design Arena Ltd": "INTELLECT.NS",
-    "Thejo Engineering Ltd": "THEJO.NS",
-    "Insecticides (India) Ltd": "INSECTICID.NS",
-    "Axiscades Technologies Ltd": "AXISCADES.NS",
-    "Eimco Elecon (India) Ltd": "EIMCOELECO.NS",
-    "Waaree Energies Ltd": "WAAREEENER.NS",
-    "DCX Systems Ltd": "DCXINDIA.NS",
-    "Ramkrishna Forgings Ltd": "RKFORGE.NS",
-    "Gujarat Narmada Valley Fertilizers & Chemicals Ltd": "GNFC.NS",
-    "JK Tyre & Industries Ltd": "JKTYRE.NS",
-    "Oracle Financial Services Software Ltd": "OFSS.NS",
-    "Aavas Financiers Ltd": "AAVAS.NS",
-    "Bharat Bijlee Ltd": "BBL.NS",
-    "Zydus Wellness Ltd": "ZYDUSWELL.NS",
-    "Alivus Life Sciences Ltd": "ALIVUS.NS",
-    "Hexaware Technologies Ltd": "HEXT.NS",
-    "LIC Housing Finance Ltd": "LICHSGFIN.NS",
-    "Tech Mahindra Ltd": "TECHM.NS",
-    "Suprajit Engineering Ltd": "SUPRAJIT.NS",
-    "IIFL Capital Services Ltd": "IIFLCAPS.NS",
-    "Welspun Investments and Commercials Ltd": "WELINV.NS",
-    "Lupin Ltd": "LUPIN.NS",
-    "Paras Defence and Space Technologies Ltd": "PARAS.NS",
-    "Unicommerce eSolutions Ltd": "UNIECOM.NS",
-    "Isgec Heavy Engineering Ltd": "ISGEC.NS",
-    "Apeejay Surrendra Park Hotels Ltd": "PARKHOTELS.NS",
-    "Indo US Bio-Tech Ltd": "INDOUS.NS",
-    "Moil Ltd": "MOIL.NS",
-    "Hindustan Zinc Ltd": "HINDZINC.NS",
-    "Kernex Microsystems (India) Ltd": "KERNEX.NS",
-    "Camlin Fine Sciences Ltd": "CAMLINFINE.NS",
-    "RHI Magnesita India Ltd": "RHIM.NS",
-    "Anik Industries Ltd": "ANIKINDS.NS",
-    "Time Technoplast Ltd": "TIMETECHNO.NS",
-    "R R Kabel Ltd": "RRKABEL.NS",
-    "Capacite Infraprojects Ltd": "CAPACITE.NS",
-    "Indian Hume Pipe Company Ltd": "INDIANHUME.NS",
-    "Pudumjee Paper Products Ltd": "PDMJEPAPER.NS",
-    "Tarc Ltd": "TARC.NS",
-    "Pokarna Ltd": "POKARNA.NS",
-    "Brigade Enterprises Ltd": "BRIGADE.NS",
-    "Info Edge (India) Ltd": "NAUKRI.NS",
-    "Awfis Space Solutions Ltd": "AWFIS.NS",
-    "Welspun Enterprises Ltd": "WELENT.NS",
-    "Ems Ltd": "EMSLIMITED.NS",
-    "Cohance Lifesciences Ltd": "COHANCE.NS",
-    "Dynacons Systems and Solutions Ltd": "DSSL.NS",
-    "AIA Engineering Ltd": "AIAENG.NS",
-    "Pearl Global Industries Ltd": "PGIL.NS",
-    "Hindustan Oil Exploration Company Ltd": "HINDOILEXP.NS",
-    "Exide Industries Ltd": "EXIDEIND.NS",
-    "Surya Roshni Ltd": "SURYAROSNI.NS",
-    "Birla Corporation Ltd": "BIRLACORPN.NS",
-    "Indo Count Industries Ltd": "ICIL.NS",
-    "Atul Auto Ltd": "ATULAUTO.NS",
-    "Crompton Greaves Consumer Electricals Ltd": "CROMPTON.NS",
-    "Tata Motors Passenger Vhcls Ltd": "TMPV.NS",
-    "Tata Motors Ltd": "TMCV.NS",
-    "ACC Ltd": "ACC.NS",
-    "Chambal Fertilisers and Chemicals Ltd": "CHAMBLFERT.NS",
-    "Tejas Networks Ltd": "TEJASNET.NS",
-    "Carborundum Universal Ltd": "CARBORUNIV.NS",
-    "Kewal Kiran Clothing Ltd": "KKCL.NS",
-    "Mangalore Refinery and Petrochemicals Ltd": "MRPL.NS",
-    "Inox Wind Ltd": "INOXWIND.NS",
-    "Max Estates Ltd": "MAXESTATES.NS",
-    "Granules India Ltd": "GRANULES.NS",
-    "Galaxy Surfactants Ltd": "GALAXYSURF.NS",
-    "Indraprastha Gas Ltd": "IGL.NS",
-    "BASF India Ltd": "BASF.NS",
-    "Birlanu Ltd": "BIRLANU.NS",
-    "Nitin Spinners Ltd": "NITINSPIN.NS",
-    "TAJ GVK Hotels and Resorts Ltd": "TAJGVK.NS",
-    "Pix Transmissions Ltd": "PIXTRANS.NS",
-    "Trident Ltd": "TRIDENT.NS",
-    "TVS Holdings Ltd": "TVSHLTD.NS",
-    "Piramal Finance Ltd": "PIRAMALFIN.NS",
-    "Motilal Oswal Nasdaq Q50 ETF": "MONQ50.NS",
-    "Jbm Auto Ltd": "JBMA.NS",
-    "Rane Brake Lining Ltd": "RBL.NS",
-    "Gala Precision Engineering Ltd": "GALAPREC.NS",
-    "Indoco Remedies Ltd": "INDOCO.NS",
-    "Motilal Oswal Nifty Realty ETF": "MOREALTY.NS",
-    "Gujarat Fluorochemicals Ltd": "FLUOROCHEM.NS",
-    "Century Plyboards (India) Ltd": "CENTURYPLY.NS",
-    "Westlife Foodworld Ltd": "WESTLIFE.NS",
-    "Monarch Networth Capital Ltd": "MONARCH.NS",
-    "JITF Infralogistics Ltd": "JITFINFRA.NS",
-    "Rategain Travel Technologies Ltd": "RATEGAIN.NS",
-    "Swan Corp Ltd": "SWANCORP.NS",
-    "Firstsource Solutions Ltd": "FSL.NS",
-    "Sonata Software Ltd": "SONATSOFTW.NS",
-    "Yasho Industries Ltd": "YASHO.NS",
-    "Route Mobile Ltd": "ROUTE.NS",
-    "Bata India Ltd": "BATAINDIA.NS",
-    "Colgate-Palmolive (India) Ltd": "COLPAL.NS",
-    "Refex Industries Ltd": "REFEX.NS",
-    "Sona BLW Precision Forgings Ltd": "SONACOMS.NS",
-    "Embassy Office Parks REIT": "EMBASSY.NS",
-    "Birlasoft Ltd": "BSOFT.NS",
-    "Ceigall India Ltd": "CEIGALL.NS",
-    "Tata Consultancy Services Ltd": "TCS.NS",
-    "Network People Services Technologies Ltd": "NPST.NS",
-    "Mrs. Bectors Food Specialities Ltd": "BECTORFOOD.NS",
-    "Voltamp Transformers Ltd": "VOLTAMP.NS",
-    "Page Industries Ltd": "PAGEIND.NS",
-    "ABB India Ltd": "ABB.NS",
-    "AstraZeneca Pharma India Ltd": "ASTRAZEN.NS",
-    "Wendt (India) Ltd": "WENDT.NS",
-    "Procter & Gamble Hygiene & Health Care Ltd": "PGHH.NS",
-    "Honeywell Automation India Ltd": "HONAUT.NS",
-    "DISA India Ltd": "DISAQ.BO",
-    "Orissa Minerals Development Company Ltd": "ORISSAMINE.NS",
-    "GRP Ltd": "GRPLTD.NS",
-    "Polyplex Corporation Ltd": "POLYPLEX.NS",
-    "Ratnamani Metals & Tubes Ltd": "RATNAMANI.NS",
-    "United Breweries Ltd": "UBL.NS",
-    "Garware Hi-Tech Films Ltd": "GRWRHITECH.NS",
-    "Deepak Nitrite Ltd": "DEEPAKNTR.NS",
-    "Bajaj Electricals Ltd": "BAJAJELEC.NS",
-    "Chemplast Sanmar Ltd": "CHEMPLASTS.NS",
-    "Phoenix Mills Ltd": "PHOENIXLTD.NS",
-    "Grindwell Norton Ltd": "GRINDWELL.NS",
-    "KPIT Technologies Ltd": "KPITTECH.NS",
-    "Syngene International Ltd": "SYNGENE.NS",
-    "KNR Constructions Ltd": "KNRCON.NS",
-    "Sundram Fasteners Ltd": "SUNDRMFAST.NS",
-    "ZF Commercial Vehicle Control System India Ltd": "ZFCVINDIA.NS",
-    "Rolex Rings Ltd": "ROLEXRINGS.NS",
-    "Indo Tech Transformers Ltd": "INDOTECH.NS",
-    "JSW Holdings Ltd": "JSWHL.NS",
-    "Piramal Pharma Ltd": "PPLPHARMA.NS",
-    "Crisil Ltd": "CRISIL.NS",
-    "Varun Beverages Ltd": "VBL.NS",
-    "Bajaj Holdings & Investment Ltd": "BAJAJHLDNG.NS",
-    "RPG Life Sciences Ltd": "RPGLIFE.NS",
-    "Bharat Rasayan Ltd": "BHARATRAS.NS",
-    "Tata Elxsi Ltd": "TATAELXSI.NS",
-    "Persistent Systems Ltd": "PERSISTENT.NS",
-    "Trent Ltd": "TRENT.NS",
-    "Sanofi Consumer Healthcare India Ltd": "SANOFICONR.NS",
-    "Sundaram Finance Ltd": "SUNDARMFIN.NS",
-    "Akzo Nobel India Ltd": "AKZOINDIA.NS",
-    "Thermax Ltd": "THERMAX.NS",
-    "GlaxoSmithKline Pharmaceuticals Ltd": "GLAXO.NS",
-    "Mankind Pharma Ltd": "MANKIND.NS",
-    "Mastek Ltd": "MASTEK.NS",
-    "Angel One Ltd": "ANGELONE.NS",
-    "Poly Medicure Ltd": "POLYMED.NS",
-    "Interarch Building Solutions Ltd": "INTERARCH.NS",
-    "Alkem Laboratories Ltd": "ALKEM.NS",
-    "Narayana Hrudayalaya Ltd": "NH.NS",
-    "Epigral Ltd": "EPIGRAL.NS",
-    "Concord Biotech Ltd": "CONCORDBIO.NS",
-    "D P Abhushan Ltd": "DPABHUSHAN.NS",
-    "VA Tech Wabag Ltd": "WABAG.NS",
-    "Balaji Amines Ltd": "BALAMINES.NS",
-    "IPCA Laboratories Ltd": "IPCALAB.NS",
-    "Websol Energy Systems Ltd": "WEBELSOLAR.NS",
-    "Torrent Power Ltd": "TORNTPOWER.NS",
-    "Aurionpro Solutions Ltd": "AURIONPRO.NS",
-    "Godrej Consumer Products Ltd": "GODREJCP.NS",
-    "Lodha Developers Ltd": "LODHA.NS",
-    "Action Construction Equipment Ltd": "ACE.NS",
-    "Ramco Cements Ltd": "RAMCOCEM.NS",
-    "Associated Alcohols & Breweries Ltd": "ASALCBR.NS",
-    "S.P. Apparels Ltd": "SPAL.NS",
-    "Gokaldas Exports Ltd": "GOKEX.NS",
-    "Sumitomo Chemical India Ltd": "SUMICHEM.NS",
-    "Berger Paints India Ltd": "BERGEPAINT.NS",
-    "Triveni Turbine Ltd": "TRITURBINE.NS",
-    "Transformers and Rectifiers (India) Ltd": "TARIL.NS",
-    "MSTC Ltd": "MSTCLTD.NS",
-    "Jash Engineering Ltd": "JASH.NS",
-    "Kalyan Jewellers India Ltd": "KALYANKJIL.NS",
-    "HPL Electric & Power Ltd": "HPL.NS",
-    "Epack Durable Ltd": "EPACK.NS",
-    "Panama Petrochem Ltd": "PANAMAPET.NS",
-    "Jindal SAW Ltd": "JINDALSAW.NS",
-    "Gail (India) Ltd": "GAIL.NS",
-    "Cera Sanitaryware Ltd": "CERA.NS",
-    "Bayer Cropscience Ltd": "BAYERCROP.NS",
-    "TCPL Packaging Ltd": "TCPLPACK.NS",
-    "Power Mech Projects Ltd": "POWERMECH.NS",
-    "Summit Securities Ltd": "SUMMITSEC.NS",
-    "Anup Engineering Ltd": "ANUP.NS",
-    "Balkrishna Industries Ltd": "BALKRISIND.NS",
-    "MPS Ltd": "MPSLTD.NS",
-    "Bajaj Finserv Ltd": "BAJAJFINSV.NS",
-    "ICICI Lombard General Insurance Co Ltd": "ICICIGI.NS",
-    "Blue Star Ltd": "BLUESTARCO.NS",
-    "Oberoi Realty Ltd": "OBEROIRLTY.NS",
-    "Mallcom (India) Ltd": "MALLCOM.NS",
-    "Max Healthcare Institute Ltd": "MAXHEALTH.NS",
-    "Amara Raja Energy & Mobility Ltd": "ARE&M.NS",
-    "Dabur India Ltd": "DABUR.NS",
-    "BLS International Services Ltd": "BLS.NS",
-    "Petronet LNG Ltd": "PETRONET.NS",
-    "Indian Railway Finance Corp Ltd": "IRFC.NS",
-    "Power Grid Corporation of India Ltd": "POWERGRID.NS",
-    "Pidilite Industries Ltd": "PIDILITIND.NS",
-    "Federal Bank Ltd": "FEDERALBNK.NS",
-    "3M India Ltd": "3MINDIA.NS",
-    "Aarti Industries Ltd": "AARTIIND.NS",
-    "Cms Info Systems Ltd": "CMSINFO.NS",
-    "PG Electroplast Ltd": "PGEL.NS",
-    "Gujarat Ambuja Exports Ltd": "GAEL.NS",
-    "Share India Securities Ltd": "SHAREINDIA.NS",
-    "AGI Greenpac Ltd": "AGI.NS",
-    "SML Mahindra Limited": "SMLISUZU.NS",
-    "Afcons Infrastructure Limited": "AFCONS.NS",
-    "Oil and Natural Gas Corporation Ltd": "ONGC.NS",
-    "Adani Enterprises Ltd": "ADANIENT.NS",
-    "Siemens Ltd": "SIEMENS.NS",
-    "Praj Industries Ltd": "PRAJIND.NS",
-    "Ion Exchange (India) Ltd": "IONEXCHANG.NS",
-    "D Link (India) Limited": "DLINKINDIA.NS",
-    "HG Infra Engineering Ltd": "HGINFRA.NS",
-    "Texmaco Rail & Engineering Ltd": "TEXRAIL.NS",
-    "Technocraft Industries (India) Ltd": "TIIL.NS",
-    "PTC India Ltd": "PTC.NS",
-    "BF Investment Ltd": "BFINVEST.NS",
-    "Apollo Pipes Ltd": "APOLLOPIPE.NS",
-    "Maharashtra Seamless Ltd": "MAHSEAMLES.NS",
-    "Shakti Pumps (India) Ltd": "SHAKTIPUMP.NS",
-    "Ganesha Ecosphere Ltd": "GANECOS.NS",
-    "Man Infraconstruction Ltd": "MANINFRA.NS",
-    "Neogen Chemicals Ltd": "NEOGEN.NS",
-    "E2E Networks Ltd": "E2E.NS",
-    "Shanti Gold International Ltd": "SHANTIGOLD.NS",
-    "Zaggle Prepaid Ocean Services Ltd": "ZAGGLE.NS",
-    "Jindal Poly Films Ltd": "JINDALPOLY.NS"
-}
-
-# "Oriental Rail Infrastructure Ltd: 531859
-#"Patels Airtemp (India) Ltd": "517417",
-
-# Master Loop
-results = {}
-for name, symbol in stocks.items():
-    print(f"\nFetching {name} ({symbol})...")
-    res = get_returns_yahoo(symbol)
-    if res:
-        detect_trend_change(symbol, res.get("Trend"))
-    else:
-        res = {"Error": "Data not found", "Trend": None}
-    results[name] = {"Symbol": normalize_symbol(symbol), **res}
-    time.sleep(0.5)
-
-# Export results to Excel inside "result" folder
-excelName = f"result/Stock-List_{date_str}.xlsx"
-df = pd.DataFrame(results).T
-df.to_excel(excelName)
-
-wb = load_workbook(excelName)
-ws = wb.active
-
-# Find 'Trend' column index and rename header
-trend_col_idx = None
-for idx, cell in enumerate(ws[1], start=1):
-    if cell.value == "Trend":
-        trend_col_idx = idx
-        cell.value = "Current Trend"
-        break
-
-# **NEW: Find "Last Updated" column index FIRST**
-last_updated_col_idx = None
-for idx, cell in enumerate(ws[1], start=1):
-    if cell.value == "Last Updated":
-        last_updated_col_idx = idx
-        break
-
-# Insert "Trend Change" column BEFORE "Last Updated"
-if last_updated_col_idx:
-    trend_change_col_idx = last_updated_col_idx  # Insert at Last Updated position
-    ws.insert_cols(trend_change_col_idx)        # This shifts Last Updated right
-    ws.cell(row=1, column=trend_change_col_idx, value="Trend Change (vs Last Month)")
-else:
-    # Fallback: insert at end if "Last Updated" not found
-    last_col = ws.max_column
-    trend_change_col_idx = last_col
-    ws.insert_cols(trend_change_col_idx)
-    ws.cell(row=1, column=trend_change_col_idx, value="Trend Change (vs Last Month)")
-
-# Define fill colors
-red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-trend_fill_green = green_fill
-trend_fill_red = red_fill
-
-# Apply formatting and messages
-for row in range(2, ws.max_row + 1):
-    symbol = ws.cell(row=row, column=2).value  # Symbol assumed second column
-    norm_symbol = normalize_symbol(symbol)
-    trend_cell = ws.cell(row=row, column=trend_col_idx)
-    trend_value = trend_cell.value
-
-    if trend_value == "Bullish":
-        trend_cell.fill = trend_fill_green
-    elif trend_value == "Bearish":
-        trend_cell.fill = trend_fill_red
-
-    trend_change_cell = ws.cell(row=row, column=trend_change_col_idx)
-    previous_trend = old_trends.get(norm_symbol)  # Now from LAST MONTH
-    update_msg = ""
-    fill_to_apply = None
-
-    if previous_trend and trend_value and previous_trend != trend_value:
-        update_msg = f"{previous_trend} → {trend_value}"
-        if previous_trend == "Bearish" and trend_value == "Bullish":
-            fill_to_apply = green_fill
-        elif previous_trend == "Bullish" and trend_value == "Bearish":
-            fill_to_apply = red_fill
-
-    trend_change_cell.value = update_msg
-    if fill_to_apply:
-        trend_change_cell.fill = fill_to_apply
-
-wb.save(excelName)
-
-# Save trends for next run (for future monthly comparisons)
-save_previous_trends()
-
-print(f"\n✅ {excelName} created!")
-print(f"📊 Trends compared against last month: {last_month_str}")
-print(f"💾 Current trends saved to: {filename}")
+    # Month-over-month flip against the baseline snapshot → structured event
+    baseline_trend = (old_trends or {}).get(norm_symbol)
+    if baseline_trend and current_trend and baseline_trend != current_trend:
+        return trend_event(norm_symbol, baseline_trend, current_trend, res, baseline_date)
+    return None
+
+def add_history_columns(results, trend_history, now):
+    """
+    Trend N months ago and the latest flip (this run included) for every
+    row with a trend, from the trend-history matrix; placed before "Last Updated".
+    """
+    run_date = pd.Timestamp(now.strftime("%Y-%m-%d"))
+    before = trend_history[trend_history.index < run_date]
+    ago = trends_months_ago(before, run_date, TREND_AGO_MONTHS)
+    current = {res["Symbol"]: res["Trend"] for res in results.values() if res.get("Trend")}
+    today = pd.DataFrame([current], index=pd.DatetimeIndex([run_date], name="run_date"))
+    flips = last_flips(pd.concat([before, today]) if len(before) else today)
+    for res in results.values():
+        if not res.get("Trend"):
+            continue
+        symbol = res["Symbol"]
+        last_updated = res.pop("Last Updated", None)
+        res[TREND_AGO_HEADER] = ago.get(symbol)
+        flip = flips.loc[symbol] if symbol in flips.index else None
+        if flip is not None and pd.notna(flip["last_flip"]):
+            res[LAST_FLIP_HEADER] = f"{flip['last_flip']:%Y-%m-%d} (from {flip['flipped_from']})"
+        else:
+            res[LAST_FLIP_HEADER] = None
+        if last_updated is not None:
+            res["Last Updated"] = last_updated
+
+def run_report(stocks, now=None, fetch=fetch_histories, store_path=PRICE_STORE_PATH,
+               result_dir=RESULT_DIR, previous_dir=PREVIOUS_DIR, fallback_sources=None, event_sinks=None,
+               rule=DEFAULT_RULE, indicators=False, workers=1, archive_path=None):
+    """
+    Fetch, compute and write one Stock-List report; returns the workbook path.
+    `indicators` adds the technical-indicator columns (SMA/EMA crossovers,
+    RSI, ATR, 52-week distances, max drawdown) after the returns; `workers`
+    > 1 spreads that compute over a process pool for large universes.
+    `archive_path` also folds the synced closes into the memory-mapped
+    price archive that backfills and other readers use.
+    """
+    now = now or datetime.now()
+    date_str = now.strftime('%Y-%m-%d')
+    previous_trends.clear()
+    metrics.reset()
+
+    # Ensure output folders exist
+    os.makedirs(previous_dir, exist_ok=True)
+    os.makedirs(result_dir, exist_ok=True)
+
+    last_month_str = last_month_date(now)
+    print(f"Using last month data for comparison: {last_month_str}")
+    trend_history = load_trend_history(previous_dir)
+    baseline_date, old_trends = load_old_trends(last_month_str, date_str, previous_dir, trend_history)
+
+    # Create filename with date: previous_trends_YYYY-MM-DD.json inside "previousdata"
+    filename = os.path.join(previous_dir, f'previous_trends_{date_str}.json')
+    history_path = os.path.join(previous_dir, TREND_HISTORY_FILE)
+
+    # Read the local store first, then one grouped request per chunk for the delta
+    price_store = PriceStore(store_path)
+    readjusted = []
+    with span("fetch_histories"):
+        histories = sync_store(price_store, list(stocks.values()), fetch=fetch, today=now, readjusted=readjusted,
+                               chunk_size=BATCH_CHUNK_SIZE, retries=BATCH_RETRIES)
+    with span("price_store_prune"):
+        price_store.prune(today=now)
+    price_store.close()
+    if archive_path:
+        with span("price_archive"):
+            archive_histories(histories, archive_path, readjusted)
+
+    # All returns and trends in one vectorized pass over the aligned close panel
+    with span("get_returns_yahoo"):
+        panels = build_price_panels(histories, ("Close", "High", "Low") if indicators else ("Close",))
+        returns = parallel_returns(panels, as_of=now, rule=rule, indicators=indicators, workers=workers)
+    last_updated = now.strftime("%d-%m-%Y %H:%M:%S")
+
+    # Symbols with no current history (never fetched, or no new bars since the store's last one)
+    # fail over to a last-price quote; the faster healthy provider goes first
+    if fallback_sources is None:
+        fallback_sources = [NSEQuoteSource(), YahooQuoteSource()]
+    missing = [symbol for symbol in stocks.values() if symbol not in returns]
+    fallback = PriceRouter(fallback_sources)
+    with span("fallback_fetch"):
+        fallback_results = fetch_all(missing, fallback.fetch) if missing and fallback_sources else {}
+    if missing:
+        print(f"🔁 Fallback served {len(fallback.served)}/{len(missing)} symbols: {fallback.report()}")
+
+    results = {}
+    events = []
+    for name, symbol in stocks.items():
+        res = returns.get(symbol)
+        if res:
+            res = {**res, "Last Updated": last_updated}
+        else:
+            res = fallback_results.get(symbol)
+        if res:
+            with span("detect_trend_change"):
+                event = detect_trend_change(symbol, res.get("Trend"), old_trends, res, baseline_date)
+            if event:
+                events.append(event)
+        else:
+            print(f"No data for {name} ({symbol})")
+            res = {"Error": "Data not found", "Trend": None}
+        results[name] = {"Symbol": normalize_symbol(symbol), **res}
+
+    with span("trend_history_columns"):
+        add_history_columns(results, trend_history, now)
+
+    # Export results to Excel inside "result" folder, final layout in one streaming pass
+    excelName = os.path.join(result_dir, f"Stock-List_{date_str}.xlsx")
+    with span("write_stock_report"):
+        write_stock_report(excelName, results, old_trends)
+
+    # Save trends for next run (for future monthly comparisons)
+    with span("save_previous_trends"):
+        save_previous_trends(filename)
+        append_run(date_str, results, history_path)
+
+    # Trend flips go to the append-only event log and any configured alert sinks
+    with span("publish_trend_events"):
+        stream = EventStream(EventLog(os.path.join(previous_dir, TREND_EVENTS_FILE)),
+                             sinks_from_env() if event_sinks is None else event_sinks)
+        published = stream.publish(events)
+    metrics.count("trend_flips", len(published))
+
+    # Machine-readable timings next to the report so regressions show month to month
+    metrics.count("symbols", len(stocks))
+    metrics.count("symbols_missing", sum(1 for res in results.values() if "Error" in res))
+    metricsName = metrics.write(os.path.join(result_dir, f"Stock-List_{date_str}.metrics.json"))
+
+    print(f"\n✅ {excelName} created!")
+    print(f"📊 Trends compared against: {baseline_date or 'nothing (no baseline found)'}")
+    print(f"💾 Current trends saved to: {filename} and {history_path}")
+    print(f"🔔 Trend flips published: {len(published)}")
+    print(f"⏱️ Run metrics saved to: {metricsName}")
+    return excelName
+
+
+def run_variants(universe_paths, variants, rules_path=RULES_PATH, now=None, indicators=False, workers=1,
+                 archive_path=None):
+    """
+    One report per universe x rule variant. The default universe with the
+    default rule writes to result/ and previousdata/ as always; every other
+    pair gets its own <universe>-<variant> subfolder (and trend baseline).
+    Prices are synced once: later runs read the store synced the same day.
+    """
+    rules = load_rules(rules_path)
+    unknown = [v for v in variants if v not in rules]
+    if unknown:
+        raise ValueError(f"Unknown rule variant(s) {unknown}; defined: {sorted(rules)}")
+    now = now or datetime.now()
+    reports = []
+    for universe_path in universe_paths:
+        stocks = load_universe(universe_path)
+        universe_name = os.path.splitext(os.path.basename(universe_path))[0]
+        for variant in variants:
+            print(f"\n📋 Universe '{universe_name}' ({len(stocks)} stocks), rule {rules[variant]}")
+            if os.path.abspath(universe_path) == os.path.abspath(UNIVERSE_PATH) and variant == DEFAULT_VARIANT:
+                reports.append(run_report(stocks, now=now, rule=rules[variant], indicators=indicators,
+                                          workers=workers, archive_path=archive_path))
+            else:
+                tag = f"{universe_name}-{variant}"
+                reports.append(run_report(stocks, now=now, rule=rules[variant], indicators=indicators,
+                                          workers=workers, archive_path=archive_path,
+                                          result_dir=os.path.join(RESULT_DIR, tag),
+                                          previous_dir=os.path.join(PREVIOUS_DIR, tag)))
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monthly stock trend report")
+    parser.add_argument("--universe", nargs="+", default=[UNIVERSE_PATH],
+                        help="universe file(s): CSV name,symbol or JSON/TOML/YAML with a 'stocks' table")
+    parser.add_argument("--variant", nargs="+", default=[DEFAULT_VARIANT], help="rule variant(s) from --rules")
+    parser.add_argument("--rules", default=RULES_PATH, help="rules file with a 'variants' table")
+    parser.add_argument("--indicators", action="store_true", help="add technical-indicator columns to the report")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for the returns/indicator compute (0 = all cores)")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE_DIR, default=None,
+                        help=f"also append synced closes to the price archive (default {DEFAULT_ARCHIVE_DIR})")
+    args = parser.parse_args()
+    run_variants(args.universe, args.variant, args.rules, indicators=args.indicators,
+                 workers=args.workers or os.cpu_count(), archive_path=args.archive)
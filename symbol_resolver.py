@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+import re
+import time
+from collections import defaultdict
+
+import requests
+
+from nse_client import DEFAULT_HEADERS
+
+# -----------------------------
+# Company name → Yahoo ticker resolution
+# -----------------------------
+NSE_MASTER_URL = "https://archives.nseindia.com/content/equities/EQUITY_L.csv"
+DEFAULT_MASTER_PATHS = ["cache/EQUITY_L.csv"]   # NSE list; a BSE list can be added too
+DEFAULT_CACHE_PATH = "cache/symbol_cache.json"
+MASTER_MAX_AGE_DAYS = 7
+POSITIVE_TTL_DAYS = 90     # confirmed by a successful price fetch
+UNCONFIRMED_TTL_DAYS = 7   # resolved but not yet fetched successfully
+NEGATIVE_TTL_DAYS = 7      # nothing in the master and the guess failed
+FUZZY_THRESHOLD = 0.6      # Dice similarity over character trigrams
+FUZZY_MARGIN = 0.05        # best match must beat the runner-up by this much
+DAY = 86400
+
+STOP_WORDS = frozenset(["LTD", "LIMITED", "THE", "AND", "CO", "COMPANY", "CORP", "CORPORATION", "INC"])
+NON_ALNUM_RE = re.compile(r"[^A-Z0-9 ]+")
+
+
+def normalize_company(name):
+    """'Rashtriya Chemicals & Fertilizers Limited' → 'RASHTRIYA CHEMICALS FERTILIZERS'."""
+    words = NON_ALNUM_RE.sub(" ", str(name).upper().replace("&", " AND ")).split()
+    return " ".join(w for w in words if w not in STOP_WORDS)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def read_master(path):
+    """
+    [(company name, yahoo symbol)] from an NSE EQUITY_L.csv (SYMBOL, NAME OF
+    COMPANY) or a BSE equity list (Security Id, Security Name/Issuer Name).
+    """
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.DictReader(f)
+        fields = {name.strip().upper(): name for name in reader.fieldnames or []}
+        if "SYMBOL" in fields and "NAME OF COMPANY" in fields:
+            sym_key, name_key, suffix = fields["SYMBOL"], fields["NAME OF COMPANY"], ".NS"
+        elif "SECURITY ID" in fields:
+            sym_key, suffix = fields["SECURITY ID"], ".BO"
+            name_key = fields.get("SECURITY NAME") or fields.get("ISSUER NAME")
+        else:
+            raise ValueError(f"Unrecognised instrument master columns in {path}")
+        return [
+            (row[name_key].strip(), row[sym_key].strip().upper() + suffix)
+            for row in reader
+            if row.get(sym_key) and row.get(name_key)
+        ]
+
+
+def download_nse_master(path, url=NSE_MASTER_URL, timeout=30):
+    response = requests.get(url, headers={**DEFAULT_HEADERS, "Accept": "text/csv"}, timeout=timeout)
+    response.raise_for_status()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp, path)
+    return path
+
+
+class SymbolResolver:
+    """
+    Resolves sheet company names to Yahoo symbols from memory: manual
+    overrides, then a persistent cache of earlier answers (including known
+    misses), then the instrument master by symbol, normalized name and
+    trigram similarity, then a first-word guess. Callers report fetch
+    outcomes with confirm()/reject() and persist them with save().
+    """
+
+    def __init__(self, master_paths=DEFAULT_MASTER_PATHS, cache_path=DEFAULT_CACHE_PATH,
+                 overrides=None, refresh_master=True, clock=time.time):
+        self.cache_path = cache_path
+        self.overrides = {normalize_company(k): v for k, v in (overrides or {}).items()}
+        self.clock = clock
+        self.by_symbol = {}
+        self.by_name = {}
+        self.names = []                    # (normalized name, symbol, trigrams)
+        self.postings = defaultdict(list)  # trigram → positions in self.names
+        self.cache = self._load_cache()
+        self.dirty = False
+        for path in master_paths:
+            self._load_master(path, refresh_master and path == DEFAULT_MASTER_PATHS[0])
+
+    def _load_master(self, path, refresh):
+        stale = not os.path.exists(path) or self.clock() - os.path.getmtime(path) > MASTER_MAX_AGE_DAYS * DAY
+        if refresh and stale:
+            try:
+                download_nse_master(path)
+                print(f"📥 Instrument master refreshed: {path}")
+            except Exception as e:
+                print(f"⚠️ Could not refresh instrument master → {e}")
+        if not os.path.exists(path):
+            return
+        try:
+            entries = read_master(path)
+        except Exception as e:
+            print(f"⚠️ Skipping instrument master {path} → {e}")
+            return
+        for company, symbol in entries:
+            self.by_symbol.setdefault(symbol.rsplit(".", 1)[0], symbol)
+            key = normalize_company(company)
+            if key and key not in self.by_name:
+                self.by_name[key] = symbol
+                grams = trigrams(key)
+                for gram in grams:
+                    self.postings[gram].append(len(self.names))
+                self.names.append((key, symbol, grams))
+
+    @property
+    def has_master(self):
+        return bool(self.by_symbol)
+
+    def fuzzy(self, key):
+        """Best master symbol by trigram Dice similarity, or None if unclear."""
+        grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for pos in self.postings.get(gram, ()):
+                shared[pos] += 1
+        scored = sorted(
+            ((2 * n / (len(grams) + len(self.names[pos][2])), pos) for pos, n in shared.items()),
+            reverse=True,
+        )
+        if not scored or scored[0][0] < FUZZY_THRESHOLD:
+            return None
+        if len(scored) > 1 and scored[0][0] - scored[1][0] < FUZZY_MARGIN:
+            return None
+        return self.names[scored[0][1]][1]
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _remember(self, key, symbol, ttl_days, source):
+        self.cache[key] = {"symbol": symbol, "source": source, "expires": self.clock() + ttl_days * DAY}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        now = self.clock()
+        live = {k: v for k, v in self.cache.items() if v.get("expires", 0) > now}
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(live, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.cache_path)
+        self.dirty = False
+
+    def resolve(self, name):
+        """Yahoo symbol for a company name; None for a known miss."""
+        key = normalize_company(name)
+        if key in self.overrides:
+            return self.overrides[key]
+
+        cached = self.cache.get(key)
+        if cached and cached.get("expires", 0) > self.clock():
+            return cached["symbol"]
+
+        first_word = str(name).split(" ")[0].upper()
+        symbol, source = None, None
+        if " " not in key and key in self.by_symbol:
+            symbol, source = self.by_symbol[key], "symbol"
+        elif key in self.by_name:
+            symbol, source = self.by_name[key], "name"
+        elif self.names:
+            symbol, source = self.fuzzy(key), "fuzzy"
+        if symbol is None and (not self.has_master or first_word in self.by_symbol):
+            # Fallback guess → first word + ".NS" (checked against the master when there is one)
+            symbol, source = first_word + ".NS", "guess"
+
+        if symbol:
+            self._remember(key, symbol, UNCONFIRMED_TTL_DAYS, source)
+        else:
+            self._remember(key, None, NEGATIVE_TTL_DAYS, "miss")
+        return symbol
+
+    def resolve_many(self, names):
+        return {name: self.resolve(name) for name in dict.fromkeys(names)}
+
+    def confirm(self, name, symbol):
+        """A price fetch for `symbol` worked: keep the resolution for longer."""
+        key = normalize_company(name)
+        if key not in self.overrides:
+            source = (self.cache.get(key) or {}).get("source", "confirmed")
+            self._remember(key, symbol, POSITIVE_TTL_DAYS, source)
+
+    def reject(self, name):
+        """No source had data for the resolved symbol: remember the miss."""
+        key = normalize_company(name)
+        if key not in self.overrides:
+            self._remember(key, None, NEGATIVE_TTL_DAYS, "rejected")
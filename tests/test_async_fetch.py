@@ -0,0 +1,140 @@
+"""
+fetch_all_async against a local HTTP server that throttles (429), fails
+(5xx) and rejects (404) on a per-symbol script.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import async_fetch
+from async_fetch import TokenBucket, fetch_all, is_retryable
+
+HANDLER_DELAY = 0.05
+
+
+class FakeQuoteServer:
+    """/quote/<symbol> answers from `script[symbol]` (a list of statuses, last one repeats)."""
+
+    def __init__(self, script):
+        self.script = {symbol: list(statuses) for symbol, statuses in script.items()}
+        self.hits = {}
+        self.times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                symbol = self.path.rsplit("/", 1)[-1]
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    server.hits[symbol] = server.hits.get(symbol, 0) + 1
+                    server.times.append(time.monotonic())
+                    statuses = server.script.get(symbol, [200])
+                    status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+                time.sleep(HANDLER_DELAY)
+                # Leave the count before replying: once the client has the body it may start the next request
+                with server.lock:
+                    server.in_flight -= 1
+                body = f'{{"symbol": "{symbol}", "price": 100}}'.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/quote/"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def fetch(self, symbol):
+        response = requests.get(self.url + symbol, timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    delays = []
+
+    def backoff(attempt):
+        delays.append(attempt)
+        return 0.01
+
+    monkeypatch.setattr(async_fetch, "backoff_delay", backoff)
+    return delays
+
+
+def test_concurrency_cap(fast_backoff):
+    symbols = [f"S{i}" for i in range(12)]
+    with FakeQuoteServer({}) as server:
+        results = fetch_all(symbols, server.fetch, concurrency=3, rate=1000, burst=1000)
+    assert all(results[s]["symbol"] == s for s in symbols)
+    assert server.max_in_flight == 3
+
+
+def test_token_bucket_paces_requests(fast_backoff):
+    symbols = [f"S{i}" for i in range(10)]
+    with FakeQuoteServer({}) as server:
+        start = time.monotonic()
+        fetch_all(symbols, server.fetch, concurrency=10, rate=20, burst=2)
+        elapsed = time.monotonic() - start
+    # 2 requests go at once, the other 8 wait for tokens at 20/s
+    assert elapsed >= 8 / 20 * 0.9
+    first = sorted(server.times)
+    assert first[-1] - first[0] >= 8 / 20 * 0.9
+
+
+def test_retries_throttling_and_server_errors_only(fast_backoff):
+    script = {
+        "THROTTLED": [429, 429, 200],
+        "FLAKY": [503, 200],
+        "MISSING": [404],
+        "DOWN": [500],
+    }
+    with FakeQuoteServer(script) as server:
+        results = fetch_all(list(script), server.fetch, concurrency=4, rate=1000, burst=1000, retries=3)
+    assert results["THROTTLED"]["symbol"] == "THROTTLED"
+    assert results["FLAKY"]["symbol"] == "FLAKY"
+    assert results["MISSING"] is None
+    assert results["DOWN"] is None
+    assert server.hits == {"THROTTLED": 3, "FLAKY": 2, "MISSING": 1, "DOWN": 3}
+    # one backoff per retried attempt: 2 (429s) + 1 (503) + 2 (500s)
+    assert len(fast_backoff) == 5
+
+
+def test_token_bucket_refill_with_fake_clock():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    bucket.tokens = 0
+    now[0] = 0.25
+    bucket._refill()
+    assert bucket.tokens == pytest.approx(0.5)
+    now[0] = 10
+    bucket._refill()
+    assert bucket.tokens == 2
+
+
+def test_requests_network_errors_are_retryable():
+    assert is_retryable(requests.exceptions.ConnectionError("connection reset"))
+    assert is_retryable(requests.exceptions.ReadTimeout("read timed out"))
+    assert is_retryable(requests.exceptions.ConnectTimeout("connect timed out"))
+    not_found = requests.Response()
+    not_found.status_code = 404
+    assert not is_retryable(requests.exceptions.HTTPError("404", response=not_found))
@@ -0,0 +1,52 @@
+"""
+Backfill snapshots: a symbol with too little history for the trend
+horizon is written as null and left out of the trend history.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from backfill import backfill, sweep
+from price_archive import PriceArchive
+from price_panel import PricePanel
+from returns import DEFAULT_RULE
+from script import TREND_HISTORY_FILE
+from trend_history import load_history
+
+RUN = pd.Timestamp("2026-06-01")
+
+
+def panel():
+    dates = pd.bdate_range(end=RUN - pd.Timedelta(days=1), periods=200).to_numpy().astype("datetime64[D]")
+    values = np.full((len(dates), 2), np.nan)
+    values[:, 0] = np.linspace(100, 150, len(dates))     # LONG.NS: steady climb, Bullish
+    values[-20:, 1] = 50.0                                # SHORT.NS: listed four weeks ago
+    return PricePanel(dates, ["LONG.NS", "SHORT.NS"], values)
+
+
+def test_short_history_has_no_trend():
+    frame = sweep(panel(), [RUN], DEFAULT_RULE)[RUN]
+    assert frame.loc["LONG.NS", "Trend"] == "Bullish"
+    assert frame.loc["SHORT.NS", "Trend"] is None
+
+
+def test_short_history_round_trips_as_null(tmp_path):
+    archive = os.path.join(tmp_path, "archive")
+    PriceArchive(archive).write(panel())
+    previous = os.path.join(tmp_path, "previousdata")
+    stocks = {"Long Ltd": "LONG.NS", "Short Ltd": "SHORT.NS"}
+
+    assert backfill(RUN, RUN, stocks, DEFAULT_RULE, source="archive", previous_dir=previous,
+                    archive_path=archive) == ["2026-06-01"]
+
+    path = os.path.join(previous, "previous_trends_2026-06-01.json")
+    with open(path) as f:
+        text = f.read()
+    assert "NaN" not in text
+    assert json.loads(text) == {"LONG": "Bullish", "SHORT": None}
+
+    history = load_history(os.path.join(previous, TREND_HISTORY_FILE))
+    assert history["symbol"].tolist() == ["LONG"]
+    assert history["trend"].tolist() == ["Bullish"]
@@ -0,0 +1,93 @@
+"""
+fetch_histories against a fake grouped downloader: chunking, retrying a
+chunk's missing symbols, and the per-symbol fallback for what is left.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_fetch
+from batch_fetch import fetch_histories
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+INDEX = pd.bdate_range("2026-09-01", periods=5)
+
+
+def history(price):
+    closes = np.full(len(INDEX), price)
+    return pd.DataFrame({field: closes for field in FIELDS}, index=INDEX)
+
+
+class FakeDownloader:
+    """
+    Wide (ticker, field) frames like yf.download(group_by="ticker").
+    `flaky` symbols are left out of their first `misses` requests,
+    `broken` chunks raise once, `absent` symbols never come back.
+    """
+
+    def __init__(self, flaky=(), misses=1, absent=(), raise_first=False):
+        self.flaky = set(flaky)
+        self.misses = misses
+        self.absent = set(absent)
+        self.raise_first = raise_first
+        self.calls = []
+
+    def __call__(self, symbols, period=None, interval=None, start=None):
+        self.calls.append(list(symbols))
+        if self.raise_first and len(self.calls) == 1:
+            raise ConnectionError("chunk request failed")
+        served = [s for s in symbols if s not in self.absent
+                  and not (s in self.flaky and self.calls_with(s) <= self.misses)]
+        if not served:
+            return pd.DataFrame()
+        return pd.concat({s: history(100.0 + i) for i, s in enumerate(served)}, axis=1)
+
+    def calls_with(self, symbol):
+        return sum(symbol in call for call in self.calls)
+
+
+class FakeSingle:
+    def __init__(self, known=()):
+        self.known = set(known)
+        self.calls = []
+
+    def __call__(self, symbol, period=None, interval=None, start=None):
+        self.calls.append(symbol)
+        return history(7.0) if symbol in self.known else pd.DataFrame()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch_fetch, "RETRY_BACKOFF", 0)
+
+
+SYMBOLS = [f"S{i}.NS" for i in range(7)]
+
+
+def test_one_request_per_chunk():
+    download, single = FakeDownloader(), FakeSingle()
+    histories = fetch_histories(SYMBOLS, chunk_size=3, downloader=download, single_fetcher=single)
+    assert download.calls == [SYMBOLS[:3], SYMBOLS[3:6], SYMBOLS[6:]]
+    assert list(histories) == SYMBOLS
+    assert list(histories["S0.NS"].columns) == FIELDS
+    assert single.calls == []
+
+
+def test_retries_only_the_missing_symbols_of_a_chunk():
+    download = FakeDownloader(flaky={"S1.NS"}, misses=2, raise_first=True)
+    histories = fetch_histories(SYMBOLS[:3], chunk_size=3, retries=3, downloader=download,
+                                single_fetcher=FakeSingle())
+    # Failed request, then a response without S1, then S1 alone
+    assert download.calls == [SYMBOLS[:3], SYMBOLS[:3], ["S1.NS"]]
+    assert sorted(histories) == SYMBOLS[:3]
+
+
+def test_symbols_missing_after_retries_fall_back_to_single_fetches():
+    download = FakeDownloader(absent={"S2.NS", "S5.NS"})
+    single = FakeSingle(known={"S2.NS"})
+    histories = fetch_histories(SYMBOLS, chunk_size=4, retries=2, downloader=download, single_fetcher=single)
+    assert download.calls == [SYMBOLS[:4], ["S2.NS"], SYMBOLS[4:], ["S5.NS"]]
+    assert sorted(single.calls) == ["S2.NS", "S5.NS"]
+    assert "S5.NS" not in histories
+    assert histories["S2.NS"]["Close"].iloc[-1] == 7.0
+    assert len(histories) == len(SYMBOLS) - 1
@@ -0,0 +1,124 @@
+"""
+Monitor driven by FakeClock/FakeFeed: polls only inside market hours,
+resumes at the next open (skipping listed holidays), and sends a trend
+flip to the change sink.
+"""
+from datetime import date, datetime, timedelta
+
+import batch_fetch
+from instrumentation import metrics
+from monitor_daemon import (MARKET_CLOSE, MARKET_OPEN, MARKET_TZ, MAX_BARS, FakeClock, FakeFeed, MarketSchedule,
+                            Monitor, NSEFeed, YahooQuoteFeed)
+
+MONDAY = date(2026, 3, 2)
+HOLIDAY = date(2026, 3, 3)
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write(self, when, changes):
+        self.batches.append((when, changes))
+
+    def close(self):
+        self.closed = True
+
+    def rows(self):
+        return [change for _, change_list in self.batches for change in change_list]
+
+
+def at(day, hour, minute=0):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=MARKET_TZ)
+
+
+def flat_history(symbol, price, end, days=MAX_BARS + 5):
+    dates = [end - timedelta(days=k) for k in range(days * 2, 0, -1)]
+    return {symbol: [(d, price) for d in dates if d.weekday() < 5][-days:]}
+
+
+def test_polls_only_during_market_hours_and_skips_holidays():
+    schedule = MarketSchedule(holidays={HOLIDAY})
+    clock = FakeClock(at(MONDAY, 7))                  # before Monday's open
+    universe = {"Alpha": "ALPHA.NS", "Beta": "BETA.NS"}
+    feed = FakeFeed(list(universe.values()), seed=1)
+    sink = ListSink()
+    monitor = Monitor(universe, feed, sink, clock=clock, schedule=schedule, interval=1800)
+    monitor.seed(feed.history(end=clock.now()))
+
+    session = 14    # 09:15 to 15:15 every 30 minutes (13), plus the last poll at 15:30
+    monitor.run(max_polls=session + 1)
+
+    times = [when for when, _ in sink.batches]
+    assert times[0] == at(MONDAY, MARKET_OPEN.hour, MARKET_OPEN.minute)
+    assert times[session - 1] == at(MONDAY, MARKET_CLOSE.hour, MARKET_CLOSE.minute)
+    assert all(schedule.is_open(when) for when in times)
+    # Tuesday is a holiday: the next poll is Wednesday's open
+    assert times[session] == at(MONDAY + timedelta(days=2), MARKET_OPEN.hour, MARKET_OPEN.minute)
+    assert sink.closed
+    # A random walk moves every symbol, so every poll writes both rows
+    assert all(len(changes) == 2 for _, changes in sink.batches)
+
+
+def test_trend_flip_reaches_the_sink_once():
+    clock = FakeClock(at(MONDAY, 10))
+    feed = FakeFeed(["ALPHA.NS", "BETA.NS"], volatility=0)
+    sink = ListSink()
+    monitor = Monitor({"Alpha": "ALPHA.NS", "Beta": "BETA.NS"}, feed, sink, clock=clock)
+    monitor.seed({**flat_history("ALPHA.NS", 100.0, MONDAY), **flat_history("BETA.NS", 50.0, MONDAY)})
+    assert monitor.last_rows["ALPHA.NS"]["Trend"] == "Neutral"
+    feed.prices = {"ALPHA.NS": 100.0, "BETA.NS": 50.0}
+
+    assert monitor.poll_once() == []                   # unchanged prices write nothing
+
+    feed.prices["ALPHA.NS"] = 115.0                    # +15% over three months
+    clock.current += timedelta(minutes=1)
+    changes = monitor.poll_once()
+    assert [(c["Symbol"], c["Trend"], c["Trend Change"]) for c in changes] == \
+        [("ALPHA.NS", "Bullish", "Neutral → Bullish")]
+
+    feed.prices["ALPHA.NS"] = 116.0                    # still bullish: a row, but no flip
+    clock.current += timedelta(minutes=1)
+    changes = monitor.poll_once()
+    assert [c["Trend Change"] for c in changes] == [""]
+    assert [c["Symbol"] for c in sink.rows() if c["Trend Change"]] == ["ALPHA.NS"]
+
+
+class StubClient:
+    def __init__(self):
+        self.asked = []
+
+    def last_prices(self, symbols):
+        self.asked.extend(symbols)
+        return {symbol: 10.0 for symbol in symbols}
+
+
+class StubFeed:
+    def __init__(self):
+        self.asked = []
+
+    def latest(self, symbols):
+        self.asked.extend(symbols)
+        return {symbol: 20.0 for symbol in symbols}
+
+
+def test_nse_feed_never_sends_other_exchanges_to_nse():
+    client = StubClient()
+    assert NSEFeed(client).latest(["AAA.NS", "BBB.BO", "CCC"]) == {"AAA.NS": 10.0, "CCC": 10.0}
+    assert client.asked == ["AAA", "CCC"]
+
+    client, other = StubClient(), StubFeed()
+    prices = NSEFeed(client, other=other).latest(["AAA.NS", "BBB.BO"])
+    assert prices == {"AAA.NS": 10.0, "BBB.BO": 20.0}
+    assert client.asked == ["AAA"]
+    assert other.asked == ["BBB.BO"]
+
+
+def test_yahoo_quote_polls_leave_the_run_metrics_alone(monkeypatch):
+    monkeypatch.setattr(batch_fetch, "yahoo_last_price", lambda symbol: 42.0)
+    metrics.reset()
+    feed = YahooQuoteFeed()
+    for _ in range(5):
+        assert feed.latest(["AAA.BO", "BBB.BO"]) == {"AAA.BO": 42.0, "BBB.BO": 42.0}
+    assert not metrics.histograms and not metrics.slowest
@@ -0,0 +1,43 @@
+"""
+Test.apply_results: history rows write their returns, price-only quotes
+(NSE or Yahoo) clear the sheet's old returns, misses keep them.
+"""
+import pandas as pd
+
+from Test import apply_results
+
+OLD = {"Current Price (₹)": 90.0, "1W %": 1.0, "2W %": 2.0, "1M %": 3.0, "6M %": 4.0, "YTD %": 15.0,
+       "Trend": "Bullish", "Last Updated": "01-09-2026"}
+RETURNS = ["1W %", "2W %", "1M %", "6M %", "YTD %"]
+
+
+def sheet(n):
+    df = pd.DataFrame({"Stock Name": [f"Company {i}" for i in range(n)]})
+    df["Symbol"] = None
+    for col, value in OLD.items():
+        df[col] = [value] * n
+    return df
+
+
+def test_quote_rows_clear_returns_for_every_quote_source():
+    rows = [(0, "Company 0", "HIST.NS"), (1, "Company 1", "NSEQ.NS"), (2, "Company 2", "YQ.BO"),
+            (3, "Company 3", "MISS.NS")]
+    quote = {"Current Price (₹)": 120.0, "Last Updated": "01-10-2026"}
+    results = {
+        "HIST.NS": {"Current Price (₹)": 110.0, "1W %": 0.5, "2W %": 1.5, "1M %": 2.5, "6M %": 3.5,
+                    "YTD %": -12.0, "Last Updated": "01-10-2026"},
+        "NSEQ.NS": dict(quote),
+        "YQ.BO": dict(quote),
+    }
+    served = {"HIST.NS": "yahoo", "NSEQ.NS": "nse", "YQ.BO": "yahoo_quote"}
+    df = apply_results(sheet(4), rows, results, served)
+
+    assert df.loc[0, "YTD %"] == -12.0 and df.loc[0, "Trend"] == "Bearish"
+    for idx in (1, 2):
+        assert df.loc[idx, "Current Price (₹)"] == 120.0
+        assert df.loc[idx, RETURNS].isna().all()
+        assert df.loc[idx, "Trend"] == "Unknown"
+        assert df.loc[idx, "Last Updated"] == "01-10-2026"
+    # A miss keeps the old numbers
+    assert df.loc[3, "Current Price (₹)"] == 90.0 and df.loc[3, "Error"] == "Data not found"
+    assert df["Symbol"].tolist() == ["HIST.NS", "NSEQ.NS", "YQ.BO", "MISS.NS"]
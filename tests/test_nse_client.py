@@ -0,0 +1,157 @@
+"""
+NSEClient against a local server that mimics the NSE cookie handshake:
+the homepage sets a cookie, the quote API answers 401/403 until the
+request carries the current one.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nse_client import QUOTE_PATH, NSEClient
+
+HANDLER_DELAY = 0.02
+COOKIE = "nsit"
+
+
+class FakeNSE:
+    """Homepage hands out cookie `token-<n>`; expire() makes the quote API reject it with `reject_status`."""
+
+    def __init__(self, reject_status=401, unknown=()):
+        self.reject_status = reject_status
+        self.unknown = set(unknown)
+        self.token = 0
+        self.homepage_hits = 0
+        self.quote_hits = 0
+        self.rejected = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, so connection reuse is visible
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                if path == "/":
+                    with server.lock:
+                        server.homepage_hits += 1
+                        server.token += 1
+                        token = server.token
+                    time.sleep(HANDLER_DELAY)
+                    self.reply(200, b"<html>home</html>", cookie=f"{COOKIE}=token-{token}; Path=/")
+                    return
+                if path != QUOTE_PATH:
+                    self.reply(404, b"{}")
+                    return
+                symbol = query.partition("symbol=")[2]
+                with server.lock:
+                    server.quote_hits += 1
+                    accepted = f"{COOKIE}=token-{server.token}" in (self.headers.get("Cookie") or "")
+                    if not accepted:
+                        server.rejected += 1
+                time.sleep(HANDLER_DELAY)
+                if not accepted:
+                    self.reply(server.reject_status, b'{"error": "unauthorized"}')
+                elif symbol in server.unknown:
+                    self.reply(404, b"{}")
+                else:
+                    self.reply(200, f'{{"info": {{"symbol": "{symbol}"}}, "priceInfo": {{"lastPrice": 100.5}}}}'.encode())
+
+            def reply(self, status, body, cookie=None):
+                self.send_response(status)
+                if cookie:
+                    self.send_header("Set-Cookie", cookie)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def expire(self):
+        """Invalidate every cookie handed out so far."""
+        with self.lock:
+            self.token += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run_concurrently(fn, threads=8):
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        fn()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+
+SYMBOLS = [f"SYM{i}" for i in range(12)]
+
+
+def test_warm_up_runs_once_across_concurrent_callers():
+    with FakeNSE() as server, NSEClient(server.url) as client:
+        run_concurrently(client.warm_up)
+        assert server.homepage_hits == 1
+        assert client.generation == 1
+
+        prices = client.last_prices(SYMBOLS, workers=4)
+        assert prices == {symbol: 100.5 for symbol in SYMBOLS}
+        assert server.homepage_hits == 1
+        assert server.rejected == 0
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_cookies_refresh_once_per_generation(status):
+    with FakeNSE(reject_status=status) as server, NSEClient(server.url) as client:
+        client.warm_up()
+        server.expire()
+
+        prices = client.last_prices(SYMBOLS, workers=4)
+        assert prices == {symbol: 100.5 for symbol in SYMBOLS}
+        # Several workers saw the rejection, one of them reloaded the homepage
+        assert server.rejected >= 1
+        assert server.homepage_hits == 2
+        assert client.generation == 2
+
+
+def test_other_errors_do_not_refresh_cookies():
+    with FakeNSE(unknown={"GONE"}) as server, NSEClient(server.url) as client:
+        prices = client.last_prices(["GONE", "SYM1"], workers=2)
+        assert prices == {"GONE": None, "SYM1": 100.5}
+        assert server.homepage_hits == 1
+        assert client.generation == 1
+
+
+def test_pooled_session_reuses_connections():
+    with FakeNSE() as server, NSEClient(server.url, pool_size=4) as client:
+        for symbol in SYMBOLS:
+            client.last_price(symbol)
+        assert server.connections == 1    # homepage and every quote on one keep-alive connection
+
+        client.last_prices([f"MORE{i}" for i in range(40)], workers=4)
+        assert server.connections <= 4    # never more than the pool holds
+        assert server.quote_hits == len(SYMBOLS) + 40
@@ -0,0 +1,59 @@
+"""
+Price archive rebasing: when the store reports a re-adjusted symbol (a
+split or dividend changed its whole series), the archived years the fetch
+did not cover move onto the new price basis instead of keeping the old one.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from price_archive import PriceArchive, archive_histories
+from price_panel import PricePanel
+
+OLD = pd.bdate_range("2025-01-01", "2026-06-30")
+FETCHED = pd.bdate_range("2025-10-01", "2026-09-30")
+
+
+def frame(index, close):
+    return pd.DataFrame({"Close": np.full(len(index), close)}, index=index)
+
+
+def seed(path):
+    values = np.column_stack([np.full(len(OLD), 200.0), np.full(len(OLD), 80.0)])
+    PriceArchive(path).write(PricePanel(OLD.to_numpy(), ["SPLIT.NS", "PLAIN.NS"], values))
+
+
+def column(path, symbol):
+    return PriceArchive(path).panel([symbol]).values[:, 0]
+
+
+def test_readjusted_symbol_is_rebased_across_the_whole_column(tmp_path):
+    path = os.path.join(tmp_path, "archive")
+    seed(path)
+    # 2:1 split: the refetched year comes back halved, including the bars before the split
+    histories = {"SPLIT.NS": frame(FETCHED, 100.0), "PLAIN.NS": frame(FETCHED, 80.0)}
+    archive_histories(histories, path, readjusted=["SPLIT.NS"])
+
+    split = column(path, "SPLIT.NS")
+    assert len(split) == len(OLD.union(FETCHED))
+    assert np.all(split == 100.0)                 # 2025 rows included
+    assert np.all(column(path, "PLAIN.NS") == 80.0)
+
+
+def test_without_the_readjust_flag_old_rows_keep_their_basis(tmp_path):
+    path = os.path.join(tmp_path, "archive")
+    seed(path)
+    archive_histories({"SPLIT.NS": frame(FETCHED, 100.0)}, path)
+    split = column(path, "SPLIT.NS")
+    assert set(np.unique(split)) == {100.0, 200.0}
+
+
+def test_no_shared_bar_clears_the_old_basis(tmp_path):
+    path = os.path.join(tmp_path, "archive")
+    seed(path)
+    later = pd.bdate_range("2026-08-01", "2026-09-30")
+    archive_histories({"SPLIT.NS": frame(later, 100.0)}, path, readjusted=["SPLIT.NS"])
+    split = column(path, "SPLIT.NS")
+    assert np.all(split[~np.isnan(split)] == 100.0)
+    assert np.count_nonzero(~np.isnan(split)) == len(later)
@@ -0,0 +1,84 @@
+"""
+PriceRouter ordering: tiers first, health within a tier, cool-down after
+repeated failures. Sources are fakes driven by a fake clock.
+"""
+from price_sources import QUOTE_TIER, STALE_TIER, PriceRouter, PriceSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSource(PriceSource):
+    """Takes `latency` fake seconds per call; raises while `failing`."""
+
+    def __init__(self, name, clock, tier=QUOTE_TIER, latency=0.1, failing=False):
+        self.name = name
+        self.tier = tier
+        self.clock = clock
+        self.latency = latency
+        self.failing = failing
+        self.calls = 0
+
+    def fetch(self, symbol):
+        self.calls += 1
+        self.clock.now += self.latency
+        if self.failing:
+            raise ConnectionError(f"{self.name} down")
+        return {"Current Price (₹)": 100.0, "source": self.name}
+
+
+def names(router):
+    return [source.name for source in router.ranked()]
+
+
+def test_faster_source_of_a_shared_tier_moves_ahead():
+    clock = FakeClock()
+    slow = FakeSource("slow", clock, latency=2.0)
+    fast = FakeSource("fast", clock, latency=0.1)
+    router = PriceRouter([slow, fast], clock=clock)
+
+    assert router.fetch("A")["source"] == "slow"     # both untried: listed order
+    assert names(router) == ["fast", "slow"]          # slow has a latency, fast is still untried
+    for symbol in "BCDE":
+        assert router.fetch(symbol)["source"] == "fast"
+    assert slow.calls == 1
+
+
+def test_errors_demote_within_a_tier_but_never_across_tiers():
+    clock = FakeClock()
+    flaky = FakeSource("flaky", clock, latency=0.1)
+    steady = FakeSource("steady", clock, latency=0.3)
+    stale = FakeSource("stale", clock, tier=STALE_TIER, latency=0.001)
+    router = PriceRouter([flaky, steady, stale], clock=clock)
+
+    assert router.fetch("A")["source"] == "flaky"
+    router.fetch("B")                                  # steady gets measured too
+    assert names(router) == ["flaky", "steady", "stale"]
+
+    flaky.failing = True
+    for symbol in "CD":
+        assert router.fetch(symbol)["source"] == "steady"   # failed over within the tier
+    assert names(router) == ["steady", "flaky", "stale"]   # error rate now outweighs its speed
+    assert names(router)[-1] == "stale"               # fastest of all, still last
+
+
+def test_repeated_failures_bench_a_source_until_the_cooldown_ends():
+    clock = FakeClock()
+    down = FakeSource("down", clock, failing=True)
+    up = FakeSource("up", clock, tier=STALE_TIER)
+    router = PriceRouter([down, up], clock=clock, cooldown=60, failure_threshold=2)
+
+    for symbol in "AB":
+        assert router.fetch(symbol)["source"] == "up"
+    assert names(router) == ["up"]
+    assert router.report()["down"]["cooling_down"]
+
+    clock.now += 61
+    down.failing = False
+    assert router.fetch("C")["source"] == "down"
+    assert router.served == {"A": "up", "B": "up", "C": "down"}
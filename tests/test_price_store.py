@@ -0,0 +1,68 @@
+"""
+sync_store against a fake fetch: only symbols that are current (synced
+today or just now) are served, never old stored bars.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore, sync_store
+
+TODAY = datetime(2026, 10, 1)
+
+
+def history(start, end, close=100.0):
+    index = pd.bdate_range(start, end)
+    closes = np.full(len(index), close)
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes,
+                         "Volume": np.ones(len(index))}, index=index)
+
+
+class FakeFetch:
+    """Returns `answers[symbol]` sliced from the requested start (missing symbols: nothing)."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, symbols, start=None, period=None, **kwargs):
+        self.calls.append((list(symbols), start, period))
+        out = {}
+        for symbol in symbols:
+            hist = self.answers.get(symbol)
+            if hist is not None:
+                out[symbol] = hist[hist.index >= pd.Timestamp(start)] if start else hist
+        return out
+
+
+def test_symbols_without_new_bars_are_not_served(tmp_path):
+    store = PriceStore(os.path.join(tmp_path, "prices.sqlite"))
+    store.write("LIVE.NS", history("2026-06-01", "2026-08-21"))
+    store.write("GONE.NS", history("2026-06-01", "2026-08-21"))    # 40 days before TODAY
+
+    fetch = FakeFetch({"LIVE.NS": history("2026-06-01", "2026-09-30"),
+                       "NEW.NS": history("2026-01-01", "2026-09-30")})
+    histories = sync_store(store, ["LIVE.NS", "GONE.NS", "NEW.NS"], fetch=fetch, today=TODAY)
+
+    assert sorted(histories) == ["LIVE.NS", "NEW.NS"]
+    assert histories["LIVE.NS"].index[-1] == pd.Timestamp("2026-09-30")
+    panel = sync_store(store, ["LIVE.NS", "GONE.NS", "NEW.NS"], fetch=fetch, today=TODAY, as_panel=True)
+    assert panel.symbols == ["LIVE.NS", "NEW.NS"]
+    # The second call found LIVE/NEW synced today; only GONE was asked for again
+    assert fetch.calls[-1][0] == ["GONE.NS"]
+    store.close()
+
+
+def test_readjusted_symbols_are_reported(tmp_path):
+    store = PriceStore(os.path.join(tmp_path, "prices.sqlite"))
+    store.write("SPLIT.NS", history("2026-06-01", "2026-09-25", close=200.0))
+    store.write("PLAIN.NS", history("2026-06-01", "2026-09-25"))
+    fetch = FakeFetch({"SPLIT.NS": history("2025-10-01", "2026-09-30", close=100.0),
+                       "PLAIN.NS": history("2025-10-01", "2026-09-30")})
+    readjusted = []
+    histories = sync_store(store, ["SPLIT.NS", "PLAIN.NS"], fetch=fetch, today=TODAY, readjusted=readjusted)
+    assert readjusted == ["SPLIT.NS"]
+    assert (histories["SPLIT.NS"]["Close"] == 100.0).all()      # refetched in full, old basis replaced
+    store.close()
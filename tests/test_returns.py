@@ -0,0 +1,58 @@
+"""
+Test.returns_from_history, now built on returns.compute_returns, against
+the per-symbol pct() closure it replaced, on random histories (short ones,
+ones without a bar this year, flat ones) with tz-aware indexes.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Test import returns_from_history
+
+
+def legacy_returns_from_history(symbol, hist):
+    """The old Test.py/get_returns_yahoo body, verbatim apart from the copy."""
+    hist = hist.copy()
+    if hist.index.tz is not None:
+        hist.index = hist.index.tz_localize(None)
+    current = hist['Close'].iloc[-1]
+
+    def pct(days):
+        if len(hist) > days:
+            return (current / hist['Close'].iloc[-days] - 1) * 100
+        return None
+
+    start_year = datetime(datetime.today().year, 1, 1)
+    ytd_data = hist[hist.index >= start_year]
+    ytd_price = ytd_data['Close'].iloc[0] if not ytd_data.empty else None
+
+    return {
+        "Current Price (₹)": round(float(current), 2),
+        "1W %": round(pct(5), 2) if pct(5) else None,
+        "2W %": round(pct(10), 2) if pct(10) else None,
+        "1M %": round(pct(21), 2) if pct(21) else None,
+        "6M %": round(pct(126), 2) if pct(126) else None,
+        "YTD %": round((current / ytd_price - 1) * 100, 2) if ytd_price else None,
+        "Last Updated": datetime.today().strftime("%d-%m-%Y")
+    }
+
+
+def random_history(rng, days, end, flat=False):
+    index = pd.bdate_range(end=end, periods=days).tz_localize("Asia/Kolkata")
+    steps = np.zeros(days) if flat else rng.normal(0, 0.02, days)
+    closes = np.round(100 * rng.lognormal(0, 1) * np.exp(np.cumsum(steps)), 2)
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes}, index=index)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_the_per_symbol_closure(seed):
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.today().normalize()
+    cases = [random_history(rng, days, today) for days in (1, 4, 6, 11, 22, 60, 127, 130, 260)]
+    cases.append(random_history(rng, 200, today, flat=True))                              # zero moves
+    cases.append(random_history(rng, 150, pd.Timestamp(today.year - 1, 12, 15)))         # nothing this year
+    for i, hist in enumerate(cases):
+        symbol = f"SYM{i}.NS"
+        assert returns_from_history(symbol, hist) == legacy_returns_from_history(symbol, hist), (seed, i)
@@ -0,0 +1,65 @@
+"""
+EventStream delivery: events logged once, and a sink that fails keeps
+its undelivered events in an outbox until a later run succeeds.
+"""
+import os
+
+from trend_events import EventLog, EventSink, EventStream, trend_event
+
+
+class RecordingSink(EventSink):
+    """Accepts batches into `received`; the first `failures` sends, and batches holding `refuse`, raise."""
+
+    def __init__(self, name, failures=0, batch_size=None, refuse=()):
+        super().__init__(batch_size)
+        self.name = name
+        self.failures = failures
+        self.refuse = set(refuse)
+        self.received = []
+
+    def send(self, batch):
+        if self.failures or any(event["symbol"] in self.refuse for event in batch):
+            self.failures = max(self.failures - 1, 0)
+            raise ConnectionError(f"{self.name} unreachable")
+        self.received.extend(event["id"] for event in batch)
+
+
+def flip(symbol, old="Bearish", new="Bullish"):
+    return trend_event(symbol, old, new, baseline="2026-09-01")
+
+
+def stream(tmp_path, *sinks):
+    return EventStream(EventLog(os.path.join(tmp_path, "trend_events.jsonl")), sinks)
+
+
+def test_failed_sink_gets_its_events_on_the_next_run(tmp_path):
+    down, up = RecordingSink("webhook", failures=1), RecordingSink("jsonl")
+    events = [flip("AAA"), flip("BBB")]
+    assert stream(tmp_path, down, up).publish(events) == events
+    assert down.received == []
+    assert up.received == ["AAA:Bearish>Bullish:2026-09-01", "BBB:Bearish>Bullish:2026-09-01"]
+    assert os.path.exists(os.path.join(tmp_path, "trend_events.webhook.outbox.jsonl"))
+
+    # Next run: no new flips, the webhook is back
+    down, up = RecordingSink("webhook"), RecordingSink("jsonl")
+    assert stream(tmp_path, down, up).publish(events) == []
+    assert down.received == ["AAA:Bearish>Bullish:2026-09-01", "BBB:Bearish>Bullish:2026-09-01"]
+    assert up.received == []
+    assert not os.path.exists(os.path.join(tmp_path, "trend_events.webhook.outbox.jsonl"))
+
+    # And nothing is owed any more
+    down = RecordingSink("webhook")
+    stream(tmp_path, down).publish(events)
+    assert down.received == []
+    assert len(EventLog(os.path.join(tmp_path, "trend_events.jsonl")).ids()) == 2
+
+
+def test_only_the_failed_batch_is_retried(tmp_path):
+    sink = RecordingSink("smtp", batch_size=1, refuse={"BBB"})
+    stream(tmp_path, sink).publish([flip("AAA"), flip("BBB"), flip("CCC", "Bullish", "Bearish")])
+    assert sink.received == ["AAA:Bearish>Bullish:2026-09-01"]
+
+    retry = RecordingSink("smtp", batch_size=1)
+    stream(tmp_path, retry).publish([flip("DDD")])
+    assert retry.received == ["BBB:Bearish>Bullish:2026-09-01", "CCC:Bullish>Bearish:2026-09-01",
+                              "DDD:Bearish>Bullish:2026-09-01"]
@@ -0,0 +1,40 @@
+"""
+Baseline lookup through the trend history: snapshots written after the
+history file exists (backfills, reruns) are imported and used, empty ones
+are skipped.
+"""
+import json
+import os
+
+from script import TREND_HISTORY_FILE, load_old_trends
+from trend_history import append_run
+
+
+def snapshot(folder, date, trends):
+    path = os.path.join(folder, f"previous_trends_{date}.json")
+    with open(path, "w") as f:
+        if trends is not None:
+            json.dump(trends, f)
+    return path
+
+
+def test_snapshots_added_after_the_history_are_used(tmp_path):
+    folder = str(tmp_path)
+    append_run("2026-07-01", {"A": {"Symbol": "AAA", "Trend": "Bearish"}}, os.path.join(folder, TREND_HISTORY_FILE))
+    assert load_old_trends("2026-09-01", "2026-10-01", folder) == (None, {})
+
+    snapshot(folder, "2026-09-01", None)                              # empty: skipped
+    snapshot(folder, "2026-08-28", {"AAA.NS": "Bullish", "BBB.NS": None})
+    assert load_old_trends("2026-09-01", "2026-10-01", folder) == ("2026-08-28", {"AAA": "Bullish"})
+
+
+def test_a_rerun_rewriting_a_snapshot_wins(tmp_path):
+    folder = str(tmp_path)
+    history = os.path.join(folder, TREND_HISTORY_FILE)
+    snapshot(folder, "2026-09-01", {"AAA": "Bearish"})
+    assert load_old_trends("2026-09-01", "2026-10-01", folder) == ("2026-09-01", {"AAA": "Bearish"})
+
+    # A same-day rerun rewrites the snapshot and appends its run to the history
+    snapshot(folder, "2026-09-01", {"AAA": "Bullish"})
+    append_run("2026-09-01", {"A": {"Symbol": "AAA", "Trend": "Bullish"}}, history)
+    assert load_old_trends("2026-09-01", "2026-10-01", folder) == ("2026-09-01", {"AAA": "Bullish"})
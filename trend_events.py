@@ -0,0 +1,251 @@
+import json
+import os
+import smtplib
+from datetime import datetime
+from email.message import EmailMessage
+
+import requests
+
+# -----------------------------
+# Trend-flip events + alert sinks
+# -----------------------------
+DEFAULT_EVENT_LOG = "previousdata/trend_events.jsonl"
+EVENT_RETURN_COLUMNS = ["Current Price (₹)", "1W %", "1M %", "3M %", "6M %", "YTD %"]
+DIRECTIONS = {("Bearish", "Bullish"): "up", ("Bullish", "Bearish"): "down"}
+
+SMTP_BATCH = 500      # flips per email
+WEBHOOK_BATCH = 200   # flips per POST
+
+
+def trend_event(symbol, old, new, res=None, baseline=None, when=None):
+    """One trend transition with the returns it happened at."""
+    when = when or datetime.now()
+    res = res or {}
+    return {
+        "id": f"{symbol}:{old}>{new}:{baseline or ''}",
+        "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+        "symbol": symbol,
+        "old": old,
+        "new": new,
+        "direction": DIRECTIONS.get((old, new), "sideways"),
+        "baseline": baseline,
+        "returns": {col: res.get(col) for col in EVENT_RETURN_COLUMNS if col in res},
+    }
+
+
+def format_event(event):
+    r = event["returns"]
+    return (f"{event['symbol']:<12} {event['old']} → {event['new']}"
+            f" | ₹{r.get('Current Price (₹)')} | 3M {r.get('3M %')}% | YTD {r.get('YTD %')}%")
+
+
+class EventLog:
+    """Append-only JSONL log of every event ever published; its ids drive dedup."""
+
+    def __init__(self, path=DEFAULT_EVENT_LOG):
+        self.path = path
+        self._ids = None
+
+    def ids(self):
+        if self._ids is None:
+            self._ids = set()
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._ids.add(json.loads(line)["id"])
+                        except (ValueError, KeyError):
+                            continue
+        return self._ids
+
+    def append(self, events):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.ids().update(event["id"] for event in events)
+
+
+class Outbox:
+    """A sink's undelivered events (JSONL), kept until the sink accepts them."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        events = []
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return events
+
+    def save(self, events):
+        if not events:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        os.replace(tmp, self.path)
+
+
+class EventSink:
+    """Buffers events, drops duplicate ids and hands them on in batches."""
+    name = "sink"
+    batch_size = 1000
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or self.batch_size
+        self.pending = []
+        self.seen = set()
+        self.delivered = set()   # ids of batches send() accepted
+
+    def emit(self, event):
+        if event["id"] in self.seen:
+            return
+        self.seen.add(event["id"])
+        self.pending.append(event)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        batch, self.pending = self.pending, []
+        if batch:
+            self.send(batch)
+            self.delivered.update(event["id"] for event in batch)
+
+    def send(self, batch):
+        raise NotImplementedError
+
+
+class JsonlSink(EventSink):
+    name = "jsonl"
+
+    def __init__(self, path, batch_size=None):
+        super().__init__(batch_size)
+        self.path = path
+
+    def send(self, batch):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in batch)
+
+
+class SmtpSink(EventSink):
+    """One digest email per batch; defaults to a local SMTP stub (python -m aiosmtpd -n)."""
+    name = "smtp"
+    batch_size = SMTP_BATCH
+
+    def __init__(self, recipients, host="localhost", port=1025, sender="stock-tracker@localhost",
+                 batch_size=None, timeout=10):
+        super().__init__(batch_size)
+        self.recipients = list(recipients)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def send(self, batch):
+        up = sum(1 for e in batch if e["direction"] == "up")
+        down = sum(1 for e in batch if e["direction"] == "down")
+        msg = EmailMessage()
+        msg["Subject"] = f"📈 {len(batch)} trend changes ({up} up, {down} down)"
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        msg.set_content("\n".join(format_event(e) for e in batch))
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(msg)
+
+
+class WebhookSink(EventSink):
+    """POSTs batches as {"events": [...]} to `url` (e.g. a local collector)."""
+    name = "webhook"
+    batch_size = WEBHOOK_BATCH
+
+    def __init__(self, url, batch_size=None, timeout=10, session=None):
+        super().__init__(batch_size)
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def send(self, batch):
+        response = self.session.post(self.url, json={"events": batch}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+def sinks_from_env(env=os.environ):
+    """
+    Optional alert sinks from the environment:
+    TREND_EVENTS_JSONL, TREND_WEBHOOK_URL, TREND_SMTP_TO (+ TREND_SMTP_HOST/PORT).
+    """
+    sinks = []
+    if env.get("TREND_EVENTS_JSONL"):
+        sinks.append(JsonlSink(env["TREND_EVENTS_JSONL"]))
+    if env.get("TREND_WEBHOOK_URL"):
+        sinks.append(WebhookSink(env["TREND_WEBHOOK_URL"]))
+    if env.get("TREND_SMTP_TO"):
+        sinks.append(SmtpSink(env["TREND_SMTP_TO"].split(","), host=env.get("TREND_SMTP_HOST", "localhost"),
+                              port=int(env.get("TREND_SMTP_PORT", 1025))))
+    return sinks
+
+
+class EventStream:
+    """
+    Publishes events once: ids already in the log are dropped (so a re-run
+    doesn't alert twice), new ones are appended to the log and fanned out to
+    the sinks. Each sink has an outbox next to the log: new events are
+    queued there first and leave it only once the sink accepted them, so a
+    failing sink is reported, never fatal, and gets them again next run.
+    """
+
+    def __init__(self, log=None, sinks=()):
+        self.log = log or EventLog()
+        self.sinks = list(sinks)
+
+    def outbox(self, sink):
+        base = os.path.splitext(self.log.path)[0]
+        return Outbox(f"{base}.{sink.name}.outbox.jsonl")
+
+    def publish(self, events):
+        known = self.log.ids()
+        fresh, batch_ids = [], set()
+        for event in events:
+            if event["id"] in known or event["id"] in batch_ids:
+                continue
+            batch_ids.add(event["id"])
+            fresh.append(event)
+
+        # Queue before logging: an event in the log is always in every outbox that still owes it
+        queues = []
+        for sink in self.sinks:
+            outbox = self.outbox(sink)
+            retry = outbox.load()
+            queued = {event["id"] for event in retry}
+            pending = retry + [event for event in fresh if event["id"] not in queued]
+            if fresh:
+                outbox.save(pending)
+            queues.append((outbox, pending, len(retry)))
+        self.log.append(fresh)
+
+        for sink, (outbox, pending, retried) in zip(self.sinks, queues):
+            if not pending:
+                continue
+            if retried:
+                print(f"🔁 Retrying {retried} undelivered events for sink '{sink.name}'")
+            try:
+                for event in pending:
+                    sink.emit(event)
+                sink.flush()
+            except Exception as e:
+                print(f"⚠️ Event sink '{sink.name}' failed → {e}")
+            undelivered = [event for event in pending if event["id"] not in sink.delivered]
+            outbox.save(undelivered)
+            if undelivered:
+                print(f"📮 {len(undelivered)} events kept in {outbox.path} for the next run")
+        return fresh
@@ -0,0 +1,142 @@
+import csv
+import glob
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from baseline import BASELINE_WINDOW_DAYS, pick_nearest
+
+# -----------------------------
+# Append-only trend history
+# -----------------------------
+# One CSV row per (symbol, run date). Rows are only ever appended; a rerun on
+# the same day appends again and the later row wins when the file is loaded.
+DEFAULT_HISTORY_PATH = "previousdata/trend_history.csv"
+HISTORY_COLUMNS = ["symbol", "run_date", "trend", "ret_1m", "ret_3m", "ret_6m", "ret_ytd"]
+RETURN_KEYS = {"ret_1m": "1M %", "ret_3m": "3M %", "ret_6m": "6M %", "ret_ytd": "YTD %"}
+SNAPSHOT_PATTERN = re.compile(r"previous_trends_(\d{4}-\d{2}-\d{2})\.json$")
+
+
+def _append_rows(rows, path):
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(HISTORY_COLUMNS)
+        writer.writerows(rows)
+    return len(rows)
+
+
+def append_run(run_date, results, path=DEFAULT_HISTORY_PATH):
+    """Append one run ({name: row with Symbol/Trend/returns}) to the history."""
+    rows = []
+    for res in results.values():
+        if not res.get("Symbol") or not res.get("Trend"):
+            continue
+        rows.append([res["Symbol"], run_date, res["Trend"],
+                     *(res.get(key) for key in RETURN_KEYS.values())])
+    return _append_rows(rows, path)
+
+
+def load_history(path=DEFAULT_HISTORY_PATH):
+    """The whole history as a frame, latest row per (symbol, run_date)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        history = pd.DataFrame(columns=HISTORY_COLUMNS)
+        history["run_date"] = pd.to_datetime(history["run_date"])
+        return history
+    history = pd.read_csv(path, parse_dates=["run_date"], dtype={"symbol": str, "trend": str})
+    return history.drop_duplicates(["symbol", "run_date"], keep="last").reset_index(drop=True)
+
+
+def trend_matrix(history):
+    """Run dates x symbols matrix of trend labels, sorted by date."""
+    if history.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="run_date"))
+    return history.pivot(index="run_date", columns="symbol", values="trend").sort_index()
+
+
+def trends_on(matrix, run_date):
+    """{symbol: trend} recorded by the run on exactly `run_date` ({} if none)."""
+    run_date = pd.Timestamp(run_date)
+    if run_date not in matrix.index:
+        return {}
+    return matrix.loc[run_date].dropna().to_dict()
+
+
+def trends_as_of(matrix, as_of):
+    """{symbol: trend} from the latest run on or before `as_of`."""
+    dates = matrix.index
+    pos = dates.searchsorted(pd.Timestamp(as_of), side="right") - 1
+    if pos < 0:
+        return {}
+    return matrix.iloc[pos].dropna().to_dict()
+
+
+def nearest_run(matrix, target, window_days=BASELINE_WINDOW_DAYS, before=None):
+    """
+    (run date, {symbol: trend}) of the non-empty run closest to `target`
+    within the window, ignoring runs on or after `before`; (None, {}) if none.
+    """
+    dates = matrix.index
+    if before is not None:
+        dates = dates[dates < pd.Timestamp(before)]
+    for date in pick_nearest(dates, target, window_days):
+        trends = matrix.loc[date].dropna().to_dict()
+        if trends:
+            return date.strftime("%Y-%m-%d"), trends
+    return None, {}
+
+
+def trends_months_ago(matrix, as_of, months):
+    """Trend vs N months ago: latest run on or before `as_of` minus `months`."""
+    return trends_as_of(matrix, pd.Timestamp(as_of) - pd.DateOffset(months=months))
+
+
+def last_flips(matrix):
+    """
+    Per symbol, the run date of its latest trend change and the label it
+    changed from, found with one vectorized scan over the matrix.
+    """
+    previous = matrix.ffill().shift()
+    changed = (matrix.notna() & previous.notna() & matrix.ne(previous)).to_numpy()
+    has_flip = changed.any(axis=0)
+    # argmax on the row-reversed mask finds each column's last change
+    rows = len(matrix) - 1 - changed[::-1].argmax(axis=0)
+    cols = np.arange(matrix.shape[1])
+    flips = pd.DataFrame({
+        "last_flip": pd.Series(matrix.index[rows], index=matrix.columns).where(has_flip),
+        "flipped_from": pd.Series(previous.to_numpy()[rows, cols], index=matrix.columns).where(has_flip),
+    })
+    return flips
+
+
+def import_json_snapshots(folder="previousdata", path=DEFAULT_HISTORY_PATH):
+    """
+    Import previous_trends_YYYY-MM-DD.json snapshots into the history. Empty
+    or unreadable files are skipped, as are dates already in the history, so
+    this is cheap to call on every run.
+    """
+    known = set(load_history(path)["run_date"].dt.strftime("%Y-%m-%d"))
+    rows = []
+    for file in sorted(glob.glob(os.path.join(folder, "previous_trends_*.json"))):
+        match = SNAPSHOT_PATTERN.search(os.path.basename(file))
+        if not match or match.group(1) in known or os.path.getsize(file) == 0:
+            continue
+        try:
+            with open(file, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {file} → {e}")
+            continue
+        rows.extend([symbol, match.group(1), trend, None, None, None, None]
+                    for symbol, trend in snapshot.items() if trend)
+    if not rows:
+        return 0
+    imported = _append_rows(rows, path)
+    print(f"📥 Imported {imported} trend rows from JSON snapshots into {path}")
+    return imported